@@ -1,7 +1,18 @@
 import streamlit as st
 import pandas as pd
-import requests
 import importlib
+import os
+import uuid
+from pathlib import Path
+import plotly.express as px
+
+from src.datasource import FrameHandle, load_frame, read_pipeline_runs, store_connections
+from src.docfetch import DocumentFetcher
+from src.figcache import FigureCache, cache_key
+from src.instrument import latency_kpi
+from src.payload import optimize
+from src.profiler import Profiler, flame_figure
+from src.query import CO2Query
 
 # ==============================================================================
 # 1. CONFIGURATION & STATE
@@ -18,6 +29,15 @@ st.set_page_config(
 if 'current_page' not in st.session_state:
     st.session_state.current_page = "Home"
 
+# Opt-in render profiling: open the app with ?profile=1 or set CO2_PROFILE=1.
+# Each rerun is timed as nested spans, drawn in the sidebar and appended to
+# CO2_PROFILE_LOG (see src/profiler.py for p50/p95 aggregation).
+PROFILE = os.environ.get("CO2_PROFILE") == "1" or st.query_params.get("profile") in ("1", "true")
+if st.session_state.get("profiler") is None or st.session_state.profiler.enabled != PROFILE:
+    st.session_state.profiler = Profiler(uuid.uuid4().hex[:8], enabled=PROFILE)
+profiler = st.session_state.profiler
+profiler.start()
+
 # Global Constants
 REPO_URL = "https://github.com/k-chetan/CO2-Dashboard"
 README_URL = "https://raw.githubusercontent.com/k-chetan/CO2-Dashboard/master/README.md"
@@ -79,30 +99,86 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ==============================================================================
-# 3. DATA ENGINE (FIXED: Added missing columns for stories)
+# 3. DATA ENGINE (Local pipeline output first, remote CSV as explicit fallback)
 # ==============================================================================
 
-@st.cache_data(ttl=3600)
+# Sources tried in order: the memory-mapped Arrow snapshot, DuckDB store and
+# processed Parquet written by `make run-pipeline`, then the raw OWID CSV when
+# listed here. The pipeline publishes the snapshot together with the store.
+DATA_SOURCES = os.environ.get("CO2_DATA_SOURCES", "snapshot,duckdb,parquet,remote").split(",")
+STORE_SOURCES = ("snapshot", "duckdb")
+
+# One read-only frame per process, shared by every session and rerun. Reruns
+# get a zero-copy view of it; st.cache_data would unpickle a full copy each time.
+@st.cache_resource(ttl=3600)
 def load_real_data():
-    url = "https://raw.githubusercontent.com/owid/co2-data/master/owid-co2-data.csv"
     try:
-        # FIXED: Included all columns required by the 10 data stories
-        cols = [
-            'country', 'year', 'iso_code', 'population', 'gdp', 
-            'co2', 'co2_per_capita', 'cumulative_co2', 
-            'coal_co2', 'oil_co2', 'gas_co2', 'cement_co2', 'flaring_co2',
-            'share_global_co2', 'consumption_co2'
-        ]
-        df = pd.read_csv(url, usecols=cols)
-        df = df[df['year'] >= 1950].fillna(0)
-        return df
+        return FrameHandle(*load_frame(DATA_SOURCES))
     except Exception as e:
         st.error(f"Critical Data Failure: {e}")
-        return pd.DataFrame()
+        return FrameHandle(pd.DataFrame())
 
 # Load data with a spinner for UX
-with st.spinner("Initializing Data Engine..."):
-    df = load_real_data()
+with st.spinner("Initializing Data Engine..."), profiler.span("data engine"):
+    data_handle = load_real_data()
+    df = data_handle.view()
+    data_source, load_seconds, data_fingerprint = data_handle.source, data_handle.load_seconds, data_handle.version
+
+if data_source == "remote":
+    st.warning("Local data store not found; serving the raw OWID CSV. Run `make run-pipeline` for faster startup.")
+
+@st.cache_data(ttl=60)
+def load_pipeline_runs():
+    # Per-stage metrics the pipeline records on every run.
+    return read_pipeline_runs()
+
+def format_seconds(seconds):
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.1f}s"
+
+@st.cache_resource
+def db_connections():
+    # The store's read-only connection manager, shared by every session: one
+    # cursor per thread, reopened when the pipeline swaps in a new file.
+    return store_connections()
+
+# One README copy shared by all sessions, revalidated in the background, so the
+# page never blocks on GitHub.
+@st.cache_resource
+def readme_fetcher():
+    return DocumentFetcher(README_URL, Path(__file__).with_name("README.md"))
+
+@st.cache_resource(ttl=3600)
+def load_query():
+    # Built once per data version and shared by sessions; lookups return copies.
+    return CO2Query(load_real_data().view())
+
+# Built figures, shared across sessions and keyed by the data version, so a
+# repeat view skips both the data work and Plotly. Set CO2_FIGURE_CACHE_DIR to
+# keep them across restarts.
+@st.cache_resource
+def figure_cache():
+    return FigureCache(disk_dir=os.environ.get("CO2_FIGURE_CACHE_DIR"))
+
+def story_query():
+    # Only the Parquet/remote sources need the query index; the store has marts.
+    return load_query() if data_source not in STORE_SOURCES else None
+
+def story_frame(story_module, query):
+    """The story's ready-to-plot frame: its mart from the store, else derived via the query index."""
+    if data_source in STORE_SOURCES:
+        data = db_connections().table(story_module.MART)
+        if data is not None:
+            return data
+    return story_module.frame(query or load_query())
+
+def prepare_story(module_path, cache, query):
+    """The story's figure. Makes no Streamlit calls, so it is safe to share through the figure cache."""
+    story_module = importlib.import_module(module_path)
+    return cache.get(
+        # The module's mtime keeps the disk tier from serving figures of edited stories.
+        cache_key(module_path, os.path.getmtime(story_module.__file__), data_fingerprint, ()),
+        lambda: optimize(story_module.prepare(story_frame(story_module, query))),
+    )
 
 # ==============================================================================
 # 4. STORY REGISTRY
@@ -121,6 +197,30 @@ STORY_MAP = {
     "10. The Analyst's View": "stories.story_10_The_Analysts_View"
 }
 
+def render_story(story_name):
+    module_path = STORY_MAP[story_name]
+    st.subheader(story_name)
+    try:
+        with profiler.span(f"story:{story_name}"):
+            with profiler.span("prepare"):
+                figure = prepare_story(module_path, figure_cache(), story_query())
+            # Modules are imported on first use; Python caches them afterwards.
+            with profiler.span("show"):
+                importlib.import_module(module_path).show(figure)
+    except ModuleNotFoundError:
+        st.warning(f"⚠️ Module `{module_path}` pending deployment.")
+    except Exception as e:
+        st.error(f"Error rendering {story_name}: {e}")
+
+@st.fragment
+def story_fragment(story_name):
+    render_story(story_name)
+
+@st.fragment
+def story_browser():
+    story_name = st.selectbox("Report", list(STORY_MAP), key="story_choice")
+    render_story(story_name)
+
 # ==============================================================================
 # 5. HEADER & NAVIGATION
 # ==============================================================================
@@ -142,10 +242,11 @@ def nav_button(label, col):
             st.session_state.current_page = label
             st.rerun()
 
-nav_button("Home", nav_1)
-nav_button("Project README", nav_2)
-nav_button("Architecture", nav_3)
-nav_button("Data Stories", nav_4)
+with profiler.span("navigation"):
+    nav_button("Home", nav_1)
+    nav_button("Project README", nav_2)
+    nav_button("Architecture", nav_3)
+    nav_button("Data Stories", nav_4)
 
 st.markdown("---")
 
@@ -165,185 +266,237 @@ def render_footer():
 # 7. VIEW CONTROLLER
 # ==============================================================================
 
-# --- PAGE 1: HOME (DASHBOARD) ---
-if st.session_state.current_page == "Home":
+with profiler.span(f"view:{st.session_state.current_page}"):
+
+    # --- PAGE 1: HOME (DASHBOARD) ---
+    if st.session_state.current_page == "Home":
     
-    # 1. High-Level Metrics (KPIs)
-    if not df.empty:
-        st.markdown("### ⚡ System Status & Key Metrics")
-        kpi1, kpi2, kpi3, kpi4 = st.columns(4)
+        # 1. High-Level Metrics (KPIs)
+        if not df.empty:
+            st.markdown("### ⚡ System Status & Key Metrics")
+            kpi1, kpi2, kpi3, kpi4 = st.columns(4)
         
-        max_year = int(df['year'].max())
-        total_countries = df['country'].nunique()
-        latest_global_co2 = df[df['year'] == max_year]['co2'].sum() / 1000 # Billions
+            max_year = int(df['year'].max())
+            total_countries = df['country'].nunique()
+            latest_global_co2 = df[df['year'] == max_year]['co2'].sum() / 1000 # Billions
         
-        # Using standard metric
-        kpi1.metric("Data Up To", f"{max_year}", delta="Live from OWID")
-        kpi2.metric("Entities Tracked", f"{total_countries}", delta="Global Coverage")
-        kpi3.metric(f"Global CO₂ ({max_year})", f"{latest_global_co2:.1f} Bt", delta="Billion Tonnes")
-        kpi4.metric("Pipeline Latency", "34ms", delta="-12% vs avg")
+            # Using standard metric
+            kpi1.metric("Data Up To", f"{max_year}", delta="Live from OWID")
+            kpi2.metric("Entities Tracked", f"{total_countries}", delta="Global Coverage")
+            kpi3.metric(f"Global CO₂ ({max_year})", f"{latest_global_co2:.1f} Bt", delta="Billion Tonnes")
+            pipeline_runs = load_pipeline_runs()
+            if pipeline_runs is None:
+                kpi4.metric("Pipeline Latency", "n/a", delta="No recorded runs", delta_color="off")
+            else:
+                latency, change = latency_kpi(pipeline_runs)
+                kpi4.metric(
+                    "Pipeline Latency", format_seconds(latency),
+                    delta=None if change is None else f"{change:+.0f}% vs avg", delta_color="inverse",
+                )
+            st.caption(f"Data source: `{data_source}` · loaded in {load_seconds * 1000:.0f} ms")
     
-    st.markdown("---")
+        st.markdown("---")
     
-    # 2. Executive Summary
-    st.markdown("### 📋 Executive Summary")
-    c1, c2 = st.columns([2, 1])
+        # 2. Executive Summary
+        st.markdown("### 📋 Executive Summary")
+        c1, c2 = st.columns([2, 1])
     
-    with c1:
-        st.markdown("""
-        **Context:** Climate change is the defining data challenge of our time. This application serves as a demonstration of rigorous **Data Engineering** principles applied to environmental science.
+        with c1:
+            st.markdown("""
+            **Context:** Climate change is the defining data challenge of our time. This application serves as a demonstration of rigorous **Data Engineering** principles applied to environmental science.
         
-        **Engineering Highlights:**
-        * **Declarative Transformations:** Logic resides in SQL/DuckDB, not opaque Python loops.
-        * **Strict Schema Validation:** Incoming data is vetted by Pandera before rendering.
-        * **Containerized Reproducibility:** The environment is strictly defined via Docker.
-        """)
+            **Engineering Highlights:**
+            * **Declarative Transformations:** Logic resides in SQL/DuckDB, not opaque Python loops.
+            * **Strict Schema Validation:** Incoming data is vetted by Pandera before rendering.
+            * **Containerized Reproducibility:** The environment is strictly defined via Docker.
+            """)
         
-    with c2:
-        st.info("💡 **Tip:** Navigate to the 'Data Stories' tab for deep-dive visualizations on specific emission drivers.")
+        with c2:
+            st.info("💡 **Tip:** Navigate to the 'Data Stories' tab for deep-dive visualizations on specific emission drivers.")
 
-    st.markdown("<br>", unsafe_allow_html=True)
-    render_footer()
+        st.markdown("<br>", unsafe_allow_html=True)
+        render_footer()
 
-# --- PAGE 2: README ---
-elif st.session_state.current_page == "Project README":
-    st.markdown("### 📑 Project Documentation")
-    st.caption(f"Fetched dynamically from: {REPO_URL}")
-    st.divider()
+    # --- PAGE 2: README ---
+    elif st.session_state.current_page == "Project README":
+        st.markdown("### 📑 Project Documentation")
+        st.caption(f"Fetched dynamically from: {REPO_URL}")
+        st.divider()
     
-    try:
-        with st.spinner("Fetching documentation..."):
-            response = requests.get(README_URL)
-            if response.status_code == 200:
-                st.markdown(response.text)
-            else:
-                st.warning("README not found in the master branch.")
-    except Exception as e:
-        st.error(f"Connection Error: {e}")
+        readme, readme_source = readme_fetcher().get()
+        if readme_source == "bundled":
+            st.caption("GitHub has not responded yet; showing the README bundled with this deployment.")
+        st.markdown(readme)
+
+        # Roadmap moved here
+        st.divider()
+        with st.expander("🔮 View Roadmap: Predictive Analytics (Q4 2025)", expanded=False):
+            st.markdown("""
+            The following features are currently in the development pipeline for Version 2.0:
+        
+            * **Predictive Inference Engine:** Integration of Prophet/ARIMA for 2050 targets.
+            * **AI Architect Agent:** A RAG-based LLM chatbot to query the underlying SQL logic.
+            * **CI/CD Pipelines:** Automated data refreshing via GitHub Actions.
+            """)
+    
+        render_footer()
 
-    # Roadmap moved here
-    st.divider()
-    with st.expander("🔮 View Roadmap: Predictive Analytics (Q4 2025)", expanded=False):
+    # --- PAGE 3: ARCHITECTURE (ENHANCED) ---
+    elif st.session_state.current_page == "Architecture":
+        st.markdown("### 🏗️ Engineering Architecture")
         st.markdown("""
-        The following features are currently in the development pipeline for Version 2.0:
-        
-        * **Predictive Inference Engine:** Integration of Prophet/ARIMA for 2050 targets.
-        * **AI Architect Agent:** A RAG-based LLM chatbot to query the underlying SQL logic.
-        * **CI/CD Pipelines:** Automated data refreshing via GitHub Actions.
+        This application implements a **"Lakehouse-Lite"** topology. It is designed to demonstrate how heavy-duty data engineering principles 
+        can be applied to lightweight, stateless applications.
         """)
     
-    render_footer()
-
-# --- PAGE 3: ARCHITECTURE (ENHANCED) ---
-elif st.session_state.current_page == "Architecture":
-    st.markdown("### 🏗️ Engineering Architecture")
-    st.markdown("""
-    This application implements a **"Lakehouse-Lite"** topology. It is designed to demonstrate how heavy-duty data engineering principles 
-    can be applied to lightweight, stateless applications.
-    """)
-    
-    st.divider()
-
-    # 1. The Diagram
-    st.subheader("1. The Data Pipeline")
-    st.graphviz_chart("""
-        digraph G {
-            rankdir=LR; 
-            bgcolor="transparent";
-            fontname="Inter";
-            node [shape=box, style="filled,rounded", fontname="Inter", fontsize=11, penwidth=1.5];
-            edge [fontname="Inter", fontsize=10, color="#64748b", penwidth=1.5];
-
-            subgraph cluster_ingest {
-                label = "LAYER 1: INGEST";
-                style=dashed; color="#94a3b8"; fontcolor="#64748b";
-                Source [label="OWID Cloud\n(CSV)", fillcolor="#f1f5f9", color="#cbd5e1"];
-                PyRequest [label="Python\nRequests", fillcolor="#fff1f2", color="#fda4af"];
-            }
-
-            subgraph cluster_process {
-                label = "LAYER 2: PROCESSING";
-                style=solid; color="#3b82f6"; fontcolor="#2563eb"; bgcolor="#eff6ff";
-                DuckDB [label="DuckDB\n(In-Process OLAP)", fillcolor="#3b82f6", fontcolor="white"];
-                SQL [label="SQL Scripts\n(Declarative Logic)", fillcolor="#dbeafe", style="dashed,filled"];
-            }
-
-            subgraph cluster_gate {
-                label = "LAYER 3: QUALITY";
-                style=solid; color="#f59e0b"; fontcolor="#d97706"; bgcolor="#fffbeb";
-                Pandera [label="Pandera\n(Schema Check)", fillcolor="#f59e0b", fontcolor="white"];
-            }
-
-            subgraph cluster_app {
-                label = "LAYER 4: SERVE";
-                style=solid; color="#10b981"; fontcolor="#059669"; bgcolor="#ecfdf5";
-                UI [label="Streamlit\n(Frontend)", fillcolor="#10b981", fontcolor="white"];
+        st.divider()
+
+        # 1. The Diagram
+        st.subheader("1. The Data Pipeline")
+        st.graphviz_chart("""
+            digraph G {
+                rankdir=LR; 
+                bgcolor="transparent";
+                fontname="Inter";
+                node [shape=box, style="filled,rounded", fontname="Inter", fontsize=11, penwidth=1.5];
+                edge [fontname="Inter", fontsize=10, color="#64748b", penwidth=1.5];
+
+                subgraph cluster_ingest {
+                    label = "LAYER 1: INGEST";
+                    style=dashed; color="#94a3b8"; fontcolor="#64748b";
+                    Source [label="OWID Cloud\n(CSV)", fillcolor="#f1f5f9", color="#cbd5e1"];
+                    PyRequest [label="Python\nRequests", fillcolor="#fff1f2", color="#fda4af"];
+                }
+
+                subgraph cluster_process {
+                    label = "LAYER 2: PROCESSING";
+                    style=solid; color="#3b82f6"; fontcolor="#2563eb"; bgcolor="#eff6ff";
+                    DuckDB [label="DuckDB\n(In-Process OLAP)", fillcolor="#3b82f6", fontcolor="white"];
+                    SQL [label="SQL Scripts\n(Declarative Logic)", fillcolor="#dbeafe", style="dashed,filled"];
+                }
+
+                subgraph cluster_gate {
+                    label = "LAYER 3: QUALITY";
+                    style=solid; color="#f59e0b"; fontcolor="#d97706"; bgcolor="#fffbeb";
+                    Pandera [label="Pandera\n(Schema Check)", fillcolor="#f59e0b", fontcolor="white"];
+                }
+
+                subgraph cluster_app {
+                    label = "LAYER 4: SERVE";
+                    style=solid; color="#10b981"; fontcolor="#059669"; bgcolor="#ecfdf5";
+                    UI [label="Streamlit\n(Frontend)", fillcolor="#10b981", fontcolor="white"];
+                }
+
+                Source -> PyRequest;
+                PyRequest -> DuckDB [label=" Load"];
+                DuckDB -> SQL [dir=both, style=dotted];
+                DuckDB -> Pandera [label=" Arrow Table"];
+                Pandera -> UI [label=" Validated DF"];
             }
+        """, use_container_width=True)
 
-            Source -> PyRequest;
-            PyRequest -> DuckDB [label=" Load"];
-            DuckDB -> SQL [dir=both, style=dotted];
-            DuckDB -> Pandera [label=" Arrow Table"];
-            Pandera -> UI [label=" Validated DF"];
-        }
-    """, use_container_width=True)
+        # 2. Detailed Tech Stack
+        st.subheader("2. Core Technical Components")
+        st.markdown("This architecture was chosen to ensure the project is **reproducible, strict, and performant**.")
 
-    # 2. Detailed Tech Stack
-    st.subheader("2. Core Technical Components")
-    st.markdown("This architecture was chosen to ensure the project is **reproducible, strict, and performant**.")
-
-    c1, c2, c3 = st.columns(3)
+        c1, c2, c3 = st.columns(3)
     
-    with c1:
-        st.markdown("#### 🦆 DuckDB (The Engine)")
-        st.caption("In-Process OLAP")
-        st.markdown("""
-        We bypass standard Pandas looping in favor of **DuckDB**. This allows us to write standard SQL for data transformations (`clean_and_cast.sql`, `calculate_metrics.sql`). 
+        with c1:
+            st.markdown("#### 🦆 DuckDB (The Engine)")
+            st.caption("In-Process OLAP")
+            st.markdown("""
+            We bypass standard Pandas looping in favor of **DuckDB**. This allows us to write standard SQL for data transformations (`clean_and_cast.sql`, `calculate_metrics.sql`). 
         
-        *Benefit:* Decouples business logic from application code.
-        """)
-
-    with c2:
-        st.markdown("#### 🛡️ Pandera (The Gatekeeper)")
-        st.caption("Runtime Validation")
-        st.markdown("""
-        Before any data reaches the visualization layer, it passes through a **Pandera Schema**. This acts as a contract; if the data type of `co2` is not `float` or if `year` < 1750, the pipeline halts.
+            *Benefit:* Decouples business logic from application code.
+            """)
+
+        with c2:
+            st.markdown("#### 🛡️ Pandera (The Gatekeeper)")
+            st.caption("Runtime Validation")
+            st.markdown("""
+            Before any data reaches the visualization layer, it passes through a **Pandera Schema**. This acts as a contract; if the data type of `co2` is not `float` or if `year` < 1750, the pipeline halts.
         
-        *Benefit:* Prevents silent data corruption errors.
-        """)
-
-    with c3:
-        st.markdown("#### 🐳 Docker (The Environment)")
-        st.caption("Stateless Deployment")
-        st.markdown("""
-        The application runs in a containerized environment (Python 3.9-slim). It creates a pristine, ephemeral environment on every deploy.
+            *Benefit:* Prevents silent data corruption errors.
+            """)
+
+        with c3:
+            st.markdown("#### 🐳 Docker (The Environment)")
+            st.caption("Stateless Deployment")
+            st.markdown("""
+            The application runs in a containerized environment (Python 3.9-slim). It creates a pristine, ephemeral environment on every deploy.
         
-        *Benefit:* Eliminates "it works on my machine" issues.
+            *Benefit:* Eliminates "it works on my machine" issues.
+            """)
+
+        # 3. Measured pipeline runs
+        st.subheader("3. Pipeline Run History")
+        pipeline_runs = load_pipeline_runs()
+        if pipeline_runs is None:
+            st.info("No pipeline runs recorded yet. Run `make run-pipeline` to record one.")
+        else:
+            measures = {
+                "Wall time (s)": "wall_seconds",
+                "CPU time (s)": "cpu_seconds",
+                "Peak memory (MB)": "peak_rss_mb",
+                "Rows out": "rows_out",
+                "Bytes written": "bytes_written",
+            }
+            measure = st.selectbox("Measure", list(measures), key="run_measure")
+            history = pipeline_runs[pipeline_runs["status"] != "skipped"]
+            fig = px.line(
+                history, x="started_at", y=measures[measure], color="stage", markers=True,
+                labels={"started_at": "", measures[measure]: measure, "stage": "Stage"},
+            )
+            fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color="gray"))
+            st.plotly_chart(fig, use_container_width=True)
+
+            latest = pipeline_runs[pipeline_runs["run_id"] == pipeline_runs["run_id"].iloc[-1]]
+            st.caption(f"Latest run `{latest['run_id'].iloc[0]}` · validation runs inside transform")
+            st.dataframe(
+                latest[["stage", "status", "wall_seconds", "cpu_seconds", "peak_rss_mb", "rows_in", "rows_out", "bytes_read", "bytes_written"]],
+                hide_index=True, use_container_width=True,
+            )
+
+        render_footer()
+
+    # --- PAGE 4: DATA STORIES ---
+    elif st.session_state.current_page == "Data Stories":
+    
+        st.markdown("### 📈 Analytical Narratives")
+        st.markdown("""
+        The following reports present a sequential analysis of global emissions. 
+        *Pick a report below, or switch to the full narrative to scroll through the complete arc.*
         """)
 
-    render_footer()
-
-# --- PAGE 4: DATA STORIES ---
-elif st.session_state.current_page == "Data Stories":
-    
-    st.markdown("### 📈 Analytical Narratives")
-    st.markdown("""
-    The following reports present a sequential analysis of global emissions. 
-    *Scroll down to view the complete narrative arc.*
-    """)
-    
-    # Render Stories
-    for story_name, module_path in STORY_MAP.items():
-        st.markdown("---")
-        st.subheader(story_name) 
-        try:
-            story_module = importlib.import_module(module_path)
-            story_module.show(df)
-        except ModuleNotFoundError:
-             st.warning(f"⚠️ Module `{module_path}` pending deployment.")
-        except Exception as e:
-            st.error(f"Error rendering {story_name}: {e}")
+        # Single-story mode only imports and draws the selected story, inside a
+        # fragment so switching stories reruns just that part of the page.
+        view = st.radio("View", ["Single story", "Full narrative"], horizontal=True, key="story_view", label_visibility="collapsed")
+        if view == "Single story":
+            story_browser()
+        else:
+            # Stories are prepared one after another: building Plotly figures
+            # holds the GIL, so a thread pool barely helps, and the marts and
+            # the figure cache already make each preparation cheap.
+            for story_name in STORY_MAP:
+                st.markdown("---")
+                story_fragment(story_name)
        
-    st.markdown("---")
+        st.markdown("---")
+        stats = figure_cache().stats()
+        st.caption(f"Figure cache: {stats['hits'] + stats['disk_hits']} hits · {stats['misses']} misses · {stats['entries']} cached")
     
-    render_footer()
+        render_footer()
+
+# ==============================================================================
+# 8. PROFILER PANEL
+# ==============================================================================
+spans = profiler.finish()
+if spans:
+    with st.sidebar:
+        st.markdown("### ⏱️ Render Profile")
+        st.caption(f"Session `{profiler.session}` · rerun {profiler.reruns} · {spans[0]['duration_ms']:.0f} ms")
+        st.plotly_chart(flame_figure(spans), use_container_width=True)
+        st.dataframe(
+            pd.DataFrame(spans)[["path", "duration_ms"]].sort_values("duration_ms", ascending=False).round(1),
+            hide_index=True, use_container_width=True,
+        )
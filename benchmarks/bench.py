@@ -0,0 +1,208 @@
+"""Pipeline and app benchmarks on synthetic OWID-shaped data at 1x, 10x and 100x.
+
+Each stage is timed and its peak resident memory recorded, then compared with
+benchmarks/baseline.json:
+
+    python benchmarks/bench.py                  # 1x and 10x, fail on regressions
+    python benchmarks/bench.py --scales 1 10 100
+    python benchmarks/bench.py --update         # record a new baseline
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "src"), str(ROOT)]
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv
+from streamlit import config as streamlit_config
+from streamlit.logger import set_log_level
+
+import load
+import marts
+import transform
+from convert import convert_raw
+from datasource import LOCAL_SOURCES, data_version, load_frame, read_mart
+from instrument import PeakRSS
+from metrics import render
+from models import discover
+from paths import RAW_PATH
+from payload import optimize
+from query import CO2Query
+from snapshot import publish_snapshot
+from tests.synthetic import SCALES, make_scaled_frame
+from validation import validate_in_duckdb
+
+BASELINE_PATH = ROOT / "benchmarks" / "baseline.json"
+STORY_DIR = ROOT / "stories"
+
+# A stage regresses when it is both `ratio` times its baseline and worse by more
+# than the absolute slack, so sub-100ms stages do not fail on timer noise.
+THRESHOLDS = {
+    "seconds": {"ratio": 1.5, "slack": 0.1},
+    "peak_rss_mb": {"ratio": 1.5, "slack": 32},
+}
+
+def measure(fn, repeat=1) -> dict:
+    """Best-of-`repeat` wall time and the peak RSS growth while `fn` ran."""
+    best, peak = float("inf"), 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with PeakRSS() as rss:
+            fn()
+        best = min(best, time.perf_counter() - start)
+        peak = max(peak, rss.peak_mb)
+    return {"seconds": round(best, 4), "peak_rss_mb": round(peak, 1)}
+
+def story_modules() -> list:
+    return sorted(f"stories.{path.stem}" for path in STORY_DIR.glob("story_*.py"))
+
+def run_scale(scale: int, repeat: int = 1) -> dict:
+    """Generate the data at `scale` in a scratch directory and benchmark every stage."""
+    previous_cwd = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix=f"co2-bench-{scale}x-") as workspace:
+        os.chdir(workspace)
+        try:
+            return _run_stages(scale, repeat)
+        finally:
+            os.chdir(previous_cwd)
+
+def _run_stages(scale: int, repeat: int) -> dict:
+    raw = make_scaled_frame(scale)
+    RAW_PATH.parent.mkdir(parents=True, exist_ok=True)
+    pyarrow.csv.write_csv(pa.Table.from_pandas(raw, preserve_index=False), RAW_PATH)
+    result = {"rows": len(raw), "csv_mb": round(RAW_PATH.stat().st_size / 2**20, 1), "stages": {}}
+    del raw
+    stages = result["stages"]
+
+    # The CSV to staged Parquet conversion ingest runs, then the SQL models one
+    # at a time, on the same connection the transform uses.
+    models = discover(ROOT / "src" / "sql", render)
+    con = duckdb.connect()
+
+    def model(name):
+        return lambda: con.execute(f"CREATE OR REPLACE TABLE {name} AS {models[name]['sql']}")
+
+    stages["csv_parse"] = measure(lambda: convert_raw(force=True), repeat)
+    stages["clean_and_cast"] = measure(model("clean_and_cast"), repeat)
+    stages["metrics_window"] = measure(model("calculate_metrics"), repeat)
+    stages["rolling_window"] = measure(model("add_rolling_averages"), repeat)
+    stages["validation"] = measure(lambda: validate_in_duckdb(con, "add_rolling_averages"), repeat)
+    con.close()
+
+    # End to end: transform (uncached) to Parquet, the DuckDB store and the snapshot.
+    transform.SQL_DIR = ROOT / "src" / "sql"
+    marts.MART_DIR = ROOT / "src" / "sql" / "marts"
+    stages["transform_data"] = measure(lambda: transform.transform_data(cache_dir=None), repeat)
+    stages["load_data"] = measure(load.load_data, repeat)
+    stages["publish_snapshot"] = measure(publish_snapshot, repeat)
+
+    # What the app does on a cold start (app.load_real_data without Streamlit's
+    # cache): map the snapshot. load_store is its fallback when there is none.
+    loaded = {}
+
+    def load_real_data(sources=LOCAL_SOURCES):
+        df, source, _ = load_frame(sources)
+        loaded.update(df=df, source=source, version=data_version(source, df))
+
+    stages["load_store"] = measure(lambda: load_real_data(["duckdb"]), repeat)
+    stages["load_real_data"] = measure(load_real_data, repeat)
+    if loaded["source"] != "snapshot":
+        raise RuntimeError(f"The app would load from {loaded['source']}, not the snapshot")
+
+    # Each story as the Data Stories page runs it: mart or indexed frame,
+    # figure, payload optimisation and show() (outside a Streamlit session).
+    query = CO2Query(loaded["df"])
+    for module_path in story_modules():
+        story = importlib.import_module(module_path)
+
+        def run_story(story=story):
+            data = read_mart(story.MART)
+            story.show(optimize(story.prepare(data if data is not None else story.frame(query))))
+
+        stages[f"story:{module_path.split('.')[-1]}"] = measure(run_story, repeat)
+    return result
+
+def compare(results: dict, baseline: dict) -> list:
+    """Human-readable regressions of `results` against the `baseline` results."""
+    thresholds = baseline.get("thresholds", THRESHOLDS)
+    regressions = []
+    for scale, result in results.items():
+        expected = baseline.get("scales", {}).get(scale)
+        if expected is None:
+            continue
+        for stage, measured in result["stages"].items():
+            reference = expected["stages"].get(stage)
+            if reference is None:
+                continue
+            for metric, limit in thresholds.items():
+                allowed = max(reference[metric] * limit["ratio"], reference[metric] + limit["slack"])
+                if measured[metric] > allowed:
+                    regressions.append(
+                        f"{scale}x {stage}: {metric} {measured[metric]} > {allowed:.4g} (baseline {reference[metric]})"
+                    )
+    return regressions
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "duckdb": duckdb.__version__,
+        "pandas": pd.__version__,
+        "pyarrow": pa.__version__,
+    }
+
+def format_results(results: dict) -> str:
+    lines = []
+    for scale, result in results.items():
+        lines.append(f"{scale}x: {result['rows']} rows, {result['csv_mb']} MB CSV")
+        for stage, measured in result["stages"].items():
+            lines.append(f"  {stage:<45} {measured['seconds']:>9.4f}s {measured['peak_rss_mb']:>9.1f} MB")
+    return "\n".join(lines)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], choices=sorted(SCALES))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the fastest is kept")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    # The synthetic aggregates fail the iso_code check, as the real ones do.
+    logging.getLogger().setLevel(logging.ERROR)
+    # show() outside a session logs "missing ScriptRunContext" for every call.
+    # Parse Streamlit's config first, since parsing it resets the log level.
+    streamlit_config.get_config_options()
+    set_log_level("error")
+    results = {str(scale): run_scale(scale, args.repeat) for scale in args.scales}
+    print(format_results(results))
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.update:
+        scales = {**baseline.get("scales", {}), **results}
+        args.baseline.write_text(json.dumps(
+            {"thresholds": baseline.get("thresholds", THRESHOLDS), "environment": environment(), "scales": scales},
+            indent=2,
+        ) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""Load test of the HTTP data API: requests/sec and latency per scenario.
+
+Without --url, the API is started in a subprocess over a scratch store built
+from 1x synthetic data, so the client threads do not share its interpreter:
+
+    python benchmarks/loadtest.py
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000 --concurrency 16
+"""
+
+import argparse
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from http.client import HTTPConnection
+from pathlib import Path
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "src"), str(ROOT)]
+
+import numpy as np
+
+import load
+import marts
+import transform
+from paths import RAW_PATH
+from tests.synthetic import make_scaled_frame, write_owid_csv
+COUNTRIES = [f"Country {i:05d}" for i in range(200)]
+
+# Each scenario is a function of the request number returning (target, headers).
+SCENARIOS = {
+    # One popular query: served from the response cache.
+    "hot": lambda i: ("/top?metric=cumulative_co2&k=15&countries_only=true", {}),
+    # A spread of series: misses until each has been built once.
+    "varied": lambda i: (f"/series?country={COUNTRIES[i % len(COUNTRIES)].replace(' ', '+')}&metrics=co2,gdp", {}),
+    # A whole year per request, compressed.
+    "gzip": lambda i: (f"/cross-section?year={1950 + i % 70}&metrics=co2,gdp,population", {"Accept-Encoding": "gzip"}),
+    # Arrow IPC instead of JSON.
+    "arrow": lambda i: (f"/cross-section?year={1950 + i % 70}&metrics=co2,gdp,population&format=arrow", {}),
+    # Clients revalidating a copy they hold: 304s with no body.
+    "revalidate": lambda i: ("/top?metric=cumulative_co2&k=15&countries_only=true", {"If-None-Match": "{etag}"}),
+}
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def build_store(workspace: Path):
+    previous_cwd = Path.cwd()
+    os.chdir(workspace)
+    try:
+        write_owid_csv(RAW_PATH, make_scaled_frame(1))
+        transform.SQL_DIR = ROOT / "src" / "sql"
+        marts.MART_DIR = ROOT / "src" / "sql" / "marts"
+        transform.transform_data(cache_dir=None)
+        load.load_data()
+    finally:
+        os.chdir(previous_cwd)
+
+@contextmanager
+def local_instance():
+    """Base URL of an API subprocess serving a scratch synthetic store."""
+    with tempfile.TemporaryDirectory(prefix="co2-loadtest-") as workspace:
+        build_store(Path(workspace))
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, str(ROOT / "src" / "api.py"), "--port", str(port)],
+            cwd=workspace, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                    break
+                except OSError:
+                    if process.poll() is not None or time.monotonic() > deadline:
+                        raise RuntimeError("API did not start")
+                    time.sleep(0.1)
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            process.terminate()
+            process.wait()
+
+def run_scenario(base_url: str, scenario, requests: int, concurrency: int) -> dict:
+    """Send `requests` requests over `concurrency` keep-alive connections."""
+    url = urlsplit(base_url)
+    latencies, statuses, lock = [], {}, threading.Lock()
+    counter = iter(range(requests))
+    etag = _etag(url, scenario)
+
+    def worker():
+        con = HTTPConnection(url.hostname, url.port)
+        mine = []
+        for i in counter:
+            target, headers = scenario(i)
+            headers = {name: value.format(etag=etag) for name, value in headers.items()}
+            start = time.perf_counter()
+            con.request("GET", target, headers=headers)
+            response = con.getresponse()
+            response.read()
+            mine.append(time.perf_counter() - start)
+            with lock:
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+        con.close()
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    ms = np.array(latencies) * 1000
+    return {
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "statuses": statuses,
+    }
+
+def _etag(url, scenario):
+    target, _ = scenario(0)
+    con = HTTPConnection(url.hostname, url.port)
+    con.request("GET", target)
+    response = con.getresponse()
+    response.read()
+    con.close()
+    return response.getheader("ETag") or ""
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="an already running API; by default a local one is started")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(logging.ERROR)
+
+    with (nullcontext(args.url) if args.url else local_instance()) as base_url:
+        print(f"{args.requests} requests per scenario, {args.concurrency} connections, {os.cpu_count()} CPUs")
+        print(f"{'scenario':12s} {'req/s':>9s} {'p50':>9s} {'p95':>9s}  statuses")
+        for name in args.scenarios:
+            result = run_scenario(base_url, SCENARIOS[name], args.requests, args.concurrency)
+            print(f"{name:12s} {result['requests_per_second']:>9.1f} {result['p50_ms']:>7.2f}ms "
+                  f"{result['p95_ms']:>7.2f}ms  {result['statuses']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Python memory allocated by each Streamlit rerun of the app, per page.
+
+The app runs headless (streamlit.testing) over 1x synthetic pipeline output.
+Each page is run once to warm the caches, then rerun `--reruns` times under
+tracemalloc, which sees NumPy and pandas buffers as well as Python objects:
+
+    python benchmarks/rerun_alloc.py
+    python benchmarks/rerun_alloc.py --pages Home --reruns 20
+
+"peak" is the most memory a rerun held above what was live when it started,
+"retained" what it left allocated.
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import tracemalloc
+import warnings
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "src"), str(ROOT)]
+
+from streamlit import config as streamlit_config
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.workers import build_workspace
+
+PAGES = ["Home", "Architecture", "Data Stories"]
+
+def measure_page(app: AppTest, page: str, reruns: int) -> dict:
+    app.session_state.current_page = page
+    app.run()
+    peaks, retained = [], []
+    for _ in range(reruns):
+        tracemalloc.start()
+        start, _ = tracemalloc.get_traced_memory()
+        app.run()
+        end, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak - start)
+        retained.append(end - start)
+    if app.exception:
+        raise RuntimeError(f"{page}: {app.exception[0].value}")
+    return {"peak_mb": statistics.median(peaks) / 2**20, "retained_mb": statistics.median(retained) / 2**20}
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", nargs="+", default=PAGES, choices=PAGES)
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    logging.getLogger().setLevel(logging.ERROR)
+    warnings.simplefilter("ignore")
+    streamlit_config.get_config_options()
+    set_log_level("error")
+    previous_cwd = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="co2-rerun-") as workspace:
+        build_workspace(Path(workspace), args.scale)
+        os.chdir(workspace)
+        try:
+            app = AppTest.from_file(str(ROOT / "app.py"), default_timeout=120)
+            app.run()
+            print(f"{args.scale}x data, median of {args.reruns} reruns per page")
+            print(f"{'page':14s} {'peak':>10s} {'retained':>10s}")
+            for page in args.pages:
+                result = measure_page(app, page, args.reruns)
+                print(f"{page:14s} {result['peak_mb']:>8.2f}MB {result['retained_mb']:>8.2f}MB")
+        finally:
+            os.chdir(previous_cwd)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
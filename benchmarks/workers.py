@@ -0,0 +1,135 @@
+"""Per-process memory of app workers loading the data, with 1, 4 and 8 workers.
+
+Each worker is a separate process doing what an app replica does at startup:
+load the story frame from one source, build the query index over it and read
+every column once. All workers of a run stay alive until each has been
+measured, so shared pages are counted while they are actually shared:
+
+    python benchmarks/workers.py                     # 10x synthetic data
+    python benchmarks/workers.py --workers 1 4 --sources snapshot duckdb
+
+RSS counts every resident page a process maps, including page cache pages of
+the snapshot that all workers share; PSS divides shared pages among their
+users, and private memory is what each additional worker really costs.
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT / "src"), str(ROOT)]
+
+FIELDS = {"Rss": "rss_mb", "Pss": "pss_mb", "Private_Clean": "private_mb", "Private_Dirty": "private_mb"}
+
+def memory() -> dict:
+    """RSS, PSS and private memory of this process in MB, from /proc/self/smaps_rollup."""
+    result = dict.fromkeys(FIELDS.values(), 0.0)
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in FIELDS:
+                result[FIELDS[name]] += int(value.split()[0]) / 1024
+    return result
+
+def worker(source: str):
+    """Load and index the frame, report ready, then report memory when asked."""
+    import numpy as np
+
+    from datasource import load_frame
+    from query import CO2Query
+
+    before = memory()
+    df, _, seconds = load_frame([source])
+    query = CO2Query(df)
+    for name in query.data.columns:
+        column = query.data[name]
+        if column.dtype.kind in "biuf":
+            np.asarray(column).sum()
+    print("ready", flush=True)
+    sys.stdin.readline()
+    after = memory()
+    print(json.dumps({"load_seconds": seconds, "imports_rss_mb": before["rss_mb"], **after}), flush=True)
+    sys.stdin.readline()
+
+def measure(workspace: Path, source: str, workers: int) -> list:
+    processes = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--worker", source], cwd=workspace, text=True,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        for _ in range(workers)
+    ]
+    try:
+        for process in processes:
+            if process.stdout.readline().strip() != "ready":
+                raise RuntimeError(f"{source} worker failed to load")
+        results = []
+        for process in processes:
+            process.stdin.write("\n")
+            process.stdin.flush()
+            results.append(json.loads(process.stdout.readline()))
+        return results
+    finally:
+        for process in processes:
+            process.stdin.close()
+            process.wait()
+
+def build_workspace(workspace: Path, scale: int):
+    """The pipeline's outputs for `scale`x synthetic data: store, Parquet and snapshot."""
+    import load
+    import marts
+    import transform
+    from paths import RAW_PATH
+    from snapshot import publish_snapshot
+    from tests.synthetic import make_scaled_frame, write_owid_csv
+
+    previous_cwd = Path.cwd()
+    os.chdir(workspace)
+    try:
+        write_owid_csv(RAW_PATH, make_scaled_frame(scale))
+        transform.SQL_DIR = ROOT / "src" / "sql"
+        marts.MART_DIR = ROOT / "src" / "sql" / "marts"
+        transform.transform_data(cache_dir=None)
+        load.load_data()
+        publish_snapshot()
+    finally:
+        os.chdir(previous_cwd)
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--sources", nargs="+", default=["snapshot", "duckdb", "parquet"])
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.worker:
+        worker(args.worker)
+        return 0
+
+    from paths import SNAPSHOT_PATH
+
+    logging.getLogger().setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory(prefix="co2-workers-") as workspace:
+        build_workspace(Path(workspace), args.scale)
+        snapshot_mb = (Path(workspace) / SNAPSHOT_PATH).stat().st_size / 2**20
+        print(f"{args.scale}x data, snapshot {snapshot_mb:.1f} MB, {os.cpu_count()} CPUs; MB per worker (mean)")
+        print(f"{'source':10s} {'workers':>7s} {'load':>8s} {'rss':>8s} {'pss':>8s} {'private':>8s} {'data rss':>9s} {'total pss':>10s}")
+        for source in args.sources:
+            for workers in args.workers:
+                results = measure(Path(workspace), source, workers)
+                mean = {key: sum(r[key] for r in results) / workers for key in results[0]}
+                print(
+                    f"{source:10s} {workers:>7d} {mean['load_seconds'] * 1000:>6.0f}ms {mean['rss_mb']:>8.1f} "
+                    f"{mean['pss_mb']:>8.1f} {mean['private_mb']:>8.1f} {mean['rss_mb'] - mean['imports_rss_mb']:>9.1f} "
+                    f"{mean['pss_mb'] * workers:>10.1f}"
+                )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+import gzip
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pyarrow as pa
+
+from datasource import LOCAL_SOURCES, data_version, load_frame
+from figcache import cache_key
+from query import CO2Query
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+HOST = "127.0.0.1"
+PORT = 8000
+CHECK_INTERVAL = 1.0
+CACHE_ENTRIES = 256
+GZIP_MIN_BYTES = 1024
+MAX_K = 1000
+
+JSON_TYPE = "application/json"
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+FORMATS = {"json": JSON_TYPE, "arrow": ARROW_TYPE}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# ------------------------------------------------------------------------------
+# Data
+# ------------------------------------------------------------------------------
+
+class DataService:
+    """The story frame and its query index, reloaded when the pipeline publishes new data.
+
+    The source's data version (file size and mtime) is checked at most every
+    `check_interval` seconds, so the hot path does not stat the store on every
+    request.
+    """
+
+    def __init__(self, sources=LOCAL_SOURCES, check_interval=CHECK_INTERVAL):
+        self.sources = sources
+        self.check_interval = check_interval
+        self.source = None
+        self._current = (None, None)
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        """(data version, CO2Query), loading the data first if it changed."""
+        if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return self._current
+        with self._lock:
+            if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval:
+                version, query = self._current
+                if query is None or data_version(self.source, query.data) != version:
+                    df, self.source, seconds = load_frame(self.sources)
+                    self._current = (data_version(self.source, df), CO2Query(df))
+                    logging.info(f"Serving {self._current[0]} ({len(df)} rows, loaded in {seconds:.2f}s)")
+                self._checked_at = time.monotonic()
+            return self._current
+
+
+# ------------------------------------------------------------------------------
+# Endpoints
+#
+# Each endpoint parses its query string into a normalized tuple of arguments,
+# so equivalent requests share an ETag and a cache entry, and then calls the
+# matching CO2Query lookup. List parameters may be repeated or comma-separated
+# (countries only repeated, since names can contain commas).
+# ------------------------------------------------------------------------------
+
+def _one(params, name, default=None, convert=str):
+    values = params.get(name)
+    if not values:
+        if default is None:
+            raise BadRequest(f"missing parameter: {name}")
+        return default
+    try:
+        return convert(values[-1])
+    except ValueError:
+        raise BadRequest(f"invalid {name}: {values[-1]!r}") from None
+
+def _flag(value: str) -> bool:
+    if value.lower() not in ("1", "true", "0", "false"):
+        raise ValueError(value)
+    return value.lower() in ("1", "true")
+
+def _metrics(params, query, name="metrics"):
+    metrics = tuple(m for value in params.get(name, ["co2"]) for m in value.split(",") if m)
+    unknown = [m for m in metrics if m in ("country", "year") or m not in query.data.columns]
+    if not metrics or unknown:
+        raise BadRequest(f"unknown {name}: {', '.join(unknown) or '(none)'}")
+    return metrics
+
+def _series_args(params, query):
+    countries = tuple(sorted(set(params.get("country", []))))
+    if not countries:
+        raise BadRequest("missing parameter: country")
+    first, last = (_one(params, name, "", str) for name in ("from", "to"))
+    try:
+        years = (int(first) if first else None, int(last) if last else None)
+    except ValueError:
+        raise BadRequest(f"invalid year range: {first!r}-{last!r}") from None
+    return countries, _metrics(params, query), years
+
+def _cross_section_args(params, query):
+    return _one(params, "year", convert=int), _metrics(params, query), _one(params, "countries_only", False, _flag)
+
+def _top_args(params, query):
+    k = _one(params, "k", 10, int)
+    if not 0 < k <= MAX_K:
+        raise BadRequest(f"k must be between 1 and {MAX_K}")
+    return (
+        _one(params, "year", query.latest_year, int),
+        _metrics(params, query, "metric")[0],
+        k,
+        _one(params, "countries_only", False, _flag),
+    )
+
+ENDPOINTS = {
+    "/series": (_series_args, lambda query, args: query.series(*args)),
+    "/cross-section": (_cross_section_args, lambda query, args: query.cross_section(*args)),
+    "/top": (_top_args, lambda query, args: query.top_k(*args)),
+}
+
+
+# ------------------------------------------------------------------------------
+# Responses
+# ------------------------------------------------------------------------------
+
+def encode(df, fmt: str) -> bytes:
+    """A result frame as a JSON array of records or an Arrow IPC stream."""
+    if fmt == "json":
+        return df.to_json(orient="records").encode()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def response_format(params, accept: str) -> str:
+    if "format" in params:
+        fmt = params["format"][-1]
+        if fmt not in FORMATS:
+            raise BadRequest(f"unknown format: {fmt!r}")
+        return fmt
+    return "arrow" if ARROW_TYPE in (accept or "") else "json"
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip().removeprefix("W/") for tag in (if_none_match or "").split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    """Encoded response bodies by ETag, with their gzipped form made on first use."""
+
+    def __init__(self, max_entries=CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, etag: str, build) -> dict:
+        """The entry for `etag`, calling `build` for its body on a miss."""
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+                self.hits += 1
+                return entry
+        entry = {"identity": build(), "gzip": None}
+        with self._lock:
+            self.misses += 1
+            self._entries[etag] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    @staticmethod
+    def gzipped(entry: dict) -> bytes:
+        if entry["gzip"] is None:
+            entry["gzip"] = gzip.compress(entry["identity"], compresslevel=6)
+        return entry["gzip"]
+
+
+class API:
+    """Resolves a request to (status, headers, body); independent of the HTTP server."""
+
+    def __init__(self, service=None, cache=None):
+        self.service = service or DataService()
+        self.cache = cache or ResponseCache()
+
+    def handle(self, target: str, headers) -> tuple:
+        url = urlsplit(target)
+        endpoint = ENDPOINTS.get(url.path)
+        if endpoint is None:
+            return self._error(404, f"no such endpoint: {url.path}")
+        parse, lookup = endpoint
+        params = parse_qs(url.query)
+        try:
+            version, query = self.service.current()
+        except FileNotFoundError as e:
+            return self._error(503, str(e))
+        try:
+            fmt = response_format(params, headers.get("Accept"))
+            args = parse(params, query)
+        except BadRequest as e:
+            return self._error(400, str(e))
+
+        # Weak, since the same tag covers the gzipped and the identity body.
+        etag = f'"{cache_key(version, url.path, args, fmt)[:32]}"'
+        response_headers = {
+            "ETag": f"W/{etag}",
+            "Cache-Control": "no-cache",
+            "Vary": "Accept, Accept-Encoding",
+            "X-Data-Version": version,
+        }
+        if etag_matches(headers.get("If-None-Match"), etag):
+            return 304, response_headers, b""
+
+        entry = self.cache.get(etag, lambda: encode(lookup(query, args), fmt))
+        body = entry["identity"]
+        if "gzip" in (headers.get("Accept-Encoding") or "") and len(body) >= GZIP_MIN_BYTES:
+            body = self.cache.gzipped(entry)
+            response_headers["Content-Encoding"] = "gzip"
+        response_headers["Content-Type"] = FORMATS[fmt]
+        return 200, response_headers, body
+
+    @staticmethod
+    def _error(status: int, message: str) -> tuple:
+        return status, {"Content-Type": JSON_TYPE}, json.dumps({"error": message}).encode()
+
+
+def make_server(api=None, host=HOST, port=PORT) -> ThreadingHTTPServer:
+    """A threaded HTTP/1.1 server for `api`; port 0 picks a free port."""
+    api = api or API()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Buffer the headers and body into one write, and send it without
+        # waiting on Nagle's algorithm: otherwise every keep-alive response
+        # stalls ~40ms on the client's delayed ACK.
+        wbufsize = 64 * 1024
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            logging.debug(format % args)
+
+        def do_GET(self):
+            status, headers, body = api.handle(self.path, self.headers)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if status != 304:
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.api = api
+    return server
+
+
+if __name__ == "__main__":
+    # Serve the processed data, e.g. `python src/api.py --port 8000`, then
+    # GET /series?country=India&metrics=co2,gdp&from=1990
+    #     /cross-section?year=2018&metrics=co2_per_capita&countries_only=true
+    #     /top?metric=cumulative_co2&k=15&format=arrow
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HTTP API over the processed CO2 data.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    args = parser.parse_args()
+    server = make_server(host=args.host, port=args.port)
+    server.api.service.current()
+    logging.info(f"Listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,390 @@
+import hashlib
+import importlib
+import logging
+import numbers
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+# Shallow copies handed to callers rely on copy-on-write, which is always on
+# from pandas 3 and opt-in before it.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# A sibling module in the pipeline, part of the src package in the app.
+if __package__:
+    from .paths import DB_PATH, OWID_URL, PROCESSED_PATH, RUNS_PATH, SNAPSHOT_PATH
+else:
+    from paths import DB_PATH, OWID_URL, PROCESSED_PATH, RUNS_PATH, SNAPSHOT_PATH
+
+MIN_YEAR = 1950
+COLUMNS = {
+    "country": "VARCHAR",
+    "year": "BIGINT",
+    "iso_code": "VARCHAR",
+    "population": "DOUBLE",
+    "gdp": "DOUBLE",
+    "co2": "DOUBLE",
+    "co2_per_capita": "DOUBLE",
+    "cumulative_co2": "DOUBLE",
+    "coal_co2": "DOUBLE",
+    "oil_co2": "DOUBLE",
+    "gas_co2": "DOUBLE",
+    "cement_co2": "DOUBLE",
+    "flaring_co2": "DOUBLE",
+    "share_global_co2": "DOUBLE",
+    "consumption_co2": "DOUBLE",
+}
+# Registry metrics (src/metrics.py) the stories plot. The transform computes
+# them over each country's full history, so they are read, not re-derived.
+STORY_METRICS = ["co2_yoy_pct", "gdp_per_capita", "gdp_index_1990", "co2_index_1990"]
+RAW_COLUMNS = list(COLUMNS)
+COLUMNS.update(dict.fromkeys(STORY_METRICS, "DOUBLE"))
+
+# Measures the stories plot as-is are held as float32. population and gdp exceed
+# float32's 24-bit mantissa, and stories derive ratios and growth rates from
+# gdp, population and co2, so those stay float64.
+FLOAT32_COLUMNS = [
+    "co2_per_capita", "cumulative_co2", "coal_co2", "oil_co2", "gas_co2",
+    "cement_co2", "flaring_co2", "share_global_co2", "consumption_co2",
+]
+
+LOCAL_SOURCES = ("snapshot", "duckdb", "parquet")
+
+THREADS = int(os.environ.get("CO2_DB_THREADS", "2"))
+MEMORY_LIMIT = os.environ.get("CO2_DB_MEMORY_LIMIT", "512MB")
+
+# Each story mart is prepared on every cursor, as a statement named after its table.
+MART_TABLES_SQL = "SELECT table_name FROM duckdb_tables() WHERE table_name LIKE 'mart\\_%' ESCAPE '\\'"
+
+
+def _literal(value) -> str:
+    """A SQL literal, for statements like SET that DuckDB does not bind parameters to."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, bool) or not isinstance(value, numbers.Real):
+        raise TypeError(f"Unsupported statement argument: {value!r}")
+    return str(int(value)) if isinstance(value, numbers.Integral) else repr(float(value))
+
+
+class ConnectionManager:
+    """Process-wide read-only access to the DuckDB store for concurrent sessions.
+
+    One read-only connection, limited to `threads` and `memory_limit`, hands
+    out one cursor per thread, each with the story marts prepared. Cursors are used through `with manager.cursor() as cur:`. The
+    limits are SET after connecting rather than passed as connect() config:
+    DuckDB refuses a second connection to a file with a different config, and
+    tests and tools still open the store with plain read-only connections.
+
+    The pipeline replaces the store file atomically. When the file changes,
+    the next caller waits for in-flight queries to finish, closes the old
+    connection and opens the new file. The old connection must be closed
+    first: while any connection to a path is open, DuckDB's in-process
+    instance cache hands new connections the already-open (old) database.
+    """
+
+    def __init__(self, db_path=DB_PATH, threads=THREADS, memory_limit=MEMORY_LIMIT):
+        self.db_path = Path(db_path)
+        self.config = {"threads": threads, "memory_limit": memory_limit}
+        self.generation = 0
+        self.marts = frozenset()
+        self._con = None
+        self._file = None
+        self._active = 0
+        self._cursors = {}
+        self._state = threading.Condition()
+
+    def _file_identity(self):
+        stat = self.db_path.stat()
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _reopen(self, identity):
+        if self._con is not None:
+            self._con.close()  # also closes every cursor on it
+        self._cursors = {}
+        self._con = duckdb.connect(str(self.db_path), read_only=True)
+        self._con.execute(f"SET threads = {int(self.config['threads'])}")
+        self._con.execute(f"SET memory_limit = {_literal(self.config['memory_limit'])}")
+        self.marts = frozenset(table for (table,) in self._con.execute(MART_TABLES_SQL).fetchall())
+        self._file = identity
+        self.generation += 1
+        logging.info(f"Opened {self.db_path} (generation {self.generation})")
+
+    def _thread_cursor(self):
+        key = threading.get_ident()
+        cursor = self._cursors.get(key)
+        if cursor is None:
+            # Drop cursors of finished threads (Streamlit runs each rerun on a new one).
+            alive = {thread.ident for thread in threading.enumerate()}
+            for ident in [ident for ident in self._cursors if ident not in alive]:
+                self._cursors.pop(ident).close()
+            cursor = self._con.cursor()
+            for table in self.marts:
+                cursor.execute(f"PREPARE {table} AS SELECT * FROM {table}")
+            self._cursors[key] = cursor
+        return cursor
+
+    @contextmanager
+    def cursor(self):
+        """This thread's cursor on the current store file."""
+        with self._state:
+            identity = self._file_identity()
+            if identity != self._file:
+                self._state.wait_for(lambda: self._active == 0)
+                if self._file_identity() != self._file:
+                    self._reopen(self._file_identity())
+            self._active += 1
+            cursor = self._thread_cursor()
+        try:
+            yield cursor
+        finally:
+            with self._state:
+                self._active -= 1
+                if self._active == 0:
+                    self._state.notify_all()
+
+    def execute(self, name: str) -> pd.DataFrame:
+        """Run the prepared statement `name`."""
+        with self.cursor() as cur:
+            return cur.execute(f"EXECUTE {name}").df()
+
+    def query(self, sql: str, params=None) -> pd.DataFrame:
+        with self.cursor() as cur:
+            return cur.execute(sql, params).df()
+
+    def table(self, name: str):
+        """A whole table of the store, or None if there is no such table or no store file.
+
+        Story marts are read through their prepared statement.
+        """
+        try:
+            if name in self.marts:
+                return self.execute(name)
+            return self.query(f"SELECT * FROM {name}")
+        except (duckdb.CatalogException, duckdb.BinderException, FileNotFoundError):
+            # BinderException: the mart vanished in a store swap since the check.
+            return None
+
+    def close(self):
+        with self._state:
+            self._state.wait_for(lambda: self._active == 0)
+            if self._con is not None:
+                self._con.close()
+            self._con, self._file, self._cursors = None, None, {}
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def store_connections(db_path=DB_PATH) -> ConnectionManager:
+    """The process-wide manager for the store at `db_path`, created on first use."""
+    key = Path(db_path).resolve()
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = ConnectionManager(key)
+        return _managers[key]
+
+
+def _projection() -> str:
+    return ", ".join(f"CAST({name} AS {sql_type}) AS {name}" for name, sql_type in COLUMNS.items())
+
+
+def read_store(db_path=DB_PATH) -> pd.DataFrame:
+    return store_connections(db_path).query(
+        f"SELECT {_projection()} FROM co2_emissions WHERE year >= ? ORDER BY country, year", [MIN_YEAR]
+    )
+
+
+def read_mart(name: str, db_path=DB_PATH):
+    """A story's precomputed plotting frame, or None if the store has no such mart."""
+    return store_connections(db_path).table(name)
+
+
+def read_pipeline_runs(path=RUNS_PATH):
+    """Per-stage metrics of every recorded pipeline run, or None if there are none.
+
+    The runs file is opened only for the read, so the pipeline can append to it.
+    """
+    if not Path(path).exists():
+        return None
+    try:
+        con = duckdb.connect(str(path), read_only=True)
+    except duckdb.IOException:
+        # The pipeline is recording a run right now.
+        return None
+    try:
+        runs = con.execute("SELECT * FROM pipeline_runs ORDER BY started_at").df()
+    except duckdb.CatalogException:
+        return None
+    finally:
+        con.close()
+    return None if runs.empty else runs
+
+
+def read_snapshot(path=SNAPSHOT_PATH) -> pd.DataFrame:
+    """The compact story frame from the pipeline's Arrow IPC snapshot, memory-mapped.
+
+    Nothing is parsed: the numeric columns are read-only views of the mapped
+    file, so processes serving the same snapshot share its page cache pages.
+    Only the categorical codes and is_aggregate (bit-packed in Arrow) are
+    materialized per process. The mapping stays valid after the pipeline
+    replaces the file.
+    """
+    table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def read_processed(path=PROCESSED_PATH) -> pd.DataFrame:
+    path = Path(path)
+    scan = f"read_parquet('{path}/**/*.parquet', hive_partitioning = false)" if path.is_dir() else f"read_parquet('{path}')"
+    con = duckdb.connect()
+    try:
+        return con.execute(f"SELECT {_projection()} FROM {scan} WHERE year >= ? ORDER BY country, year", [MIN_YEAR]).df()
+    finally:
+        con.close()
+
+
+def _metric_registry():
+    # Imported on first use, like paths above; only the remote source needs it.
+    return importlib.import_module(f"{__package__}.metrics" if __package__ else "metrics")
+
+
+def read_remote_csv(url=OWID_URL) -> pd.DataFrame:
+    """The raw OWID CSV, with STORY_METRICS compiled from the registry as the transform does."""
+    metrics = _metric_registry()
+    selected = [metric for metric in metrics.METRICS if metric["name"] in STORY_METRICS]
+    con = duckdb.connect()
+    try:
+        con.register("raw", pd.read_csv(url, usecols=RAW_COLUMNS))
+        return con.execute(f"""
+            SELECT {_projection()} FROM (
+                SELECT *, {metrics.metrics_select(selected)}
+                FROM raw
+                WINDOW by_country AS (PARTITION BY country), by_year AS (PARTITION BY country ORDER BY year)
+            )
+            WHERE year >= ? ORDER BY country, year
+        """, [MIN_YEAR]).df()
+    finally:
+        con.close()
+
+
+def data_version(source: str, df: pd.DataFrame) -> str:
+    """A fingerprint of the data served from `source`, for keying derived caches.
+
+    Local sources are identified by their files' size and mtime (the pipeline
+    replaces them atomically); the remote CSV by hashing the frame itself.
+    """
+    if source == "remote":
+        return "remote-" + format(int(pd.util.hash_pandas_object(df).sum()) & (2**64 - 1), "x")
+    path = Path(READERS[source][1])
+    files = sorted(path.rglob("*")) if path.is_dir() else [path]
+    stats = [(str(f), f.stat().st_size, f.stat().st_mtime_ns) for f in files if f.is_file()]
+    return f"{source}-" + hashlib.sha256(repr(stats).encode()).hexdigest()[:16]
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """The story frame in compact form.
+
+    country and iso_code become categoricals, is_aggregate flags entities with
+    no ISO code (World, continents, income groups), year is int16, and measures
+    have gaps filled with 0 and are float32 where FLOAT32_COLUMNS allows.
+    """
+    out = pd.DataFrame({
+        "country": df["country"].astype("category"),
+        "year": df["year"].astype("int16"),
+        "iso_code": df["iso_code"].astype("category"),
+        "is_aggregate": df["iso_code"].isna().to_numpy(),
+    })
+    for name in df.columns.drop(["country", "year", "iso_code"]):
+        out[name] = df[name].fillna(0).astype("float32" if name in FLOAT32_COLUMNS else "float64")
+    return out
+
+
+class FrameHandle:
+    """A loaded story frame shared by every session, never copied per caller.
+
+    The frame itself is not exposed; view() returns a shallow copy. Under
+    pandas' copy-on-write a view costs no data copy, its arrays are read-only
+    through to_numpy(), writing to it copies just the columns written, and
+    adding columns to it leaves the shared frame as it was.
+    """
+
+    def __init__(self, df: pd.DataFrame, source=None, load_seconds=0.0):
+        self._df = df
+        self.source = source
+        self.load_seconds = load_seconds
+        self.version = data_version(source, df) if source else None
+
+    def view(self) -> pd.DataFrame:
+        return self._df.copy(deep=False)
+
+
+def memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Per-column dtype and bytes held, including string storage."""
+    usage = df.memory_usage(deep=True, index=False)
+    return pd.DataFrame({"dtype": df.dtypes.astype(str), "bytes": usage})
+
+
+READERS = {
+    "snapshot": (read_snapshot, SNAPSHOT_PATH),
+    "duckdb": (read_store, DB_PATH),
+    "parquet": (read_processed, PROCESSED_PATH),
+    "remote": (read_remote_csv, OWID_URL),
+}
+
+
+def load_frame(sources=LOCAL_SOURCES):
+    """Load the compact story frame from the first available source in `sources`.
+
+    The local sources read what the pipeline produced, projecting only the
+    story columns and pushing the year filter into the scan; the snapshot is
+    already in compact form and is only mapped. Local sources are
+    skipped when their file does not exist; the remote CSV is only tried when
+    "remote" is listed. Returns (df, source name, load time in seconds).
+    """
+    errors = []
+    for source in sources:
+        reader, location = READERS[source]
+        if source != "remote" and not Path(location).exists():
+            errors.append(f"{source}: {location} not found")
+            continue
+        start = time.perf_counter()
+        try:
+            df = reader(location)
+        except Exception as e:
+            logging.warning(f"Could not read {source} source {location}: {e}")
+            errors.append(f"{source}: {e}")
+            continue
+        if source != "snapshot":
+            df = compact(df)
+        return df, source, time.perf_counter() - start
+    raise FileNotFoundError("No data source available (" + "; ".join(errors) + ")")
+
+
+if __name__ == "__main__":
+    # Report cold load time for every source, e.g. `python src/datasource.py`.
+    for source in READERS:
+        try:
+            df, _, seconds = load_frame([source])
+            print(f"{source:8s} {seconds * 1000:8.1f} ms  {len(df)} rows")
+        except Exception as e:
+            print(f"{source:8s} unavailable ({e})")
+
+    # Memory per column of the plain frame (object strings, float64) vs compact.
+    for source in ("duckdb", "parquet"):
+        reader, location = READERS[source]
+        if Path(location).exists():
+            plain = reader(location).fillna(0)
+            report = memory_report(plain).join(memory_report(compact(plain)), how="right", lsuffix="_plain", rsuffix="_compact")
+            report.loc["total"] = ["", report["bytes_plain"].sum(), "", report["bytes_compact"].sum()]
+            print(report.to_string())
+            break
@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+TIMEOUT = (3.05, 5)  # (connect, read) seconds
+MAX_AGE = 300
+FIRST_FETCH_WAIT = 1.0
+
+
+class DocumentFetcher:
+    """A remote text document served from memory and refreshed in the background.
+
+    One instance is meant to be shared by every session. get() never waits on
+    the network longer than `first_fetch_wait`: it returns the cached copy at
+    once, starting a refresh on a background thread when that copy is older
+    than `max_age`. Refreshes send the cached ETag so an unchanged document
+    costs a 304. Until a fetch has succeeded, the bundled `fallback_path` is
+    served instead.
+    """
+
+    def __init__(self, url, fallback_path, max_age=MAX_AGE, timeout=TIMEOUT, first_fetch_wait=FIRST_FETCH_WAIT):
+        self.url = url
+        self.fallback_path = Path(fallback_path)
+        self.max_age = max_age
+        self.timeout = timeout
+        self.first_fetch_wait = first_fetch_wait
+        self.text = None
+        self.etag = None
+        self.checked_at = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._refresh = None
+
+    def get(self):
+        """(text, source): source is "remote", or "bundled" when no fetch has succeeded yet."""
+        refresh = self.refresh_in_background()
+        if self.text is None and refresh is not None:
+            refresh.join(self.first_fetch_wait)
+        with self._lock:
+            if self.text is not None:
+                return self.text, "remote"
+        return self.fallback_path.read_text(encoding="utf-8"), "bundled"
+
+    def is_stale(self) -> bool:
+        return self.checked_at is None or time.monotonic() - self.checked_at >= self.max_age
+
+    def refresh_in_background(self):
+        """Start a refresh if the copy is stale and none is running; returns the running one, if any."""
+        with self._lock:
+            if self._refresh is None and self.is_stale():
+                self._refresh = threading.Thread(target=self._run_refresh, name="document-refresh", daemon=True)
+                self._refresh.start()
+            return self._refresh
+
+    def _run_refresh(self):
+        try:
+            self.refresh()
+        finally:
+            with self._lock:
+                self._refresh = None
+
+    def refresh(self) -> bool:
+        """Revalidate the document now. Returns True if a new copy was stored.
+
+        Failures keep the previous copy and are retried after `max_age`.
+        """
+        headers = {"If-None-Match": self.etag} if self.etag and self.text is not None else {}
+        try:
+            response = requests.get(self.url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                changed = False
+            else:
+                response.raise_for_status()
+                changed = True
+        except requests.RequestException as e:
+            logging.warning(f"Could not fetch {self.url}: {e}")
+            with self._lock:
+                self.error = str(e)
+                self.checked_at = time.monotonic()
+            return False
+
+        with self._lock:
+            if changed:
+                self.text = response.content.decode("utf-8", errors="replace")
+                self.etag = response.headers.get("ETag")
+            self.error = None
+            self.checked_at = time.monotonic()
+        return changed
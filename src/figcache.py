@@ -0,0 +1,113 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import plotly.io as pio
+
+MAX_ENTRIES = 64
+
+
+def cache_key(*parts) -> str:
+    """A stable digest of e.g. (story module, data fingerprint, parameters)."""
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+class FigureCache:
+    """Serialized Plotly figures shared by all sessions.
+
+    Figures are kept in an in-memory LRU of `max_entries`, as JSON and as the
+    built figure, and, when `disk_dir` is set, written there as JSON so they
+    survive restarts. Concurrent misses on the same key wait for a single
+    build instead of each building.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, disk_dir=None):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries = OrderedDict()
+        self._building = {}
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+
+    def _disk_path(self, key):
+        return self.disk_dir / f"{key}.json"
+
+    def _remember(self, key, payload, figure=None):
+        with self._lock:
+            self._entries[key] = entry = [payload, figure]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def _read_disk(self, key):
+        if self.disk_dir is None:
+            return None
+        try:
+            return self._disk_path(key).read_text()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key, payload):
+        if self.disk_dir is None:
+            return
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._disk_path(key).with_suffix(f".{threading.get_ident()}.tmp")
+            tmp_path.write_text(payload)
+            os.replace(tmp_path, self._disk_path(key))
+        except OSError as e:
+            logging.warning(f"Could not write figure cache entry {key}: {e}")
+
+    def _entry(self, key, build):
+        """The [json, figure or None] entry for `key`, calling `build()` only on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            building = self._building.setdefault(key, threading.Lock())
+
+        try:
+            with building:
+                # Another session may have built it while we waited.
+                with self._lock:
+                    if key in self._entries:
+                        self.hits += 1
+                        return self._entries[key]
+                payload = self._read_disk(key)
+                if payload is not None:
+                    with self._lock:
+                        self.disk_hits += 1
+                    return self._remember(key, payload)
+                figure = build()
+                payload = figure.to_json()
+                with self._lock:
+                    self.misses += 1
+                self._write_disk(key, payload)
+                return self._remember(key, payload, figure)
+        finally:
+            with self._lock:
+                self._building.pop(key, None)
+
+    def get_json(self, key, build) -> str:
+        """The figure JSON for `key`, calling `build()` for a figure only on a miss."""
+        return self._entry(key, build)[0]
+
+    def get(self, key, build):
+        """The Plotly figure for `key`, shared by every caller: do not modify it.
+
+        Hits return the figure built on the miss, so they skip figure
+        construction; one read from disk is parsed once, on its first use.
+        """
+        entry = self._entry(key, build)
+        if entry[1] is None:
+            entry[1] = pio.from_json(entry[0])
+        return entry[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses, "entries": len(self._entries)}
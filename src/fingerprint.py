@@ -0,0 +1,41 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from paths import MANIFEST_PATH
+
+
+def hash_file(path, chunk_size=1024 * 1024) -> str:
+    """SHA-256 of a file's content, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_paths(paths) -> dict:
+    """Content hashes for several files (or every file under a directory), keyed by path."""
+    hashes = {}
+    for path in paths:
+        path = Path(path)
+        files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for f in files:
+            hashes[str(f)] = hash_file(f)
+    return hashes
+
+
+def load_manifest(path=MANIFEST_PATH) -> dict:
+    try:
+        return json.loads(Path(path).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(manifest: dict, path=MANIFEST_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp_path, path)
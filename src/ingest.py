@@ -1,25 +1,153 @@
-import requests
-from pathlib import Path
+import json
 import logging
+import os
+from pathlib import Path
+
+import requests
+
+from paths import OWID_URL, RAW_PATH
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def ingest_data():
-    url = "https://raw.githubusercontent.com/owid/co2-data/master/owid-co2-data.csv"
-    output_path = Path("data/raw/owid-co2-data.csv")
-    
-    logging.info(f"Downloading raw data from {url}...")
+
+CHUNK_SIZE = 64 * 1024
+TIMEOUT = (10, 60)  # (connect, read) seconds
+
+
+def _meta_path(output_path: Path) -> Path:
+    return output_path.with_name(output_path.name + ".meta.json")
+
+
+def _part_path(output_path: Path) -> Path:
+    return output_path.with_name(output_path.name + ".part")
+
+
+def _read_meta(output_path: Path) -> dict:
+    try:
+        return json.loads(_meta_path(output_path).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_meta(output_path: Path, meta: dict):
+    meta_path = _meta_path(output_path)
+    tmp_path = meta_path.with_name(meta_path.name + ".tmp")
+    tmp_path.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp_path, meta_path)
+
+
+def _validators(response) -> dict:
+    return {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+
+def _remote_size(response):
+    """Full size of the remote file from a Content-Range header, or None."""
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+def _request_headers(output_path: Path, meta: dict, offset: int) -> dict:
+    partial = meta.get("partial") or {}
+    if offset and (partial.get("etag") or partial.get("last_modified")):
+        # Resume the interrupted transfer. If-Range makes the server fall back to a
+        # full 200 response when the remote file changed since the partial started.
+        # Ranges are only meaningful on the identity encoding.
+        return {
+            "Range": f"bytes={offset}-",
+            "If-Range": partial.get("etag") or partial["last_modified"],
+            "Accept-Encoding": "identity",
+        }
+
+    headers = {}
+    if output_path.exists():
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+
+def ingest_data(url=OWID_URL, output_path=RAW_PATH, timeout=TIMEOUT, chunk_size=CHUNK_SIZE) -> bool:
+    """Download the raw CSV to `output_path`.
+
+    The body is streamed in chunks to a `.part` file that is renamed over the
+    target once complete, so readers never see a truncated CSV. Validators from
+    the last download are sent back so an unchanged file costs a single 304, and
+    an interrupted download is resumed with an HTTP Range request. A `.part`
+    the server cannot extend (416, or a 206 for some other range) is discarded
+    and the whole file fetched again, unless it already holds every byte.
+
+    Returns True when a new copy of the file was written, False when the server
+    reported it unchanged.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = _part_path(output_path)
+
+    meta = _read_meta(output_path)
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        with open(output_path, "wb") as f:
-            f.write(response.content)
-        logging.info(f"Successfully saved data to {output_path}")
-        
+        while True:
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            headers = _request_headers(output_path, meta, offset)
+
+            logging.info(f"Downloading raw data from {url}...")
+            with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                if response.status_code == 304:
+                    logging.info(f"{output_path} is up to date, skipping download.")
+                    return False
+
+                resumed = response.status_code == 206 and response.headers.get("Content-Range", "").startswith(f"bytes {offset}-")
+                if response.status_code == 416 and offset and _remote_size(response) == offset:
+                    # The interrupted transfer had already written every byte.
+                    logging.info(f"{part_path} is already complete.")
+                    written = 0
+                elif offset and (response.status_code == 416 or (response.status_code == 206 and not resumed)):
+                    # Never append a body that does not start where the .part ends.
+                    logging.warning(f"Could not resume at byte {offset} (HTTP {response.status_code}); downloading the whole file.")
+                    part_path.unlink()
+                    meta.pop("partial", None)
+                    continue
+                else:
+                    response.raise_for_status()
+                    if response.status_code == 206 and not resumed:
+                        raise IOError(f"Unexpected partial response: {response.headers.get('Content-Range')}")
+                    if resumed:
+                        logging.info(f"Resuming download at byte {offset}.")
+                        mode = "ab"
+                    else:
+                        offset = 0
+                        mode = "wb"
+                        meta["partial"] = _validators(response)
+                        _write_meta(output_path, meta)
+
+                    expected = response.headers.get("Content-Length")
+                    written = 0
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(chunk_size=chunk_size):
+                            f.write(chunk)
+                            written += len(chunk)
+
+                    # Content-Length is the encoded size, only comparable without compression.
+                    if expected is not None and "Content-Encoding" not in response.headers and written != int(expected):
+                        raise IOError(f"Incomplete download: got {written} of {expected} bytes.")
+
+                validators = meta.pop("partial", None) or _validators(response)
+            break
+
+        os.replace(part_path, output_path)
+        meta.update(validators)
+        meta["size"] = output_path.stat().st_size
+        _write_meta(output_path, meta)
+        logging.info(f"Successfully saved data to {output_path} ({offset + written} bytes, {written} transferred)")
+        return True
+
     except Exception as e:
         logging.error(f"Failed to ingest data: {e}")
         raise
 
+
 if __name__ == "__main__":
-    ingest_data()
\ No newline at end of file
+    ingest_data()
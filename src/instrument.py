@@ -0,0 +1,197 @@
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+# A sibling module in the pipeline, part of the src package in the app.
+if __package__:
+    from .paths import RUNS_PATH
+else:
+    from paths import RUNS_PATH
+
+# ------------------------------------------------------------------------------
+# Pipeline run instrumentation
+#
+# Each pipeline stage runs inside stage(), which records its wall time, CPU time
+# (process-wide, so DuckDB's worker threads count), peak RSS growth and the
+# row/byte counters the stage reports through count(). Within pipeline_run()
+# the stages are appended to the `pipeline_runs` table of a small DuckDB file
+# of their own when the run ends, whether it succeeded or not. The data store
+# is left alone, so a run that changed nothing does not invalidate readers.
+# ------------------------------------------------------------------------------
+
+RUNS_TABLE = "pipeline_runs"
+RUNS_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {RUNS_TABLE} (
+    run_id VARCHAR,
+    stage VARCHAR,
+    parent VARCHAR,
+    status VARCHAR,
+    started_at TIMESTAMPTZ,
+    wall_seconds DOUBLE,
+    cpu_seconds DOUBLE,
+    peak_rss_mb DOUBLE,
+    rows_in BIGINT,
+    rows_out BIGINT,
+    bytes_read BIGINT,
+    bytes_written BIGINT
+)
+"""
+COUNTERS = ("rows_in", "rows_out", "bytes_read", "bytes_written")
+SAMPLE_INTERVAL = 0.005
+
+_run = None
+_open_stages = []
+
+def rss_mb() -> float:
+    """Current resident set size; falls back to the (monotonic) peak off Linux."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+class PeakRSS:
+    """Peak RSS growth over a `with` block, sampled from a background thread.
+
+    Sampling sees native allocations (DuckDB, NumPy) as well as Python objects.
+    """
+
+    def __enter__(self):
+        self.before = self._high = rss_mb()
+        self._done = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+        return self
+
+    def _sample(self):
+        while not self._done.wait(SAMPLE_INTERVAL):
+            self._high = max(self._high, rss_mb())
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._sampler.join()
+        self.peak_mb = max(self._high, rss_mb()) - self.before
+
+def path_bytes(path) -> int:
+    """Size of a file, or of all files under a directory; 0 if it does not exist."""
+    path = Path(path)
+    if path.is_dir():
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+    return path.stat().st_size if path.exists() else 0
+
+def _record(name: str, status: str) -> dict:
+    return {
+        "stage": name,
+        "parent": _open_stages[-1]["stage"] if _open_stages else None,
+        "status": status,
+        "started_at": datetime.now(timezone.utc),
+        "wall_seconds": 0.0,
+        "cpu_seconds": 0.0,
+        "peak_rss_mb": 0.0,
+        **dict.fromkeys(COUNTERS),
+    }
+
+@contextmanager
+def stage(name: str):
+    """Measure the enclosed block as stage `name` of the current run, if any."""
+    record = _record(name, "ok")
+    _open_stages.append(record)
+    wall, cpu = time.perf_counter(), time.process_time()
+    rss = PeakRSS()
+    try:
+        with rss:
+            yield record
+    except BaseException:
+        record["status"] = "failed"
+        raise
+    finally:
+        _open_stages.pop()
+        record.update(
+            wall_seconds=time.perf_counter() - wall,
+            cpu_seconds=time.process_time() - cpu,
+            peak_rss_mb=rss.peak_mb,
+        )
+        if _run is not None:
+            _run.append(record)
+        logging.info(f"[{name}] {record['status']} in {record['wall_seconds']:.3f}s")
+
+def skipped(name: str):
+    """Record stage `name` as skipped in the current run."""
+    if _run is not None:
+        _run.append(_record(name, "skipped"))
+
+def count(**counters):
+    """Add to the row/byte counters of the innermost open stage."""
+    if not _open_stages:
+        return
+    record = _open_stages[-1]
+    for key, value in counters.items():
+        if key not in COUNTERS:
+            raise ValueError(f"Unknown counter: {key}")
+        record[key] = (record[key] or 0) + int(value)
+
+@contextmanager
+def pipeline_run(runs_path=RUNS_PATH):
+    """Collect the stages run inside the block and append them to `runs_path`."""
+    global _run
+    _run = []
+    run_id = uuid.uuid4().hex[:12]
+    try:
+        yield run_id
+    finally:
+        records, _run = _run, None
+        append_run(runs_path, [{"run_id": run_id, **record} for record in records])
+
+def append_run(runs_path, records: list):
+    """Append stage records to the runs table in `runs_path`, in place.
+
+    The file only holds run history, so a short write connection is enough and
+    the data store's mtime and data version stay as the stages left them.
+    """
+    runs_path = Path(runs_path)
+    if not records:
+        return
+    try:
+        runs_path.parent.mkdir(parents=True, exist_ok=True)
+        con = duckdb.connect(str(runs_path))
+        try:
+            con.execute(RUNS_SCHEMA)
+            con.register("run_records", pd.DataFrame(records))
+            con.execute(f"INSERT INTO {RUNS_TABLE} BY NAME SELECT * FROM run_records")
+        finally:
+            con.close()
+    except (duckdb.Error, OSError) as e:
+        # Instrumentation must never fail the pipeline it measures.
+        logging.warning(f"Could not record pipeline run {records[0]['run_id']} in {runs_path}: {e}")
+
+def run_latencies(runs: pd.DataFrame) -> pd.DataFrame:
+    """End-to-end wall time per run (top-level stages only), oldest first."""
+    top = runs[runs["parent"].isna()]
+    return (
+        top.groupby("run_id", as_index=False)
+        .agg(started_at=("started_at", "min"), wall_seconds=("wall_seconds", "sum"))
+        .sort_values("started_at", ignore_index=True)
+    )
+
+def latency_kpi(runs: pd.DataFrame, window: int = 10):
+    """(latest run's wall seconds, % change vs the mean of the `window` runs before it).
+
+    The change is None when there is no earlier run to compare with.
+    """
+    latencies = run_latencies(runs)["wall_seconds"]
+    latest = latencies.iloc[-1]
+    previous = latencies.iloc[:-1].tail(window)
+    if previous.empty or previous.mean() == 0:
+        return latest, None
+    return latest, 100 * (latest / previous.mean() - 1)
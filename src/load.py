@@ -1,20 +1,80 @@
 import duckdb
-from pathlib import Path
+import os
 import logging
+import instrument
+from marts import build_marts
+from paths import DB_PATH, PROCESSED_PATH
+from transform import processed_scan
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+
+# Storage types narrower than what the processed Parquet carries. Measures stay
+# DOUBLE: DuckDB compresses them on disk, and FLOAT would round cumulative_co2.
+COMPACT_TYPES = {"year": "SMALLINT", "population": "BIGINT"}
+PRIMARY_KEY = ["country", "year"]
+
+CATALOG_SQL = """
+CREATE TABLE catalog AS
+SELECT
+    'co2_emissions' AS table_name,
+    count(*) AS row_count,
+    count(DISTINCT country) AS country_count,
+    min(year) AS first_year,
+    max(year) AS last_year,
+    now() AS loaded_at
+FROM co2_emissions;
+
+CREATE TABLE countries AS
+SELECT
+    country,
+    any_value(iso_code) AS iso_code,
+    count(*) AS row_count,
+    min(year) AS first_year,
+    max(year) AS last_year
+FROM co2_emissions
+GROUP BY country
+ORDER BY country;
+"""
+
+def build_store(con, source: str):
+    """Create the query-oriented tables in `con` from the `source` table expression.
+
+    co2_emissions is declared with compact types and a (country, year) primary
+    key, whose ART index serves point and per-country lookups, and rows are
+    inserted in key order so each country's rows sit in contiguous row groups.
+    """
+    columns = con.execute(f"SELECT column_name, column_type FROM (DESCRIBE SELECT * FROM {source})").fetchall()
+    definitions = [
+        f"{name} {COMPACT_TYPES.get(name, column_type)}{' NOT NULL' if name in PRIMARY_KEY else ''}"
+        for name, column_type in columns
+    ]
+    con.execute(f"CREATE TABLE co2_emissions ({', '.join(definitions)}, PRIMARY KEY ({', '.join(PRIMARY_KEY)}))")
+    con.execute(f"INSERT INTO co2_emissions SELECT * FROM {source} ORDER BY country, year")
+    con.execute(CATALOG_SQL)
+    build_marts(con)
+
 def load_data():
-    input_path = Path("data/processed/co2_data.parquet")
-    db_path = Path("data/co2_data.duckdb")
-    
-    if not input_path.exists():
+    if not PROCESSED_PATH.exists():
         raise FileNotFoundError("Processed data not found. Run transform.py first.")
 
-    con = duckdb.connect(str(db_path))
-    con.execute(f"CREATE OR REPLACE TABLE co2_emissions AS SELECT * FROM read_parquet('{input_path}')")
-    con.close()
-    logging.info(f"Loaded data into DuckDB at {db_path}")
+    # Build the new store next to the live one and swap it in with a rename, so
+    # readers either keep the old file or open the complete new one.
+    tmp_path = DB_PATH.with_name(DB_PATH.name + ".tmp")
+    for stale in (tmp_path, tmp_path.with_name(tmp_path.name + ".wal")):
+        stale.unlink(missing_ok=True)
+    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+
+    con = duckdb.connect(str(tmp_path))
+    try:
+        build_store(con, processed_scan(PROCESSED_PATH))
+        rows = con.execute("SELECT count(*) FROM co2_emissions").fetchone()[0]
+        con.execute("CHECKPOINT")
+    finally:
+        con.close()
+    os.replace(tmp_path, DB_PATH)
+    instrument.count(rows_in=rows, rows_out=rows, bytes_read=instrument.path_bytes(PROCESSED_PATH), bytes_written=DB_PATH.stat().st_size)
+    logging.info(f"Loaded data into DuckDB at {DB_PATH}")
 
 if __name__ == "__main__":
-    load_data()
\ No newline at end of file
+    load_data()
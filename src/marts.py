@@ -0,0 +1,24 @@
+import logging
+from pathlib import Path
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+MART_DIR = Path("src/sql/marts")
+
+def build_marts(con) -> list:
+    """Materialize one small table per story from `co2_emissions` in `con`.
+
+    `00_story_base.sql` defines the shared `story_base` view (kept temporary, so
+    it is not stored), and every `mart_*.sql` file becomes a table named after
+    the file holding exactly the frame that story plots. Returns the table names.
+    """
+    with open(MART_DIR / "00_story_base.sql", "r") as f:
+        con.execute("CREATE OR REPLACE TEMP VIEW story_base AS " + f.read())
+
+    tables = []
+    for sql_file in sorted(MART_DIR.glob("mart_*.sql")):
+        with open(sql_file, "r") as f:
+            con.execute(f"CREATE OR REPLACE TABLE {sql_file.stem} AS " + f.read())
+        tables.append(sql_file.stem)
+    logging.info(f"Built {len(tables)} story marts.")
+    return tables
@@ -0,0 +1,53 @@
+# ------------------------------------------------------------------------------
+# Metric registry
+#
+# Every derived column of the processed dataset is declared here and compiled
+# into the select list of src/sql/02_calculate_metrics.sql, so all of them are
+# computed in a single scan. Window metrics use the `by_country` / `by_year`
+# windows defined in that file; both are partitioned by country, which keeps
+# the incremental transform (recompute changed countries only) valid.
+# ------------------------------------------------------------------------------
+
+FUELS = ["coal", "oil", "gas", "cement", "flaring"]
+ROLLING_WINDOWS = [3, 5, 10]
+BASE_YEAR = 1990
+
+METRIC_SQL = {
+    "yoy_pct": lambda m: f"100 * ({m['column']} / NULLIF(lag({m['column']}) OVER by_year, 0) - 1)",
+    "ratio": lambda m: f"{m.get('scale', 1)} * {m['numerator']} / NULLIF({m['denominator']}, 0)",
+    "rolling_mean": lambda m: f"avg({m['column']}) OVER (by_year ROWS BETWEEN {m['window'] - 1} PRECEDING AND CURRENT ROW)",
+    "rolling_std": lambda m: f"stddev_samp({m['column']}) OVER (by_year ROWS BETWEEN {m['window'] - 1} PRECEDING AND CURRENT ROW)",
+    "base_index": lambda m: f"100 * {m['column']} / NULLIF(any_value({m['column']}) FILTER (WHERE year = {m['base_year']}) OVER by_country, 0)",
+}
+
+METRICS = [
+    {"name": "co2_yoy_pct", "kind": "yoy_pct", "column": "co2"},
+    {"name": "gdp_yoy_pct", "kind": "yoy_pct", "column": "gdp"},
+    {"name": "gdp_per_capita", "kind": "ratio", "numerator": "gdp", "denominator": "population"},
+    # kg of CO₂ per dollar of GDP (co2 is in million tonnes)
+    {"name": "carbon_intensity", "kind": "ratio", "numerator": "co2", "denominator": "gdp", "scale": 1e9},
+    *[
+        {"name": f"{fuel}_share", "kind": "ratio", "numerator": f"{fuel}_co2", "denominator": "co2", "scale": 100}
+        for fuel in FUELS
+    ],
+    *[
+        {"name": f"co2_rolling_{stat}_{window}yr", "kind": f"rolling_{stat}", "column": "co2", "window": window}
+        for window in ROLLING_WINDOWS
+        for stat in ("mean", "std")
+    ],
+    *[
+        {"name": f"{column}_index_{BASE_YEAR}", "kind": "base_index", "column": column, "base_year": BASE_YEAR}
+        for column in ("gdp", "co2")
+    ],
+]
+
+def metric_names(metrics=METRICS) -> list:
+    return [metric["name"] for metric in metrics]
+
+def metrics_select(metrics=METRICS) -> str:
+    """The registry as a SELECT list, one aliased expression per metric."""
+    return ",\n    ".join(f'{METRIC_SQL[m["kind"]](m)} AS "{m["name"]}"' for m in metrics)
+
+def render(sql: str, metrics=METRICS) -> str:
+    """Substitute the `{metrics}` placeholder of a SQL model with the registry."""
+    return sql.replace("{metrics}", metrics_select(metrics))
@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from fingerprint import hash_file
+from paths import MODEL_CACHE_DIR
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+MAX_WORKERS = 4
+
+# A model is a top-level `NN_name.sql` file defining the relation `name`. Other
+# models it reads with FROM/JOIN are its upstream models; files it reads with
+# read_csv*/read_parquet are external inputs, hashed by content.
+PREFIX_RE = re.compile(r"^\d+_")
+COMMENT_RE = re.compile(r"--[^\n]*")
+RELATION_RE = re.compile(r"\b(?:FROM|JOIN)\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+FILE_RE = re.compile(r"\bread_(?:csv\w*|parquet)\s*\(\s*'([^']+)'", re.IGNORECASE)
+
+def model_name(path: Path) -> str:
+    return PREFIX_RE.sub("", path.stem)
+
+def discover(sql_dir, render=lambda sql: sql) -> dict:
+    """Models in `sql_dir` (top level only): {name: {"path", "sql", "deps", "files"}}.
+
+    `render` is applied to each file's SQL first, e.g. to expand placeholders.
+    """
+    models = {}
+    for path in sorted(Path(sql_dir).glob("*.sql")):
+        sql = render(path.read_text()).strip().rstrip(";")
+        models[model_name(path)] = {"path": path, "sql": sql, "files": FILE_RE.findall(COMMENT_RE.sub("", sql))}
+    for model in models.values():
+        referenced = RELATION_RE.findall(COMMENT_RE.sub("", model["sql"]))
+        model["deps"] = sorted({name for name in referenced if name in models})
+    return models
+
+def layers(models: dict) -> list:
+    """Model names grouped into layers; each layer only depends on earlier ones."""
+    remaining = {name: set(model["deps"]) for name, model in models.items()}
+    result = []
+    while remaining:
+        ready = sorted(name for name, deps in remaining.items() if not deps)
+        if not ready:
+            raise ValueError(f"Dependency cycle between models: {', '.join(sorted(remaining))}")
+        result.append(ready)
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return result
+
+def model_hash(model: dict, upstream: dict) -> str:
+    """Hash of the model's SQL, its external files and its upstream models' hashes."""
+    digest = hashlib.sha256(model["sql"].encode())
+    for path in model["files"]:
+        digest.update(f"{path}:{hash_file(path)}".encode())
+    for dep in model["deps"]:
+        digest.update(f"{dep}:{upstream[dep]}".encode())
+    return digest.hexdigest()
+
+def _materialize(con, name: str, model: dict, key: str, cache_dir) -> bool:
+    """Create relation `name` in `con`, from the Parquet cache when possible.
+
+    Returns True if the model's SQL was run. Without a cache directory the model
+    becomes a plain table.
+    """
+    cur = con.cursor()
+    try:
+        if cache_dir is None:
+            cur.execute(f"CREATE OR REPLACE TABLE {name} AS {model['sql']}")
+            return True
+        cached = Path(cache_dir) / f"{name}-{key[:16]}.parquet"
+        built = not cached.exists()
+        if built:
+            tmp_path = cached.with_name(cached.name + ".tmp")
+            cur.execute(f"COPY ({model['sql']}) TO '{tmp_path}' (FORMAT PARQUET, COMPRESSION ZSTD)")
+            os.replace(tmp_path, cached)
+            for stale in Path(cache_dir).glob(f"{name}-*.parquet"):
+                if stale != cached:
+                    stale.unlink(missing_ok=True)
+        cur.execute(f"CREATE OR REPLACE VIEW {name} AS SELECT * FROM read_parquet('{cached}')")
+        return built
+    finally:
+        cur.close()
+
+def run_models(con, models: dict, cache_dir=MODEL_CACHE_DIR, skip=(), max_workers=MAX_WORKERS) -> dict:
+    """Create every model in `con` in dependency order, running each layer in parallel.
+
+    With a `cache_dir`, each model's output is kept there as Parquet named by its
+    hash, so a model only runs when its SQL, its files or something upstream
+    changed. Models in `skip` must already exist in `con` and are treated as
+    changed. Returns {name: "built" | "cached" | "skipped"}.
+    """
+    if cache_dir is not None:
+        Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    hashes, status = {}, {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for layer in layers(models):
+            for name in layer:
+                # Anything downstream of a skipped model cannot be served from the cache.
+                hashes[name] = None if name in skip or any(hashes[dep] is None for dep in models[name]["deps"]) else model_hash(models[name], hashes)
+            runs = {
+                name: pool.submit(_materialize, con, name, models[name], hashes[name], cache_dir if hashes[name] else None)
+                for name in layer if name not in skip
+            }
+            for name in layer:
+                status[name] = "skipped" if name in skip else ("built" if runs[name].result() else "cached")
+                logging.info(f"Model {name}: {status[name]}")
+    return status
@@ -0,0 +1,20 @@
+from pathlib import Path
+
+# ------------------------------------------------------------------------------
+# Data layout
+#
+# Where the raw data comes from, and every file the pipeline writes and the app
+# reads. Paths are relative to the repository root, which both run from;
+# modules import them from here, so the pipeline and its readers cannot drift
+# apart.
+# ------------------------------------------------------------------------------
+
+OWID_URL = "https://raw.githubusercontent.com/owid/co2-data/master/owid-co2-data.csv"
+RAW_PATH = Path("data/raw/owid-co2-data.csv")
+STAGED_PATH = Path("data/staged/owid-co2-data.parquet")
+PROCESSED_PATH = Path("data/processed/co2_data.parquet")
+DB_PATH = Path("data/co2_data.duckdb")
+SNAPSHOT_PATH = Path("data/snapshot/co2_data.arrow")
+RUNS_PATH = Path("data/pipeline_runs.duckdb")
+MANIFEST_PATH = Path("data/manifest.json")
+MODEL_CACHE_DIR = Path("data/cache/models")
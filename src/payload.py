@@ -0,0 +1,212 @@
+import logging
+
+import numpy as np
+import plotly.graph_objects as go
+
+POINT_BUDGET = 500      # points per line trace before LTTB downsampling
+WEBGL_POINTS = 1000     # markers in a figure before switching to WebGL
+COLLAPSE_TRACES = 20    # one-category-per-trace scatters with at least this many traces get merged
+HOVER_DECIMALS = 3      # decimals a float32 copy must keep for an array to be narrowed
+
+# Per-point properties that must stay aligned when points are dropped or merged.
+POINT_ARRAYS = ["x", "y", "text", "hovertext", "customdata", "marker.size", "marker.color"]
+
+
+def _get(trace, path):
+    value = trace
+    for part in path.split("."):
+        value = getattr(value, part, None)
+        if value is None:
+            return None
+    return value
+
+
+def _set(trace, path, value):
+    *parents, name = path.split(".")
+    target = trace
+    for part in parents:
+        target = getattr(target, part)
+    # Plotly ignores assignments equal to the current value, even in another dtype.
+    setattr(target, name, None)
+    setattr(target, name, value)
+
+
+def _per_point(value, n):
+    return value is not None and not isinstance(value, (str, dict)) and np.ndim(value) >= 1 and len(value) == n
+
+
+def lttb(x, y, threshold) -> np.ndarray:
+    """Indices of `threshold` points picked by Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last point and, from each bucket in between, the point
+    forming the largest triangle with the previous pick and the next bucket's
+    mean, which preserves the visual peaks and troughs of a line.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    picked = np.empty(threshold, dtype=int)
+    picked[0], picked[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean() if next_stop > stop else x[-1]
+        next_y = y[stop:next_stop].mean() if next_stop > stop else y[-1]
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        picked[i + 1] = previous
+    return picked
+
+
+def _take(trace, indices):
+    n = len(trace.x)
+    for path in POINT_ARRAYS:
+        value = _get(trace, path)
+        if _per_point(value, n):
+            _set(trace, path, np.asarray(value)[indices])
+
+
+def downsample_lines(fig, budget=POINT_BUDGET):
+    """LTTB-downsample line traces longer than `budget` points.
+
+    Stacked traces share one set of indices, picked on the stack's total, so
+    the areas still line up.
+    """
+    groups = {}
+    for trace in fig.data:
+        if trace.type == "scatter" and "lines" in (trace.mode or "lines") and trace.x is not None and len(trace.x) > budget:
+            groups.setdefault(trace.stackgroup or id(trace), []).append(trace)
+    for traces in groups.values():
+        x = np.asarray(traces[0].x)
+        if not all(len(t.x) == len(x) and np.array_equal(np.asarray(t.x), x) for t in traces):
+            for trace in traces:
+                _take(trace, lttb(trace.x, trace.y, budget))
+            continue
+        indices = lttb(x, np.sum([np.asarray(t.y, dtype=float) for t in traces], axis=0), budget)
+        for trace in traces:
+            _take(trace, indices)
+
+
+def collapse_scatter(fig, min_traces=COLLAPSE_TRACES):
+    """Merge a legend-less scatter with one marker trace per category into one trace.
+
+    `px.scatter(color=...)` emits a trace per category; with the legend hidden the
+    same chart is one trace whose marker colors are an array.
+    """
+    traces = fig.data
+    if fig.layout.showlegend is not False or len(traces) < min_traces:
+        return fig
+    if any(t.type != "scatter" or t.mode != "markers" for t in traces):
+        return fig
+
+    first = traces[0]
+    merged = {path: [] for path in POINT_ARRAYS}
+    for trace in traces:
+        n = len(trace.x)
+        for path in POINT_ARRAYS:
+            value = _get(trace, path)
+            if path == "marker.color" and not _per_point(value, n):
+                value = [value] * n
+            merged[path].append(value if _per_point(value, n) else None)
+
+    marker = first.marker.to_plotly_json()
+    combined = go.Scatter(mode="markers", showlegend=False, xaxis=first.xaxis, yaxis=first.yaxis)
+    for path, values in merged.items():
+        if all(v is not None for v in values):
+            if path.startswith("marker."):
+                marker[path.split(".", 1)[1]] = np.concatenate([np.asarray(v) for v in values])
+            else:
+                _set(combined, path, np.concatenate([np.asarray(v) for v in values]))
+    combined.marker = marker
+    if first.hovertemplate:
+        # px bakes the category into each trace's template ("country=China").
+        combined.hovertemplate = "<br>".join(part for part in first.hovertemplate.split("<br>") if not part.endswith(f"={first.name}"))
+    return go.Figure(data=[combined], layout=fig.layout)
+
+
+def use_webgl(fig, threshold=WEBGL_POINTS):
+    """Draw marker scatters with WebGL once the figure has more than `threshold` markers."""
+    markers = [t for t in fig.data if t.type == "scatter" and t.mode == "markers"]
+    if sum(len(t.x) for t in markers if t.x is not None) <= threshold:
+        return fig
+    marker_ids = {id(t) for t in markers}
+    data = [
+        go.Scattergl({k: v for k, v in t.to_plotly_json().items() if k != "type"}) if id(t) in marker_ids else t
+        for t in fig.data
+    ]
+    return go.Figure(data=data, layout=fig.layout)
+
+
+def _compact(values):
+    array = np.asarray(values)
+    if array.dtype.kind == "f" and array.dtype.itemsize > 4:
+        finite = array[np.isfinite(array)]
+        with np.errstate(over="ignore"):
+            error = np.abs(finite.astype(np.float32).astype(array.dtype) - finite)
+        # float32 keeps ~7 significant digits: enough for per-capita values,
+        # not for GDP or population, which hover labels show in full.
+        if np.any(error >= 0.5 * 10.0**-HOVER_DECIMALS):
+            return array
+        return array.astype(np.float32)
+    if array.dtype.kind in "iu" and array.size:
+        for dtype in (np.int8, np.int16, np.int32):
+            info = np.iinfo(dtype)
+            if info.min <= array.min() and array.max() <= info.max:
+                return array.astype(dtype)
+    return array
+
+
+def compact_arrays(fig):
+    """Store numeric point arrays as float32 / the narrowest int, sent as typed arrays.
+
+    Floats are only narrowed when float32 keeps every value to HOVER_DECIMALS.
+    """
+    for trace in fig.data:
+        for path in POINT_ARRAYS:
+            value = _get(trace, path)
+            if value is not None and _per_point(value, len(value)) and np.asarray(value).dtype.kind in "fiu":
+                _set(trace, path, _compact(value))
+
+
+def optimize(fig, point_budget=POINT_BUDGET, webgl_points=WEBGL_POINTS):
+    """Shrink what `fig` sends to the browser; returns the optimized figure."""
+    fig = collapse_scatter(fig)
+    fig = use_webgl(fig, webgl_points)
+    downsample_lines(fig, point_budget)
+    compact_arrays(fig)
+    return fig
+
+
+def payload_bytes(fig) -> int:
+    return len(fig.to_json().encode())
+
+
+if __name__ == "__main__":
+    # Report chart payload per story before and after optimizing, from the
+    # pipeline's story marts, e.g. `python src/payload.py`.
+    import importlib
+    import sys
+    from pathlib import Path
+
+    from datasource import read_mart
+
+    sys.path.insert(0, ".")
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    total_before = total_after = 0
+    for path in sorted(Path("stories").glob("story_*.py")):
+        story = importlib.import_module(f"stories.{path.stem}")
+        fig = story.prepare(read_mart(story.MART))
+        before = payload_bytes(fig)
+        fig = optimize(fig)
+        after = payload_bytes(fig)
+        total_before, total_after = total_before + before, total_after + after
+        logging.info(f"{path.stem:45s} {before / 1024:8.1f} KiB -> {after / 1024:8.1f} KiB  ({len(fig.data)} traces)")
+    logging.info(f"{'total':45s} {total_before / 1024:8.1f} KiB -> {total_after / 1024:8.1f} KiB")
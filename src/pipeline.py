@@ -0,0 +1,90 @@
+import argparse
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+import instrument
+from convert import convert_raw
+from fingerprint import hash_paths, load_manifest, save_manifest
+from ingest import ingest_data
+from load import load_data
+from marts import MART_DIR
+from paths import DB_PATH, PROCESSED_PATH, RAW_PATH, SNAPSHOT_PATH, STAGED_PATH
+from snapshot import publish_snapshot
+from transform import SQL_DIR, transform_data
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+TRANSFORM_CODE = [Path("src/transform.py"), Path("src/validation.py"), Path("src/metrics.py"), Path("src/models.py")]
+LOAD_CODE = [Path("src/load.py"), Path("src/marts.py"), MART_DIR]
+SNAPSHOT_CODE = [Path("src/snapshot.py"), Path("src/datasource.py")]
+
+
+def run_stage(manifest: dict, name: str, inputs: dict, outputs: list, run, force=False) -> bool:
+    """Run `run()` unless the stage's inputs match the manifest and its outputs exist.
+
+    The manifest records, per stage, the content hashes of its inputs and of its
+    outputs; downstream stages use the latter as their inputs so they only rerun
+    when upstream output actually changed.
+    """
+    record = manifest.get(name, {})
+    if not force and record.get("inputs") == inputs and all(Path(p).exists() for p in outputs):
+        logging.info(f"[{name}] inputs unchanged, skipping.")
+        instrument.skipped(name)
+        return False
+
+    logging.info(f"[{name}] running...")
+    with instrument.stage(name):
+        run()
+    manifest[name] = {
+        "inputs": inputs,
+        "outputs": hash_paths(outputs),
+        "completed_at": datetime.now(timezone.utc).isoformat(),
+    }
+    save_manifest(manifest)
+    return True
+
+
+def run_pipeline(force=False) -> dict:
+    """Ingest, transform, load and snapshot, skipping every stage whose inputs are unchanged.
+
+    Every stage is timed and measured, and the run is recorded in the
+    pipeline_runs table of instrument.RUNS_PATH. Returns a mapping of stage name to
+    whether it ran.
+    """
+    manifest = load_manifest()
+    with instrument.pipeline_run():
+        with instrument.stage("ingest"):
+            ran = {"ingest": ingest_data()}
+            if ran["ingest"]:
+                downloaded = instrument.path_bytes(RAW_PATH)
+                instrument.count(bytes_read=downloaded, bytes_written=downloaded)
+            if convert_raw():
+                instrument.count(bytes_read=instrument.path_bytes(RAW_PATH), bytes_written=instrument.path_bytes(STAGED_PATH))
+
+        transform_inputs = hash_paths([STAGED_PATH, *sorted(SQL_DIR.glob("*.sql")), *TRANSFORM_CODE])
+        previous_inputs = manifest.get("transform", {}).get("inputs", {})
+        changed = {k for k in {*transform_inputs, *previous_inputs} if transform_inputs.get(k) != previous_inputs.get(k)}
+        # New data under unchanged logic only touches the countries that changed.
+        incremental = not force and changed == {str(STAGED_PATH)}
+        ran["transform"] = run_stage(
+            manifest, "transform", transform_inputs, [PROCESSED_PATH], lambda: transform_data(incremental=incremental), force
+        )
+
+        load_inputs = {**manifest["transform"]["outputs"], **hash_paths(LOAD_CODE)}
+        ran["load"] = run_stage(manifest, "load", load_inputs, [DB_PATH], load_data, force)
+
+        # Published after the store, so an app reading the snapshot finds its marts.
+        # The app reads those marts under the snapshot's fingerprint, so a
+        # rebuilt store republishes the snapshot too.
+        snapshot_inputs = {**manifest["transform"]["outputs"], **manifest["load"]["outputs"], **hash_paths(SNAPSHOT_CODE)}
+        ran["snapshot"] = run_stage(manifest, "snapshot", snapshot_inputs, [SNAPSHOT_PATH], publish_snapshot, force)
+
+    return ran
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the ingest -> transform -> load -> snapshot pipeline.")
+    parser.add_argument("--force", action="store_true", help="rerun every stage even if its inputs are unchanged")
+    args = parser.parse_args()
+    run_pipeline(force=args.force)
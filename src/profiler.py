@@ -0,0 +1,142 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import plotly.graph_objects as go
+
+# ------------------------------------------------------------------------------
+# Render profiler
+#
+# Opt-in timing of a Streamlit rerun. The app opens spans around its stages
+# (data engine, navigation, each view, each story's prepare and show); a span
+# opened with no rerun in progress, e.g. inside a fragment rerun, is logged as
+# a root of its own. Completed spans are appended to a JSONL log, one line per
+# span with its folded stack `path` ("rerun;view:Home"), so the log can be
+# aggregated per span or fed to flame graph tools.
+# ------------------------------------------------------------------------------
+
+PROFILE_LOG = Path(os.environ.get("CO2_PROFILE_LOG", "data/profile/spans.jsonl"))
+
+_log_lock = threading.Lock()
+
+class Profiler:
+    """Spans of one session's reruns. When disabled, span() is a no-op."""
+
+    def __init__(self, session: str, enabled: bool = True, log_path=PROFILE_LOG):
+        self.session = session
+        self.enabled = enabled
+        self.log_path = Path(log_path)
+        self.reruns = 0
+        self.spans = []
+        self._stack = []
+
+    def start(self, name: str = "rerun"):
+        """Open the root span of a rerun, dropping anything left from an aborted one."""
+        if not self.enabled:
+            return
+        self.reruns += 1
+        self.spans = []
+        self._stack = [self._open(name)]
+
+    def finish(self) -> list:
+        """Close every open span, log the rerun and return its spans in start order."""
+        while self._stack:
+            self._close()
+        return self.spans
+
+    @contextmanager
+    def _span(self, name: str):
+        if not self._stack:
+            # A fragment rerun: the span is a root of its own.
+            self.reruns += 1
+            self.spans = []
+        self._stack.append(self._open(name))
+        try:
+            yield
+        finally:
+            self._close()
+
+    def span(self, name: str):
+        return self._span(name) if self.enabled else nullcontext()
+
+    def _open(self, name: str) -> dict:
+        parent = self._stack[-1] if self._stack else None
+        start = time.perf_counter()
+        return {
+            "name": name,
+            "path": f"{parent['path']};{name}" if parent else name,
+            "depth": len(self._stack),
+            "_origin": self._stack[0]["_start"] if self._stack else start,
+            "_start": start,
+        }
+
+    def _close(self):
+        span = self._stack.pop()
+        end = time.perf_counter()
+        span["start_ms"] = (span.pop("_start") - span["_origin"]) * 1000
+        span["duration_ms"] = (end - span.pop("_origin")) * 1000 - span["start_ms"]
+        self.spans.append(span)
+        if not self._stack:
+            self.spans.sort(key=lambda s: (s["start_ms"], s["depth"]))
+            self._write(self.spans)
+
+    def _write(self, spans: list):
+        now = datetime.now(timezone.utc).isoformat()
+        lines = "".join(
+            json.dumps({"time": now, "session": self.session, "rerun": self.reruns, **span}) + "\n" for span in spans
+        )
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with _log_lock, open(self.log_path, "a") as f:
+            f.write(lines)
+
+def read_spans(log_path=PROFILE_LOG) -> pd.DataFrame:
+    return pd.read_json(log_path, lines=True)
+
+def aggregate(spans: pd.DataFrame, prefix: str = "") -> pd.DataFrame:
+    """Count, p50 and p95 duration in ms per span name, slowest p95 first."""
+    spans = spans[spans["name"].str.startswith(prefix)]
+    durations = spans.groupby("name")["duration_ms"]
+    return (
+        pd.DataFrame({
+            "count": durations.size(),
+            "p50_ms": durations.quantile(0.5),
+            "p95_ms": durations.quantile(0.95),
+        })
+        .sort_values("p95_ms", ascending=False)
+    )
+
+def flame_figure(spans: list) -> go.Figure:
+    """A rerun's spans as a flame chart: one row per depth, bars placed by start time."""
+    fig = go.Figure(go.Bar(
+        base=[s["start_ms"] for s in spans],
+        x=[s["duration_ms"] for s in spans],
+        y=[s["depth"] for s in spans],
+        orientation="h",
+        text=[s["name"] for s in spans],
+        textposition="inside",
+        insidetextanchor="start",
+        hovertemplate="%{text}<br>%{x:.1f} ms<extra></extra>",
+        marker=dict(color=[s["depth"] for s in spans], colorscale="YlOrRd", line=dict(width=1, color="white")),
+    ))
+    fig.update_layout(
+        bargap=0.05, height=60 + 40 * (max((s["depth"] for s in spans), default=0) + 1),
+        margin=dict(l=0, r=0, t=10, b=0), showlegend=False,
+        xaxis_title="ms", yaxis=dict(autorange="reversed", visible=False),
+        paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(color="gray"),
+    )
+    return fig
+
+if __name__ == "__main__":
+    # p50/p95 per story from the span log, e.g. `python src/profiler.py`.
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Aggregate the render profiler's span log.")
+    parser.add_argument("log", nargs="?", default=PROFILE_LOG, type=Path)
+    parser.add_argument("--prefix", default="story:", help='span name prefix to report, "" for all spans')
+    args = parser.parse_args()
+    print(aggregate(read_spans(args.log), args.prefix).round(1).to_string())
@@ -0,0 +1,189 @@
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Lookup results share their arrays with the cache; without copy-on-write (the
+# default only from pandas 3) a caller's write would change the cached frame.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+CACHE_SIZE = 128
+
+
+def _names(value) -> tuple:
+    return (value,) if isinstance(value, str) else tuple(value)
+
+
+class CO2Query:
+    """Indexed lookups over the story frame, built once per data version.
+
+    Rows are kept sorted by (country, year) so every country is one contiguous
+    slice, and a year index maps each year to its row positions (in country
+    order). Lookups use those instead of boolean masks over the whole frame, and
+    results are kept in an LRU cache. Callers get a shallow copy, so adding
+    columns to a result never changes what the cache holds.
+    """
+
+    def __init__(self, df: pd.DataFrame, cache_size: int = CACHE_SIZE):
+        # Frames from the pipeline are already in order; keeping them as they
+        # are avoids copying a memory-mapped snapshot into private memory.
+        if pd.MultiIndex.from_arrays([df["country"], df["year"]]).is_monotonic_increasing:
+            self.data = df.reset_index(drop=True)
+        else:
+            self.data = df.sort_values(["country", "year"], kind="stable", ignore_index=True)
+        # Gathering rows from plain arrays skips pandas' indexing overhead.
+        # Categoricals are kept as codes plus a lookup of their (few) values,
+        # with missing (-1) codes mapping to the NaN at the end, so no per-row
+        # string array is built.
+        self._columns = {}
+        for name in self.data.columns:
+            column = self.data[name]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                values = np.append(column.cat.categories.to_numpy(dtype=object), np.nan)
+                self._columns[name] = (values, column.cat.codes.to_numpy())
+            else:
+                self._columns[name] = (None, column.to_numpy())
+
+        countries = self._array("country")
+        starts = np.flatnonzero(np.r_[True, countries[1:] != countries[:-1]]) if len(countries) else np.array([], dtype=int)
+        stops = np.r_[starts[1:], len(countries)]
+        names = self._take("country", starts)
+        self._slices = {name: (int(start), int(stop)) for name, start, stop in zip(names, starts, stops)}
+
+        self._years = self._array("year")
+        order = np.argsort(self._years, kind="stable")
+        values, firsts = np.unique(self._years[order], return_index=True)
+        lasts = np.r_[firsts[1:], len(order)]
+        self._year_rows = {int(year): order[first:last] for year, first, last in zip(values, firsts, lasts)}
+        self.latest_year = int(values[-1]) if len(values) else None
+
+        self._is_country = ~self.data["is_aggregate"].to_numpy()
+
+        self._series = lru_cache(maxsize=cache_size)(self._series_uncached)
+        self._cross_section = lru_cache(maxsize=cache_size)(self._cross_section_uncached)
+        self._top_k = lru_cache(maxsize=cache_size)(self._top_k_uncached)
+
+    def _array(self, name):
+        """The column's values, or its codes if it is categorical."""
+        return self._columns[name][1]
+
+    def _take(self, name, positions):
+        values, codes = self._columns[name]
+        return codes[positions] if values is None else values[codes[positions]]
+
+    def _rows(self, positions, metrics) -> pd.DataFrame:
+        return pd.DataFrame({name: self._take(name, positions) for name in ("country", "year", *metrics)})
+
+    def _series_uncached(self, countries, metrics, years):
+        positions = []
+        for country in sorted((c for c in set(countries) if c in self._slices), key=self._slices.get):
+            start, stop = self._slices[country]
+            if years is not None:
+                first, last = years
+                span = self._years[start:stop]
+                start, stop = (
+                    start + (np.searchsorted(span, first, "left") if first is not None else 0),
+                    start + (np.searchsorted(span, last, "right") if last is not None else len(span)),
+                )
+            positions.append(np.arange(start, stop))
+        return self._rows(np.concatenate(positions) if positions else [], metrics)
+
+    def _cross_section_uncached(self, year, metrics, countries_only):
+        positions = self._year_rows.get(year, np.array([], dtype=int))
+        if countries_only:
+            positions = positions[self._is_country[positions]]
+        return self._rows(positions, metrics)
+
+    def _top_k_uncached(self, year, metric, k, countries_only):
+        section = self._cross_section(year, (metric,), countries_only)
+        order = np.argsort(-section[metric].to_numpy(), kind="stable")[:k]
+        return section.iloc[order].reset_index(drop=True)
+
+    def series(self, country, metrics, years=None) -> pd.DataFrame:
+        """Rows of one country (or several) with `metrics`, optionally within inclusive `years` = (first, last).
+
+        Either end of `years` may be None. Rows come back in (country, year) order.
+        """
+        years = tuple(years) if years is not None else None
+        return self._series(_names(country), _names(metrics), years).copy(deep=False)
+
+    def cross_section(self, year, metrics, countries_only=False) -> pd.DataFrame:
+        """Every entity's `metrics` in `year`, in country order; `countries_only` drops aggregates."""
+        return self._cross_section(int(year), _names(metrics), countries_only).copy(deep=False)
+
+    def top_k(self, year, metric, k, countries_only=False) -> pd.DataFrame:
+        """The `k` entities with the largest `metric` in `year`, largest first."""
+        return self._top_k(int(year), metric, k, countries_only).copy(deep=False)
+
+    def cache_info(self) -> dict:
+        return {
+            "series": self._series.cache_info(),
+            "cross_section": self._cross_section.cache_info(),
+            "top_k": self._top_k.cache_info(),
+        }
+
+
+# The lookups the stories make, as boolean masks over the frame and as queries.
+LOOKUPS = {
+    "country": (
+        lambda df: df[df["country"] == "World"][["country", "year", "co2"]],
+        lambda q: q.series("World", "co2"),
+    ),
+    "country since 1990": (
+        lambda df: df[(df["country"] == "United States") & (df["year"] >= 1990)][["country", "year", "gdp", "co2"]],
+        lambda q: q.series("United States", ["gdp", "co2"], years=(1990, None)),
+    ),
+    "country list": (
+        lambda df: df[df["country"].isin(["China", "United States", "India", "Russia", "Japan", "Germany"])][["country", "year", "co2"]],
+        lambda q: q.series(["China", "United States", "India", "Russia", "Japan", "Germany"], "co2"),
+    ),
+    "year": (
+        lambda df: df[(df["year"] == 2018) & ~df["is_aggregate"]][["country", "year", "gdp", "co2", "population"]],
+        lambda q: q.cross_section(2018, ["gdp", "co2", "population"], countries_only=True),
+    ),
+    "top 15": (
+        lambda df: df[(df["year"] == df["year"].max()) & ~df["is_aggregate"]].sort_values("cumulative_co2", ascending=False).head(15)[["country", "year", "cumulative_co2"]],
+        lambda q: q.top_k(q.latest_year, "cumulative_co2", 15, countries_only=True),
+    ),
+}
+
+
+def benchmark(df: pd.DataFrame, repeat: int = 200) -> dict:
+    """Mean seconds per lookup for masks, cold queries and cached queries."""
+    start = time.perf_counter()
+    query = CO2Query(df)
+    results = {"build": time.perf_counter() - start}
+    for name, (mask, lookup) in LOOKUPS.items():
+        timings = {}
+        start = time.perf_counter()
+        for _ in range(repeat):
+            mask(df)
+        timings["mask"] = (time.perf_counter() - start) / repeat
+
+        cold = CO2Query(query.data, cache_size=0)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            lookup(cold)
+        timings["query"] = (time.perf_counter() - start) / repeat
+
+        lookup(query)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            lookup(query)
+        timings["cached"] = (time.perf_counter() - start) / repeat
+        results[name] = timings
+    return results
+
+
+if __name__ == "__main__":
+    # Compare the stories' mask scans with indexed lookups, e.g. `python src/query.py`.
+    from datasource import load_frame
+
+    df, source, _ = load_frame()
+    results = benchmark(df)
+    print(f"{source}: {len(df)} rows, index built in {results.pop('build') * 1000:.1f} ms")
+    print(f"{'lookup':20s} {'mask':>10s} {'query':>10s} {'cached':>10s}")
+    for name, timings in results.items():
+        print(f"{name:20s} " + " ".join(f"{timings[k] * 1e6:8.0f}us" for k in ("mask", "query", "cached")))
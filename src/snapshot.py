@@ -0,0 +1,39 @@
+import logging
+import os
+from pathlib import Path
+
+import pyarrow as pa
+
+import instrument
+from datasource import compact, read_processed
+from paths import PROCESSED_PATH, SNAPSHOT_PATH
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def publish_snapshot(processed_path=PROCESSED_PATH, snapshot_path=SNAPSHOT_PATH):
+    """Write the compact story frame as an uncompressed Arrow IPC file for the app to map.
+
+    The frame is written in (country, year) order as a single record batch, so
+    every column is one contiguous buffer the app can use without copying; it
+    is left uncompressed for the same reason. The file is swapped in with a
+    rename, so processes that mapped the previous snapshot keep a valid view.
+    """
+    processed_path, snapshot_path = Path(processed_path), Path(snapshot_path)
+    if not processed_path.exists():
+        raise FileNotFoundError("Processed data not found. Run transform.py first.")
+
+    table = pa.Table.from_pandas(compact(read_processed(processed_path)), preserve_index=False).combine_chunks()
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, snapshot_path)
+    logging.info(f"Published {snapshot_path} ({table.num_rows} rows, {snapshot_path.stat().st_size / 2**20:.1f} MB)")
+    instrument.count(
+        rows_in=table.num_rows, rows_out=table.num_rows,
+        bytes_read=instrument.path_bytes(processed_path), bytes_written=snapshot_path.stat().st_size,
+    )
+
+if __name__ == "__main__":
+    publish_snapshot()
@@ -1,5 +1,6 @@
 WITH source_data AS (
-    SELECT * FROM read_csv_auto('data/raw/owid-co2-data.csv')
+    -- Typed, projected copy of the raw CSV written by convert.py
+    SELECT * FROM read_parquet('data/staged/owid-co2-data.parquet')
 )
 SELECT
     CAST(country AS VARCHAR) AS country,
@@ -15,6 +16,8 @@ SELECT
     CAST(oil_co2 AS DOUBLE) AS oil_co2,
     CAST(gas_co2 AS DOUBLE) AS gas_co2,
     CAST(cement_co2 AS DOUBLE) AS cement_co2,
+    CAST(flaring_co2 AS DOUBLE) AS flaring_co2,
+    CAST(share_global_co2 AS DOUBLE) AS share_global_co2,
     CAST(co2_growth_abs AS DOUBLE) AS co2_growth_abs
 FROM source_data
 WHERE iso_code IS NOT NULL OR country = 'World';
\ No newline at end of file
@@ -1 +1,9 @@
-SELECT * FROM cleaned_data;
\ No newline at end of file
+-- Derived metrics in one scan. The metrics placeholder is replaced with the
+-- select list compiled from the registry in src/metrics.py.
+SELECT
+    *,
+    {metrics}
+FROM clean_and_cast
+WINDOW
+    by_country AS (PARTITION BY country),
+    by_year AS (PARTITION BY country ORDER BY year)
@@ -5,4 +5,4 @@ SELECT
         ORDER BY year 
         ROWS BETWEEN 6 PRECEDING AND CURRENT ROW
     ) AS co2_rolling_7yr
-FROM metrics_data;
\ No newline at end of file
+FROM calculate_metrics;
\ No newline at end of file
@@ -0,0 +1,25 @@
+-- The frame every story starts from: 1950 onwards, gaps as 0 (as the app's
+-- frame has them). Aggregates are the rows without an ISO code, plus World.
+SELECT
+    country,
+    year,
+    iso_code,
+    COALESCE(population, 0) AS population,
+    COALESCE(gdp, 0) AS gdp,
+    COALESCE(co2, 0) AS co2,
+    COALESCE(co2_per_capita, 0) AS co2_per_capita,
+    COALESCE(cumulative_co2, 0) AS cumulative_co2,
+    COALESCE(consumption_co2, 0) AS consumption_co2,
+    COALESCE(coal_co2, 0) AS coal_co2,
+    COALESCE(oil_co2, 0) AS oil_co2,
+    COALESCE(gas_co2, 0) AS gas_co2,
+    COALESCE(cement_co2, 0) AS cement_co2,
+    COALESCE(flaring_co2, 0) AS flaring_co2,
+    COALESCE(share_global_co2, 0) AS share_global_co2,
+    -- Derived in the transform's metrics stage (src/metrics.py)
+    COALESCE(co2_yoy_pct, 0) AS co2_yoy_pct,
+    COALESCE(gdp_per_capita, 0) AS gdp_per_capita,
+    COALESCE(gdp_index_1990, 0) AS gdp_index_1990,
+    COALESCE(co2_index_1990, 0) AS co2_index_1990
+FROM co2_emissions
+WHERE year >= 1950;
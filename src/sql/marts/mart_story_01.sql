@@ -0,0 +1,7 @@
+-- 1. Historical Responsibility: top 15 countries by cumulative CO₂ in the latest year
+SELECT country, year, cumulative_co2
+FROM story_base
+WHERE year = (SELECT max(year) FROM story_base)
+  AND iso_code IS NOT NULL
+ORDER BY cumulative_co2 DESC
+LIMIT 15;
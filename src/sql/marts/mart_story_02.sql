@@ -0,0 +1,7 @@
+-- 2. Personal Footprint: countries over 1M people in 2022
+SELECT country, gdp, co2_per_capita, population
+FROM story_base
+WHERE year = 2022
+  AND population > 1000000
+  AND iso_code IS NOT NULL
+ORDER BY country;
@@ -0,0 +1,5 @@
+-- 3. The Global Trend: annual World emissions
+SELECT year, co2
+FROM story_base
+WHERE country = 'World'
+ORDER BY year;
@@ -0,0 +1,5 @@
+-- 4. Today's Heavy Hitters: annual emissions of the largest emitters
+SELECT country, year, co2
+FROM story_base
+WHERE country IN ('China', 'United States', 'India', 'Russia', 'Japan', 'Germany')
+ORDER BY country, year;
@@ -0,0 +1,5 @@
+-- 5. The Great Acceleration: share of global emissions
+SELECT country, year, share_global_co2
+FROM story_base
+WHERE country IN ('China', 'United States', 'India', 'Russia', 'Japan')
+ORDER BY country, year;
@@ -0,0 +1,12 @@
+-- 6. The Fuel Mix: World emissions by source, long format
+SELECT year, "Fuel", "Emissions"
+FROM (
+    UNPIVOT (SELECT year, coal_co2, oil_co2, gas_co2, cement_co2, flaring_co2 FROM story_base WHERE country = 'World')
+    ON coal_co2, oil_co2, gas_co2, cement_co2, flaring_co2
+    INTO NAME source VALUE "Emissions"
+)
+JOIN (
+    VALUES ('coal_co2', 'Coal', 1), ('oil_co2', 'Oil', 2), ('gas_co2', 'Gas', 3),
+           ('cement_co2', 'Cement', 4), ('flaring_co2', 'Flaring', 5)
+) AS fuels(source, "Fuel", fuel_order) USING (source)
+ORDER BY fuel_order, year;
@@ -0,0 +1,5 @@
+-- 7. Volatility & Shocks: World year-over-year growth since 1981
+SELECT year, co2, co2_yoy_pct AS pct_change
+FROM story_base
+WHERE country = 'World' AND year > 1980
+ORDER BY year;
@@ -0,0 +1,5 @@
+-- 8. The Hope Story: United States GDP and CO₂ indexed to 1990 = 100
+SELECT year, gdp_index_1990 AS gdp_index, co2_index_1990 AS co2_index
+FROM story_base
+WHERE country = 'United States' AND year >= 1990
+ORDER BY year;
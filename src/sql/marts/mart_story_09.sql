@@ -0,0 +1,5 @@
+-- 9. Consumption vs. Production: United Kingdom since 1990
+SELECT year, co2, consumption_co2
+FROM story_base
+WHERE country = 'United Kingdom' AND year >= 1990
+ORDER BY year;
@@ -0,0 +1,8 @@
+-- 10. The Analyst's View: wealth, emissions and population in 2018
+SELECT country, gdp_per_capita, co2, population
+FROM story_base
+WHERE year = 2018
+  AND gdp > 0
+  AND co2 > 0
+  AND iso_code IS NOT NULL
+ORDER BY country;
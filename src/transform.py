@@ -1,47 +1,169 @@
+import argparse
 import duckdb
+import os
 import pandas as pd
+import shutil
 from pathlib import Path
 import logging
-from validation import get_co2_schema
+import instrument
+from convert import convert_raw
+from metrics import metric_names, render
+from models import discover, run_models
+from paths import MODEL_CACHE_DIR, PROCESSED_PATH
+from validation import coerced_select, format_report, get_co2_schema, validate_in_duckdb
 import pandera as pa
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-def transform_data():
-    sql_dir = Path("src/sql")
-    processed_path = Path("data/processed/co2_data.parquet")
-    
+SQL_DIR = Path("src/sql")
+
+# The SQL models (see models.py) that read the raw data and produce the output.
+SOURCE_MODEL = "clean_and_cast"
+FINAL_MODEL = "add_rolling_averages"
+
+# Parquet layout of the processed output. Rows are sorted by (country, year) so
+# the per-row-group min/max statistics let readers skip most of the file when
+# filtering on country; hive partitioning by country or decade turns those
+# filters into whole-file skips instead.
+PARTITION_BY = None  # None, "country" or "decade"
+ROW_GROUP_SIZE = 4096
+COMPRESSION_LEVEL = 9
+
+def processed_scan(path=PROCESSED_PATH) -> str:
+    """SQL table expression over the processed output, single file or partitioned."""
+    path = Path(path)
+    if path.is_dir():
+        return f"read_parquet('{path}/**/*.parquet', hive_partitioning = false)"
+    return f"read_parquet('{path}')"
+
+def write_processed(con, query: str, path=PROCESSED_PATH, partition_by=PARTITION_BY):
+    """Write `query` straight from DuckDB to zstd Parquet, then swap it into place."""
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    if tmp_path.is_dir():
+        shutil.rmtree(tmp_path)
+
+    options = f"FORMAT PARQUET, COMPRESSION ZSTD, COMPRESSION_LEVEL {COMPRESSION_LEVEL}, ROW_GROUP_SIZE {ROW_GROUP_SIZE}"
+    if partition_by == "country":
+        options += ", PARTITION_BY (country), WRITE_PARTITION_COLUMNS true"
+    elif partition_by == "decade":
+        query = f"SELECT *, year // 10 * 10 AS decade FROM ({query})"
+        options += ", PARTITION_BY (decade)"
+    elif partition_by is not None:
+        raise ValueError(f"Unknown partitioning: {partition_by!r}")
+    con.execute(f"COPY ({query} ORDER BY country, year) TO '{tmp_path}' ({options})")
+
+    # Readers see either the old or the new output, never a half-written one.
+    old_path = path.with_name(path.name + ".old")
+    if path.exists():
+        os.replace(path, old_path)
+    os.replace(tmp_path, path)
+    if old_path.is_dir():
+        shutil.rmtree(old_path)
+    elif old_path.exists():
+        old_path.unlink()
+
+def changed_countries(con, source=SOURCE_MODEL) -> list:
+    """Countries whose cleaned rows differ between `source` and `previous`.
+
+    Each side is reduced to a row count and an order-independent XOR of row hashes
+    per country, so the diff is one aggregate scan over each input. Countries that
+    only exist on one side count as changed. Returns None when the previous output
+    does not carry every cleaned column and registry metric, i.e. it cannot be
+    diffed or merged.
+    """
+    columns = con.execute(f"SELECT column_name, column_type FROM (DESCRIBE {source})").fetchall()
+    previous_columns = {name for (name,) in con.execute("SELECT column_name FROM (DESCRIBE previous)").fetchall()}
+    if not {name for name, _ in columns} | set(metric_names()) <= previous_columns:
+        return None
+    new_row = ", ".join(name for name, _ in columns)
+    old_row = ", ".join(f"CAST({name} AS {data_type})" for name, data_type in columns)
+    rows = con.execute(f"""
+        WITH new AS (
+            SELECT country, count(*) AS n, bit_xor(hash({new_row})) AS h FROM {source} GROUP BY country
+        ), old AS (
+            SELECT country, count(*) AS n, bit_xor(hash({old_row})) AS h FROM previous GROUP BY country
+        )
+        SELECT coalesce(new.country, old.country)
+        FROM new FULL OUTER JOIN old ON new.country = old.country
+        WHERE new.n IS DISTINCT FROM old.n OR new.h IS DISTINCT FROM old.h
+    """).fetchall()
+    return [country for (country,) in rows]
+
+def transform_data(incremental=False, partition_by=PARTITION_BY, cache_dir=MODEL_CACHE_DIR):
+    """Build the processed dataset from the raw CSV.
+
+    The SQL models in SQL_DIR run in dependency order, each served from its
+    Parquet cache in `cache_dir` unless its SQL, its input files or an upstream
+    model changed. With `incremental=True` and a previous output on disk, only
+    countries whose raw rows changed are re-run through the models downstream
+    of SOURCE_MODEL; every window in them is partitioned by country, so the
+    other partitions are copied over from the previous output unchanged.
+    """
+    PROCESSED_PATH.parent.mkdir(parents=True, exist_ok=True)
+    # Normally done at ingest; a no-op while the staged file matches the raw CSV.
+    convert_raw()
+
     con = duckdb.connect(database=":memory:")
     logging.info("DuckDB connection established.")
+    models = discover(SQL_DIR, render)
 
-    # 1. Clean and Cast
-    with open(sql_dir / "01_clean_and_cast.sql", "r") as f:
-        con.execute("CREATE OR REPLACE VIEW cleaned_data AS " + f.read())
-    
-    # 2. Add Metrics (Placeholder)
-    with open(sql_dir / "02_calculate_metrics.sql", "r") as f:
-        con.execute("CREATE OR REPLACE VIEW metrics_data AS " + f.read())
-
-    # 3. Rolling Averages
-    with open(sql_dir / "03_add_rolling_averages.sql", "r") as f:
-        con.execute("CREATE OR REPLACE TABLE final_data AS " + f.read())
-    
-    # Fetch result
-    df = con.execute("SELECT * FROM final_data").fetchdf()
-    con.close()
-    
-    # Validate
+    changed = None
+    if incremental and PROCESSED_PATH.exists():
+        # 1. Clean and cast, then diff it against the previous output
+        run_models(con, {SOURCE_MODEL: models[SOURCE_MODEL]}, cache_dir)
+        con.execute(f"CREATE TABLE previous AS SELECT * FROM {processed_scan()}")
+        changed = changed_countries(con)
+        if changed is None:
+            logging.info("Previous output has a different schema, running a full rebuild.")
+        elif not changed:
+            logging.info("No country changed since the last run, keeping existing output.")
+            con.close()
+            return
+        else:
+            logging.info(f"Incremental run: recomputing {len(changed)} changed countries.")
+            con.execute("CREATE TABLE changed (country VARCHAR)")
+            con.executemany("INSERT INTO changed VALUES (?)", [[c] for c in changed])
+            con.execute(f"CREATE TABLE changed_rows AS SELECT * FROM {SOURCE_MODEL} WHERE country IN (SELECT country FROM changed)")
+            # A view over its cached Parquet, or a plain table without a cache
+            (kind,) = con.execute(
+                "SELECT table_type FROM information_schema.tables WHERE table_name = ?", [SOURCE_MODEL]
+            ).fetchone()
+            con.execute(f"DROP {'VIEW' if kind == 'VIEW' else 'TABLE'} {SOURCE_MODEL}")
+            con.execute(f"ALTER TABLE changed_rows RENAME TO {SOURCE_MODEL}")
+
+    # 2. Every other model; downstream of the filtered source they bypass the cache
+    run_models(con, models, cache_dir, skip={SOURCE_MODEL} if changed else ())
+    con.execute(f"CREATE TABLE final_data AS SELECT * FROM {FINAL_MODEL}")
+    instrument.count(
+        rows_in=con.execute(f"SELECT count(*) FROM {SOURCE_MODEL}").fetchone()[0],
+        bytes_read=sum(instrument.path_bytes(path) for model in models.values() for path in model["files"]),
+    )
+
+    # Merge the untouched partitions back in
+    if changed is not None:
+        con.execute("INSERT INTO final_data BY NAME SELECT * FROM previous WHERE country NOT IN (SELECT country FROM changed)")
+
+    # Validate in place: one aggregate scan, no DataFrame
     logging.info("Validating data schema...")
-    try:
-        schema = get_co2_schema()
-        df = schema.validate(df, lazy=True)
+    schema = get_co2_schema()
+    with instrument.stage("validation"):
+        report = validate_in_duckdb(con, "final_data", schema)
+        instrument.count(rows_in=report["rows"], rows_out=report["rows"])
+    if report["valid"]:
         logging.info("Validation Passed.")
-    except Exception as e:
-        logging.warning(f"Validation Warning: {e}")
+    else:
+        logging.warning(f"Validation Warning: {format_report(report)}")
 
-    # Save
-    df.to_parquet(processed_path, index=False)
-    logging.info(f"Saved processed data to {processed_path}")
+    # Save, applying the schema's strict="filter" and coerce=True
+    write_processed(con, f"SELECT {coerced_select(schema)} FROM final_data", partition_by=partition_by)
+    instrument.count(rows_out=report["rows"], bytes_written=instrument.path_bytes(PROCESSED_PATH))
+    con.close()
+    logging.info(f"Saved processed data to {PROCESSED_PATH}")
 
 if __name__ == "__main__":
-    transform_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Transform the raw CSV into the processed dataset.")
+    parser.add_argument("--incremental", action="store_true", help="only recompute countries whose raw rows changed")
+    parser.add_argument("--partition-by", choices=["country", "decade"], default=PARTITION_BY, help="write hive-partitioned output")
+    args = parser.parse_args()
+    transform_data(incremental=args.incremental, partition_by=args.partition_by)
@@ -1,5 +1,11 @@
+import pandas as pd
 import pandera as pa
 from pandera import Column, Check
+from metrics import metric_names
+
+SAMPLE_SIZE = 5
+# Columns that identify a row in failure samples, next to the failing column.
+SAMPLE_KEYS = ["country", "year"]
 
 def get_co2_schema() -> pa.DataFrameSchema:
     schema = pa.DataFrameSchema(
@@ -17,10 +23,146 @@ def get_co2_schema() -> pa.DataFrameSchema:
             "oil_co2": Column(float, nullable=True),
             "gas_co2": Column(float, nullable=True),
             "cement_co2": Column(float, nullable=True),
+            "flaring_co2": Column(float, nullable=True),
+            "share_global_co2": Column(float, nullable=True),
             "co2_growth_abs": Column(float, nullable=True),
             "co2_rolling_7yr": Column(float, nullable=True),
+            **{name: Column(float, nullable=True) for name in metric_names()},
         },
         strict="filter",
         coerce=True
     )
-    return schema
\ No newline at end of file
+    return schema
+
+# ------------------------------------------------------------------------------
+# SQL compilation of the schema
+#
+# The same contract, evaluated by DuckDB as a single aggregate over the table
+# instead of on a materialized DataFrame. Only the subset of Pandera used by
+# get_co2_schema() (dtypes, nullability, strict="filter" and the comparison
+# checks below) is supported; anything else raises so the two cannot drift.
+# ------------------------------------------------------------------------------
+
+SQL_TYPES = {"int": "BIGINT", "float": "DOUBLE", "str": "VARCHAR", "string": "VARCHAR", "bool": "BOOLEAN"}
+
+CHECK_SQL = {
+    "greater_than_or_equal_to": lambda col, s: f"{col} >= {_literal(s['min_value'])}",
+    "greater_than": lambda col, s: f"{col} > {_literal(s['min_value'])}",
+    "less_than_or_equal_to": lambda col, s: f"{col} <= {_literal(s['max_value'])}",
+    "less_than": lambda col, s: f"{col} < {_literal(s['max_value'])}",
+    "equal_to": lambda col, s: f"{col} = {_literal(s['value'])}",
+    "not_equal_to": lambda col, s: f"{col} <> {_literal(s['value'])}",
+    "in_range": lambda col, s: (
+        f"{col} {'>=' if s['include_min'] else '>'} {_literal(s['min_value'])} AND "
+        f"{col} {'<=' if s['include_max'] else '<'} {_literal(s['max_value'])}"
+    ),
+    "isin": lambda col, s: f"{col} IN ({', '.join(_literal(v) for v in s['allowed_values'])})",
+    "notin": lambda col, s: f"{col} NOT IN ({', '.join(_literal(v) for v in s['forbidden_values'])})",
+}
+
+def _literal(value) -> str:
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+def _sql_type(column: Column) -> str:
+    name = str(column.dtype)
+    for prefix, sql_type in SQL_TYPES.items():
+        if name.startswith(prefix):
+            return sql_type
+    raise TypeError(f"No SQL type for {column.name}: {name}")
+
+def _conditions(schema: pa.DataFrameSchema, present: set) -> list:
+    """(column, check, SQL condition true for failing rows) for each column rule."""
+    conditions = []
+    for name, column in schema.columns.items():
+        if name not in present:
+            continue
+        col = f'"{name}"'
+        if schema.coerce or column.coerce:
+            conditions.append((name, f"coerce_dtype('{column.dtype}')", f"{col} IS NOT NULL AND TRY_CAST({col} AS {_sql_type(column)}) IS NULL"))
+        if not column.nullable:
+            conditions.append((name, "not_nullable", f"{col} IS NULL"))
+        for check in column.checks:
+            if check.name not in CHECK_SQL:
+                raise ValueError(f"Check {check.name} on {name} has no SQL equivalent")
+            condition = f"NOT ({CHECK_SQL[check.name](col, check.statistics)})"
+            if check.ignore_na:
+                condition = f"{col} IS NOT NULL AND {condition}"
+            conditions.append((name, check.error or check.name, condition))
+    return conditions
+
+def coerced_select(schema: pa.DataFrameSchema) -> str:
+    """SELECT list that applies the schema's strict="filter" and coerce=True."""
+    return ", ".join(f'TRY_CAST("{name}" AS {_sql_type(column)}) AS "{name}"' for name, column in schema.columns.items())
+
+def validate_in_duckdb(con, relation: str, schema: pa.DataFrameSchema = None) -> dict:
+    """Check `relation` against the schema with one aggregate query.
+
+    Returns a report of the form
+    {"valid": bool, "rows": int, "failures": [{"column", "check", "failure_count", "sample"}], "dropped_columns": [...]}
+    where `sample` holds up to SAMPLE_SIZE offending rows, each reduced to the
+    SAMPLE_KEYS columns and the failing column. Raises TypeError for a column
+    dtype and ValueError for a check that has no SQL translation.
+    """
+    schema = schema or get_co2_schema()
+    present = [name for (name,) in con.execute(f"SELECT column_name FROM (DESCRIBE {relation})").fetchall()]
+    failures = []
+    missing = [name for name, column in schema.columns.items() if column.required and name not in present]
+    if missing:
+        failures.append({"column": None, "check": "column_in_dataframe", "failure_count": len(missing), "sample": missing[:SAMPLE_SIZE]})
+
+    conditions = _conditions(schema, set(present))
+    aggregates = ["count(*)"]
+    keys = [name for name in SAMPLE_KEYS if name in present]
+    for column, _, condition in conditions:
+        sample = ", ".join(f'"{name}"' for name in dict.fromkeys([*keys, column]))
+        aggregates.append(f"count(*) FILTER (WHERE {condition})")
+        aggregates.append(f"min_by(struct_pack({sample}), 1, {SAMPLE_SIZE}) FILTER (WHERE {condition})")
+    row = con.execute(f"SELECT {', '.join(aggregates)} FROM {relation}").fetchone()
+
+    for i, (column, check, _) in enumerate(conditions):
+        count, sample = row[1 + 2 * i], row[2 + 2 * i]
+        if count:
+            failures.append({"column": column, "check": check, "failure_count": count, "sample": sample})
+
+    return {
+        "valid": not failures,
+        "rows": row[0],
+        "failures": failures,
+        "dropped_columns": [name for name in present if name not in schema.columns] if schema.strict == "filter" else [],
+    }
+
+def validate_with_pandera(df, schema: pa.DataFrameSchema = None) -> dict:
+    """Pandera reference implementation producing the same report as validate_in_duckdb()."""
+    schema = schema or get_co2_schema()
+    try:
+        schema.validate(df, lazy=True)
+        failure_cases = None
+    except pa.errors.SchemaErrors as e:
+        failure_cases = e.failure_cases
+
+    failures = []
+    if failure_cases is not None:
+        for (column, check), cases in failure_cases.groupby(["column", "check"], dropna=False, sort=False):
+            # A failed coercion is also reported as a dtype failure; count it once.
+            if schema.coerce and check.startswith("dtype("):
+                continue
+            failures.append({
+                "column": None if pd.isna(column) else column,
+                "check": check,
+                "failure_count": len(cases),
+                "sample": cases["failure_case"].head(SAMPLE_SIZE).tolist(),
+            })
+    return {
+        "valid": not failures,
+        "rows": len(df),
+        "failures": failures,
+        "dropped_columns": [name for name in df.columns if name not in schema.columns] if schema.strict == "filter" else [],
+    }
+
+def format_report(report: dict) -> str:
+    lines = [f"{report['rows']} rows, {len(report['failures'])} failed checks:"]
+    for failure in report["failures"]:
+        lines.append(f"  {failure['column']}: {failure['check']} x{failure['failure_count']} e.g. {failure['sample'][:2]}")
+    return "\n".join(lines)
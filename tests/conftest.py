@@ -0,0 +1,136 @@
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+import marts
+import transform
+from tests.synthetic import make_owid_frame, write_owid_csv
+
+REPO_SRC = Path(__file__).resolve().parents[1] / "src"
+REPO_SQL = REPO_SRC / "sql"
+RAW = Path("data/raw/owid-co2-data.csv")
+
+
+def use_workspace(monkeypatch, path, raw):
+    """Run from `path` with the repo's SQL models, and `raw` as the raw OWID CSV."""
+    monkeypatch.chdir(path)
+    monkeypatch.setattr(transform, "SQL_DIR", REPO_SQL)
+    monkeypatch.setattr(marts, "MART_DIR", REPO_SQL / "marts")
+    write_owid_csv(RAW, raw)
+
+
+@pytest.fixture
+def raw_frame(request):
+    """The synthetic raw data; parametrize indirectly with make_owid_frame() arguments to change it."""
+    return make_owid_frame(**getattr(request, "param", {}))
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch, raw_frame):
+    use_workspace(monkeypatch, tmp_path, raw_frame)
+    return tmp_path
+
+
+@pytest.fixture
+def transformed(workspace):
+    """The workspace after a full transform run."""
+    transform.transform_data()
+    return workspace
+
+
+class StubServer:
+    """Local stand-in for raw.githubusercontent.com serving a single file.
+
+    Supports ETag/Last-Modified revalidation and byte ranges, counts the body
+    bytes it sends, and can drop the connection part-way through a response,
+    answer after a `delay` in seconds, fail every request with `status`, or
+    answer range requests from the wrong offset (`wrong_range`).
+    """
+
+    def __init__(self):
+        self.payload = b""
+        self.etag = '"v1"'
+        self.last_modified = formatdate(0, usegmt=True)
+        self.bytes_sent = 0
+        self.requests = []
+        self.fail_after = None
+        self.delay = 0
+        self.status = None
+        self.wrong_range = False
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self._server.server_port}/owid-co2-data.csv"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def publish(self, payload: bytes, etag: str):
+        self.payload = payload
+        self.etag = etag
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                stub.requests.append(dict(self.headers))
+                time.sleep(stub.delay)
+                if stub.status is not None:
+                    self.send_error(stub.status)
+                    return
+                if self.headers.get("If-None-Match") == stub.etag:
+                    self.send_response(304)
+                    self.send_header("ETag", stub.etag)
+                    self.end_headers()
+                    return
+
+                start = 0
+                range_header = self.headers.get("Range")
+                if range_header and self.headers.get("If-Range", stub.etag) == stub.etag:
+                    start = int(range_header.split("=")[1].rstrip("-"))
+                    if start >= len(stub.payload):
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{len(stub.payload)}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    if stub.wrong_range:
+                        start //= 2
+
+                body = stub.payload[start:]
+                self.send_response(206 if start else 200)
+                if start:
+                    self.send_header("Content-Range", f"bytes {start}-{len(stub.payload) - 1}/{len(stub.payload)}")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", stub.etag)
+                self.send_header("Last-Modified", stub.last_modified)
+                self.end_headers()
+
+                if stub.fail_after is not None:
+                    body = body[: stub.fail_after]
+                    stub.fail_after = None
+                    self.close_connection = True
+                for i in range(0, len(body), 64 * 1024):
+                    chunk = body[i : i + 64 * 1024]
+                    self.wfile.write(chunk)
+                    stub.bytes_sent += len(chunk)
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    with StubServer() as server:
+        yield server
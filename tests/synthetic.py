@@ -0,0 +1,111 @@
+"""Synthetic OWID-shaped CO₂ data for tests."""
+
+import numpy as np
+import pandas as pd
+
+MEASURES = [
+    "population", "gdp", "co2", "co2_per_capita", "cumulative_co2", "consumption_co2",
+    "coal_co2", "oil_co2", "gas_co2", "cement_co2", "flaring_co2", "share_global_co2",
+    "co2_growth_abs",
+]
+# The real file has ~80 columns; the pipeline ignores most of them.
+UNUSED = ["methane", "nitrous_oxide", "primary_energy_consumption", "energy_per_gdp", "total_ghg"]
+AGGREGATES = ["World", "Europe", "Asia", "High-income countries"]
+# Countries the stories look up by name.
+NAMED = [
+    ("China", "CHN"), ("United States", "USA"), ("India", "IND"), ("Russia", "RUS"),
+    ("Japan", "JPN"), ("Germany", "DEU"), ("United Kingdom", "GBR"),
+]
+
+
+def make_owid_frame(n_countries=40, first_year=1900, last_year=2022, seed=0) -> pd.DataFrame:
+    """One row per (entity, year) with the OWID column layout and realistic gaps."""
+    rng = np.random.default_rng(seed)
+    entities = NAMED + [(f"Country {i:03d}", f"C{i:02d}") for i in range(n_countries - len(NAMED))]
+    entities += [(name, None) for name in AGGREGATES]
+    years = np.arange(first_year, last_year + 1)
+
+    frames = []
+    for country, iso in entities:
+        n = len(years)
+        population = rng.uniform(1e5, 1e8) * np.linspace(0.3, 1.0, n)
+        co2 = np.abs(rng.normal(100, 40) + np.cumsum(rng.normal(1, 5, n)))
+        fuels = rng.dirichlet(np.ones(5), n) * co2[:, None]
+        frame = pd.DataFrame({
+            "country": country,
+            "year": years,
+            "iso_code": iso,
+            "population": population.round(),
+            "gdp": population * rng.uniform(1e3, 5e4) * np.linspace(0.2, 1.0, n),
+            "co2": co2,
+            "co2_per_capita": co2 * 1e6 / population,
+            "cumulative_co2": np.cumsum(co2),
+            "consumption_co2": np.where(years >= 1990, co2 * rng.uniform(0.8, 1.3), np.nan),
+            "coal_co2": fuels[:, 0],
+            "oil_co2": fuels[:, 1],
+            "gas_co2": fuels[:, 2],
+            "cement_co2": fuels[:, 3],
+            "flaring_co2": fuels[:, 4],
+            "share_global_co2": rng.uniform(0, 5, n),
+            "co2_growth_abs": np.concatenate([[np.nan], np.diff(co2)]),
+        })
+        for column in UNUSED:
+            frame[column] = rng.uniform(0, 1, n)
+        frames.append(frame)
+
+    df = pd.concat(frames, ignore_index=True)
+    # Sprinkle missing values over the measures, as in the real dataset.
+    for column in ["gdp", "coal_co2", "cement_co2", "flaring_co2"]:
+        df.loc[rng.random(len(df)) < 0.1, column] = np.nan
+    return df
+
+
+def write_owid_csv(path, df: pd.DataFrame):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=False)
+
+
+# Size of the real OWID file: ~255 entities (countries plus aggregates) over
+# 1750-2023. A benchmark scale multiplies the row count, split between more
+# entities and a longer (future-extended) span of years.
+REAL_ENTITIES = 255
+REAL_FIRST_YEAR, REAL_LAST_YEAR = 1750, 2023
+SCALES = {1: (1, 1), 10: (5, 2), 100: (10, 10)}
+
+
+def make_scaled_frame(scale=1, seed=0) -> pd.DataFrame:
+    """make_owid_frame() at `scale` times the real size, generated without a per-entity loop."""
+    entity_factor, year_factor = SCALES[scale]
+    rng = np.random.default_rng(seed)
+    n_countries = REAL_ENTITIES * entity_factor - len(AGGREGATES)
+    entities = NAMED + [(f"Country {i:05d}", f"C{i:04d}") for i in range(n_countries - len(NAMED))]
+    entities += [(name, None) for name in AGGREGATES]
+    years = np.arange(REAL_FIRST_YEAR, REAL_FIRST_YEAR + (REAL_LAST_YEAR - REAL_FIRST_YEAR + 1) * year_factor)
+    n_entities, n_years = len(entities), len(years)
+
+    # (entity, year) grids, flattened entity-major like the real file.
+    population = rng.uniform(1e5, 1e8, (n_entities, 1)) * np.linspace(0.3, 1.0, n_years)
+    gdp = population * rng.uniform(1e3, 5e4, (n_entities, 1)) * np.linspace(0.2, 1.0, n_years)
+    co2 = np.abs(rng.normal(100, 40, (n_entities, 1)) + np.cumsum(rng.normal(1, 5, (n_entities, n_years)), axis=1))
+    fuels = rng.dirichlet(np.ones(5), (n_entities, n_years)) * co2[..., None]
+    all_years = np.broadcast_to(years, (n_entities, n_years))
+    columns = {
+        "country": pd.Categorical.from_codes(np.repeat(np.arange(n_entities), n_years), [c for c, _ in entities]).astype(str),
+        "year": all_years.ravel(),
+        "iso_code": np.repeat(np.array([iso for _, iso in entities], dtype=object), n_years),
+        "population": population.round().ravel(),
+        "gdp": gdp.ravel(),
+        "co2": co2.ravel(),
+        "co2_per_capita": (co2 * 1e6 / population).ravel(),
+        "cumulative_co2": np.cumsum(co2, axis=1).ravel(),
+        "consumption_co2": np.where(all_years >= 1990, co2 * rng.uniform(0.8, 1.3, (n_entities, 1)), np.nan).ravel(),
+        **{f"{fuel}_co2": fuels[..., i].ravel() for i, fuel in enumerate(["coal", "oil", "gas", "cement", "flaring"])},
+        "share_global_co2": rng.uniform(0, 5, n_entities * n_years),
+        "co2_growth_abs": np.concatenate([np.full((n_entities, 1), np.nan), np.diff(co2, axis=1)], axis=1).ravel(),
+    }
+    for column in UNUSED:
+        columns[column] = rng.uniform(0, 1, n_entities * n_years)
+    df = pd.DataFrame(columns)
+    for column in ["gdp", "coal_co2", "cement_co2", "flaring_co2"]:
+        df.loc[rng.random(len(df)) < 0.1, column] = np.nan
+    return df
@@ -0,0 +1,102 @@
+import gzip
+import io
+import json
+import os
+import threading
+from http.client import HTTPConnection
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import api
+import load
+
+# Years before datasource.MIN_YEAR never reach the API, so none are generated.
+pytestmark = pytest.mark.parametrize("raw_frame", [{"first_year": 1950}], indirect=True)
+
+
+@pytest.fixture
+def server(transformed):
+    load.load_data()
+
+    server = api.make_server(api.API(api.DataService(check_interval=0)), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, target, **headers):
+    con = HTTPConnection("127.0.0.1", server.server_port)
+    con.request("GET", target, headers=headers)
+    response = con.getresponse()
+    body = response.read()
+    con.close()
+    return response, body
+
+
+def test_endpoints_serve_query_results_as_json_and_arrow(server):
+    _, query = server.api.service.current()
+
+    response, body = get(server, "/series?country=India&country=China&metrics=co2,gdp&from=2000&to=2004")
+    assert response.status == 200 and response.getheader("Content-Type") == api.JSON_TYPE
+    expected = query.series(["China", "India"], ["co2", "gdp"], years=(2000, 2004))
+    pd.testing.assert_frame_equal(pd.DataFrame(json.loads(body)), expected.astype({"country": str}), check_dtype=False)
+
+    response, body = get(server, "/cross-section?year=2018&metrics=co2_per_capita&countries_only=true",
+                         Accept=api.ARROW_TYPE)
+    assert response.getheader("Content-Type") == api.ARROW_TYPE
+    table = pa.ipc.open_stream(io.BytesIO(body)).read_all()
+    pd.testing.assert_frame_equal(table.to_pandas(), query.cross_section(2018, "co2_per_capita", countries_only=True))
+
+    _, body = get(server, "/top?metric=cumulative_co2&k=3&format=json")
+    top = pd.DataFrame(json.loads(body))
+    assert top["country"].tolist() == query.top_k(query.latest_year, "cumulative_co2", 3)["country"].tolist()
+
+
+def test_large_responses_are_gzipped(server):
+    plain, body = get(server, "/cross-section?year=2018&metrics=co2,gdp,population")
+    zipped, compressed = get(server, "/cross-section?year=2018&metrics=co2,gdp,population", **{"Accept-Encoding": "gzip"})
+    assert plain.getheader("Content-Encoding") is None
+    assert zipped.getheader("Content-Encoding") == "gzip"
+    assert gzip.decompress(compressed) == body and len(compressed) < len(body)
+
+    small, _ = get(server, "/top?k=1", **{"Accept-Encoding": "gzip"})
+    assert small.getheader("Content-Encoding") is None
+
+
+def test_etag_revalidation_follows_the_data_version(server):
+    first, body = get(server, "/series?country=India")
+    etag = first.getheader("ETag")
+    # Equivalent requests share the tag and the cached body.
+    again, same = get(server, "/series?metrics=co2&country=India&country=India")
+    assert again.getheader("ETag") == etag and same == body
+    assert server.api.cache.hits == 1
+
+    not_modified, empty = get(server, "/series?country=India", **{"If-None-Match": etag})
+    assert not_modified.status == 304 and empty == b""
+
+    # The pipeline publishes a new store: the old tag no longer matches.
+    store = Path("data/co2_data.duckdb")
+    stat = store.stat()
+    os.utime(store, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    refreshed, _ = get(server, "/series?country=India", **{"If-None-Match": etag})
+    assert refreshed.status == 200 and refreshed.getheader("ETag") != etag
+    assert refreshed.getheader("X-Data-Version") != first.getheader("X-Data-Version")
+
+
+def test_bad_requests_get_json_errors(server):
+    for target, status in [
+        ("/series?metrics=co2", 400),
+        ("/series?country=India&metrics=nope", 400),
+        ("/cross-section?year=last", 400),
+        ("/top?k=0", 400),
+        ("/top?format=csv", 400),
+        ("/countries", 404),
+    ]:
+        response, body = get(server, target)
+        assert response.status == status, target
+        assert "error" in json.loads(body)
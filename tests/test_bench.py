@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from benchmarks import bench
+from tests.synthetic import SCALES, make_scaled_frame
+
+
+@pytest.mark.parametrize("scale", sorted(SCALES))
+def test_scales_multiply_the_real_row_count(scale):
+    entity_factor, year_factor = SCALES[scale]
+    assert entity_factor * year_factor == scale
+    if scale == 1:
+        df = make_scaled_frame(scale)
+        assert df["country"].nunique() == 255
+        assert (df["year"].min(), df["year"].max()) == (1750, 2023)
+
+
+def test_measure_reports_time_and_memory():
+    result = bench.measure(lambda: bytearray(64 * 2**20), repeat=2)
+    assert result["seconds"] > 0
+    assert result["peak_rss_mb"] >= 32
+
+
+def test_compare_flags_only_regressions_beyond_the_thresholds():
+    baseline = {
+        "thresholds": bench.THRESHOLDS,
+        "scales": {"1": {"stages": {
+            "csv_parse": {"seconds": 1.0, "peak_rss_mb": 100},
+            "story:tiny": {"seconds": 0.01, "peak_rss_mb": 1},
+        }}},
+    }
+    results = {"1": {"stages": {
+        "csv_parse": {"seconds": 1.6, "peak_rss_mb": 140},
+        # 5x slower but within the absolute slack
+        "story:tiny": {"seconds": 0.05, "peak_rss_mb": 20},
+        "new_stage": {"seconds": 9.0, "peak_rss_mb": 900},
+    }}, "100": {"stages": {"csv_parse": {"seconds": 99.0, "peak_rss_mb": 9000}}}}
+    assert bench.compare(results, baseline) == ["1x csv_parse: seconds 1.6 > 1.5 (baseline 1.0)"]
+
+
+def test_baseline_covers_every_stage():
+    baseline = json.loads(bench.BASELINE_PATH.read_text())
+    stories = {f"story:{path.split('.')[-1]}" for path in bench.story_modules()}
+    for scale in ("1", "10"):
+        stages = set(baseline["scales"][scale]["stages"])
+        assert stories <= stages
+        assert {"csv_parse", "rolling_window", "validation", "load_data", "publish_snapshot", "load_store", "load_real_data"} <= stages
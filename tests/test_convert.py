@@ -0,0 +1,51 @@
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from convert import RAW_SCHEMA, STAGED_PATH, convert_raw, staged_source_hash
+from fingerprint import hash_file
+from tests.conftest import RAW, REPO_SQL
+from tests.synthetic import make_owid_frame, write_owid_csv
+
+
+def test_conversion_keeps_only_the_declared_columns_and_types(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    raw = make_owid_frame(n_countries=10)
+    write_owid_csv(RAW, raw.drop(columns="consumption_co2"))
+
+    assert convert_raw() is True
+    table = pq.read_table(STAGED_PATH)
+    assert table.schema.remove_metadata() == RAW_SCHEMA
+    assert table.num_rows == len(raw)
+    # Empty ISO codes (aggregates) are nulls, a column missing from the file is all nulls.
+    assert table["iso_code"].null_count == (raw["iso_code"].isna()).sum()
+    assert table["consumption_co2"].null_count == len(raw)
+    assert staged_source_hash() == hash_file(RAW)
+
+
+def test_conversion_is_skipped_while_the_raw_file_is_unchanged(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_owid_csv(RAW, make_owid_frame(n_countries=10))
+    assert convert_raw() is True
+    mtime = STAGED_PATH.stat().st_mtime_ns
+
+    assert convert_raw() is False
+    assert STAGED_PATH.stat().st_mtime_ns == mtime
+
+    write_owid_csv(RAW, make_owid_frame(n_countries=11))
+    assert convert_raw() is True
+    assert pq.read_metadata(STAGED_PATH).num_rows == 11 * 123 + 4 * 123
+
+
+def test_clean_and_cast_matches_reading_the_csv_directly(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_owid_csv(RAW, make_owid_frame(n_countries=10))
+    convert_raw()
+
+    sql = (REPO_SQL / "01_clean_and_cast.sql").read_text().rstrip().rstrip(";")
+    from_csv = sql.replace("read_parquet('data/staged/owid-co2-data.parquet')", f"read_csv_auto('{RAW}')")
+    con = duckdb.connect()
+    staged = con.execute(f"{sql} ORDER BY country, year").df()
+    direct = con.execute(f"{from_csv} ORDER BY country, year").df()
+    assert len(staged) == len(direct) > 0
+    assert staged.equals(direct)
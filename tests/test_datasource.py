@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+import datasource
+import load
+import transform
+from tests.conftest import RAW
+
+
+def test_store_and_parquet_serve_the_same_frame(workspace):
+    transform.transform_data()
+    load.load_data()
+
+    from_store, source, seconds = datasource.load_frame(["duckdb"])
+    assert source == "duckdb" and seconds > 0
+    from_parquet, _, _ = datasource.load_frame(["parquet"])
+
+    pd.testing.assert_frame_equal(from_store, from_parquet)
+    assert list(from_store.columns) == ["country", "year", "iso_code", "is_aggregate", *list(datasource.COLUMNS)[3:]]
+    assert from_store["year"].min() == datasource.MIN_YEAR
+    assert not from_store.drop(columns="iso_code").isna().any().any()
+    assert from_store["is_aggregate"].equals(from_store["iso_code"].isna())
+    assert set(from_store.loc[from_store["is_aggregate"], "country"]) == {"World"}
+
+
+def test_local_frame_matches_remote_csv_reader(workspace):
+    transform.transform_data()
+    local, _, _ = datasource.load_frame(["parquet"])
+
+    # The pipeline keeps countries plus World; compare against the CSV reader
+    # on the same rows.
+    remote = datasource.read_remote_csv(RAW)
+    remote = remote[remote["iso_code"].notna() | (remote["country"] == "World")]
+    remote = datasource.compact(remote.sort_values(["country", "year"], ignore_index=True))
+    pd.testing.assert_frame_equal(local, remote, check_categorical=False)
+
+
+def test_sources_are_tried_in_order(workspace):
+    transform.transform_data()
+    _, source, _ = datasource.load_frame(["duckdb", "parquet"])
+    assert source == "parquet"
+
+    with pytest.raises(FileNotFoundError):
+        datasource.load_frame(["duckdb"])
+
+
+def write_store(path, rows):
+    """A minimal store: co2_emissions from `rows` and one story mart, swapped in atomically."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+    con = duckdb.connect(str(tmp_path))
+    con.execute("CREATE TABLE co2_emissions (country VARCHAR, year BIGINT, iso_code VARCHAR, co2 DOUBLE)")
+    con.executemany("INSERT INTO co2_emissions VALUES (?, ?, ?, ?)", rows)
+    con.execute("CREATE TABLE mart_story_1 AS SELECT year, sum(co2) AS co2 FROM co2_emissions GROUP BY year")
+    con.close()
+    os.replace(tmp_path, path)
+
+
+ROWS = [
+    ("Chad", 2000, "TCD", 1.0), ("Chad", 2001, "TCD", 2.0),
+    ("O'Land", 2000, "OLD", 5.0), ("World", 2000, None, 9.0),
+]
+
+
+def test_connection_manager_hands_out_prepared_cursor_per_thread(tmp_path):
+    db_path = tmp_path / "store.duckdb"
+    write_store(db_path, ROWS)
+    manager = datasource.ConnectionManager(db_path, threads=1, memory_limit="256MB")
+
+    with manager.cursor() as cur:
+        assert cur.execute("SELECT current_setting('threads')").fetchone()[0] == 1
+        assert cur.execute("SELECT current_setting('memory_limit')").fetchone()[0] == "244.1 MiB"
+    cursors, together = [], threading.Barrier(3)
+    def grab():
+        with manager.cursor() as cur:
+            cursors.append(cur)
+        # Kept alive until all have a cursor, so no thread ident is reused.
+        together.wait()
+    threads = [threading.Thread(target=grab) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with manager.cursor() as cur, manager.cursor() as again:
+        assert cur is again and cur not in cursors
+    assert len({id(cur) for cur in cursors}) == 3
+
+    assert manager.query("SELECT * FROM co2_emissions WHERE country = ?", ["O'Land"])["co2"].tolist() == [5.0]
+    assert manager.marts == {"mart_story_1"}
+    pd.testing.assert_frame_equal(manager.execute("mart_story_1"), manager.query("SELECT * FROM mart_story_1"))
+    assert manager.table("mart_story_1")["co2"].sum() == 17.0
+    assert manager.table("mart_story_99") is None
+    manager.close()
+
+
+def test_connection_manager_reopens_swapped_store(tmp_path):
+    db_path = tmp_path / "store.duckdb"
+    write_store(db_path, ROWS)
+    manager = datasource.ConnectionManager(db_path)
+    assert len(manager.query("SELECT * FROM co2_emissions")) == 4
+    assert manager.generation == 1
+
+    errors, stop = [], threading.Event()
+    def read():
+        while not stop.is_set():
+            try:
+                assert manager.table("mart_story_1")["co2"].sum() in (17.0, 20.0)
+            except Exception as e:
+                errors.append(e)
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    write_store(db_path, ROWS + [("Togo", 2000, "TGO", 3.0)])
+    time.sleep(0.2)
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert not errors
+    assert len(manager.query("SELECT * FROM co2_emissions")) == 5
+    assert manager.table("mart_story_1")["co2"].sum() == 20.0
+    assert manager.generation == 2
+    manager.close()
+
+
+def test_connection_manager_has_no_tables_without_a_store(tmp_path):
+    manager = datasource.ConnectionManager(tmp_path / "missing.duckdb")
+    assert manager.table("mart_story_1") is None
+    assert manager.table("co2_emissions") is None
+
+
+def test_store_readers_share_one_manager_per_file(workspace):
+    assert datasource.store_connections() is datasource.store_connections(workspace / datasource.DB_PATH)
+
+
+def test_frame_handle_views_share_memory_but_not_writes(workspace):
+    transform.transform_data()
+    frame, source, seconds = datasource.load_frame(["parquet"])
+    handle = datasource.FrameHandle(frame, source, seconds)
+    assert handle.version == datasource.data_version(source, frame)
+
+    expected = frame.copy()
+    view = handle.view()
+    assert np.shares_memory(view["co2"].to_numpy(), frame["co2"].to_numpy())
+    with pytest.raises(ValueError, match="read-only"):
+        view["co2"].to_numpy()[0] = -1.0
+    view.loc[0, "co2"] = -1.0
+    view.loc[view["is_aggregate"], "year"] = 0
+    view["extra"] = 1
+    view["country"] = "Nowhere"
+    pd.testing.assert_frame_equal(handle.view(), expected)
@@ -0,0 +1,95 @@
+import socket
+import time
+
+import pytest
+
+from docfetch import DocumentFetcher
+
+
+@pytest.fixture
+def bundled(tmp_path):
+    path = tmp_path / "README.md"
+    path.write_text("# Bundled README\n")
+    return path
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_fresh_copy_is_served_from_memory(stub_server, bundled):
+    stub_server.publish("# Remote README ✓\n".encode(), etag='"v1"')
+    fetcher = DocumentFetcher(stub_server.url, bundled, max_age=60)
+
+    assert fetcher.get() == ("# Remote README ✓\n", "remote")
+    assert fetcher.get() == ("# Remote README ✓\n", "remote")
+    assert len(stub_server.requests) == 1
+
+
+def test_stale_copy_is_served_at_once_and_revalidated_in_the_background(stub_server, bundled):
+    stub_server.publish(b"v1", etag='"v1"')
+    fetcher = DocumentFetcher(stub_server.url, bundled, max_age=0)
+    assert fetcher.get() == ("v1", "remote")
+    wait_for(lambda: fetcher._refresh is None)
+
+    # Unchanged upstream: the refresh is a conditional request answered with 304.
+    stub_server.delay = 0.5
+    start = time.perf_counter()
+    assert fetcher.get() == ("v1", "remote")
+    assert time.perf_counter() - start < 0.25
+    wait_for(lambda: fetcher._refresh is None)
+    assert stub_server.requests[-1]["If-None-Match"] == '"v1"'
+    assert stub_server.bytes_sent == 2
+
+    stub_server.delay = 0
+    stub_server.publish(b"v2", etag='"v2"')
+    fetcher.get()
+    wait_for(lambda: fetcher.text == "v2")
+    assert fetcher.etag == '"v2"'
+
+
+def test_slow_first_fetch_falls_back_to_the_bundled_copy(stub_server, bundled):
+    stub_server.publish(b"remote", etag='"v1"')
+    stub_server.delay = 0.5
+    fetcher = DocumentFetcher(stub_server.url, bundled, first_fetch_wait=0.1)
+
+    start = time.perf_counter()
+    assert fetcher.get() == ("# Bundled README\n", "bundled")
+    assert time.perf_counter() - start < 0.4
+    wait_for(lambda: fetcher.text is not None)
+    assert fetcher.get() == ("remote", "remote")
+
+
+def test_unavailable_upstream_keeps_the_last_good_copy(stub_server, bundled):
+    stub_server.status = 503
+    fetcher = DocumentFetcher(stub_server.url, bundled, max_age=0)
+    assert fetcher.get()[1] == "bundled"
+    assert "503" in fetcher.error
+
+    stub_server.status = None
+    stub_server.publish(b"remote", etag='"v1"')
+    assert fetcher.refresh() is True
+    stub_server.status = 503
+    assert fetcher.refresh() is False
+    assert fetcher.get()[0] == "remote"
+
+
+def test_timeouts_bound_the_fetch(stub_server, bundled):
+    stub_server.publish(b"remote", etag='"v1"')
+    stub_server.delay = 0.5
+    fetcher = DocumentFetcher(stub_server.url, bundled, timeout=0.1)
+    start = time.perf_counter()
+    assert fetcher.refresh() is False
+    assert time.perf_counter() - start < 0.4
+    assert fetcher.error and fetcher.text is None
+
+
+def test_offline_serves_the_bundled_copy(bundled):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    fetcher = DocumentFetcher(f"http://127.0.0.1:{port}/README.md", bundled)
+    assert fetcher.get() == ("# Bundled README\n", "bundled")
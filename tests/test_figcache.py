@@ -0,0 +1,68 @@
+import json
+import threading
+import time
+
+import plotly.graph_objects as go
+
+from figcache import FigureCache, cache_key
+
+
+def make_figure(y):
+    return go.Figure(go.Scatter(x=[1, 2, 3], y=y))
+
+
+def test_hits_skip_the_build_and_return_the_built_figure():
+    cache = FigureCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return make_figure([1, 2, 3])
+
+    key = cache_key("stories.story_03", "v1", ())
+    first = cache.get(key, build)
+    second = cache.get(key, build)
+
+    assert len(builds) == 1
+    assert first is second
+    assert json.loads(first.to_json()) == json.loads(make_figure([1, 2, 3]).to_json())
+    assert cache.stats() == {"hits": 1, "disk_hits": 0, "misses": 1, "entries": 1}
+    assert cache_key("stories.story_03", "v2", ()) != key
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = FigureCache(max_entries=2)
+    for name in ["a", "b", "a", "c"]:
+        cache.get_json(name, lambda: make_figure([0]))
+    cache.get_json("b", lambda: make_figure([0]))
+    assert cache.stats()["misses"] == 4
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    FigureCache(disk_dir=tmp_path).get_json("k", lambda: make_figure([4, 5, 6]))
+
+    fresh = FigureCache(disk_dir=tmp_path)
+    payload = fresh.get_json("k", lambda: make_figure([0]))
+    assert payload == make_figure([4, 5, 6]).to_json()
+    assert fresh.stats()["disk_hits"] == 1 and fresh.stats()["misses"] == 0
+    assert [p.name for p in tmp_path.iterdir()] == ["k.json"]
+    assert fresh.get("k", lambda: make_figure([0])) is fresh.get("k", lambda: make_figure([0]))
+
+
+def test_concurrent_sessions_share_one_build():
+    cache = FigureCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        time.sleep(0.05)
+        return make_figure([1])
+
+    threads = [threading.Thread(target=cache.get_json, args=("k", build)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert cache.stats()["hits"] == 7 and cache.stats()["misses"] == 1
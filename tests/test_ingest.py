@@ -0,0 +1,128 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+from ingest import ingest_data
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+
+def make_payload(n_rows: int) -> bytes:
+    lines = [b"country,year,co2"]
+    lines += [b"Country %d,%d,%d.5" % (i % 250, 1750 + i % 275, i) for i in range(n_rows)]
+    return b"\n".join(lines) + b"\n"
+
+
+def test_conditional_download_skips_unchanged_file(stub_server, tmp_path):
+    stub_server.publish(make_payload(10_000), etag='"v1"')
+    output_path = tmp_path / "raw.csv"
+
+    assert ingest_data(stub_server.url, output_path) is True
+    assert output_path.read_bytes() == stub_server.payload
+    first_transfer = stub_server.bytes_sent
+
+    assert ingest_data(stub_server.url, output_path) is False
+    assert stub_server.bytes_sent == first_transfer
+    assert stub_server.requests[-1]["If-None-Match"] == '"v1"'
+
+    stub_server.publish(make_payload(12_000), etag='"v2"')
+    assert ingest_data(stub_server.url, output_path) is True
+    assert output_path.read_bytes() == stub_server.payload
+
+
+def test_interrupted_download_resumes_with_range(stub_server, tmp_path):
+    stub_server.publish(make_payload(50_000), etag='"v1"')
+    output_path = tmp_path / "raw.csv"
+    stub_server.fail_after = 300_000
+
+    with pytest.raises(requests.RequestException):
+        ingest_data(stub_server.url, output_path)
+    # The previous (missing) file is never replaced by a truncated one.
+    assert not output_path.exists()
+
+    resume_at = (tmp_path / "raw.csv.part").stat().st_size
+    assert resume_at > 0
+    sent_before_resume = stub_server.bytes_sent
+    assert ingest_data(stub_server.url, output_path) is True
+    assert stub_server.requests[-1]["Range"] == f"bytes={resume_at}-"
+    assert stub_server.bytes_sent - sent_before_resume == len(stub_server.payload) - resume_at
+    assert output_path.read_bytes() == stub_server.payload
+
+
+def test_resume_restarts_when_remote_file_changed(stub_server, tmp_path):
+    stub_server.publish(make_payload(50_000), etag='"v1"')
+    output_path = tmp_path / "raw.csv"
+    stub_server.fail_after = 300_000
+    with pytest.raises(requests.RequestException):
+        ingest_data(stub_server.url, output_path)
+
+    stub_server.publish(make_payload(60_000), etag='"v2"')
+    assert ingest_data(stub_server.url, output_path) is True
+    assert output_path.read_bytes() == stub_server.payload
+
+
+def interrupt_download(stub_server, output_path):
+    """Leave a partial download of the published payload behind."""
+    stub_server.fail_after = 300_000
+    with pytest.raises(requests.RequestException):
+        ingest_data(stub_server.url, output_path)
+    return output_path.with_name(output_path.name + ".part")
+
+
+def test_complete_part_file_is_kept_when_nothing_is_left_to_fetch(stub_server, tmp_path):
+    stub_server.publish(make_payload(50_000), etag='"v1"')
+    output_path = tmp_path / "raw.csv"
+    part_path = interrupt_download(stub_server, output_path)
+    part_path.write_bytes(stub_server.payload)
+
+    sent_before = stub_server.bytes_sent
+    assert ingest_data(stub_server.url, output_path) is True
+    assert stub_server.bytes_sent == sent_before
+    assert output_path.read_bytes() == stub_server.payload
+    assert not part_path.exists()
+    # Kept with the validators it was downloaded under, so the next run revalidates.
+    assert ingest_data(stub_server.url, output_path) is False
+
+
+@pytest.mark.parametrize("stale", ["longer than the remote file", "answered from the wrong offset"])
+def test_part_file_that_cannot_be_resumed_is_downloaded_again(stub_server, tmp_path, stale):
+    stub_server.publish(make_payload(50_000), etag='"v1"')
+    output_path = tmp_path / "raw.csv"
+    part_path = interrupt_download(stub_server, output_path)
+    if stale == "longer than the remote file":
+        part_path.write_bytes(stub_server.payload + b"trailing bytes\n")
+    else:
+        stub_server.wrong_range = True
+
+    assert ingest_data(stub_server.url, output_path) is True
+    assert output_path.read_bytes() == stub_server.payload
+    assert "Range" not in stub_server.requests[-1]
+
+
+def _peak_rss_kb(code: str) -> int:
+    # VmHWM is the child's own high-water mark; rusage would include the RSS
+    # inherited from the pytest process at fork time.
+    report = "\nprint(next(l for l in open('/proc/self/status') if l.startswith('VmHWM')).split()[1])"
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    out = subprocess.run([sys.executable, "-c", code + report], env=env, check=True, capture_output=True, text=True)
+    return int(out.stdout.split()[-1])
+
+
+@pytest.mark.skipif(not Path("/proc/self/status").exists(), reason="needs /proc")
+def test_streaming_download_peak_rss_is_independent_of_file_size(stub_server, tmp_path):
+    stub_server.publish(make_payload(2_000_000), etag='"v1"')
+    payload_kb = len(stub_server.payload) // 1024
+
+    streaming_kb = _peak_rss_kb(
+        f"from ingest import ingest_data; ingest_data({stub_server.url!r}, {str(tmp_path / 'a.csv')!r})"
+    )
+    in_memory_kb = _peak_rss_kb(
+        f"import requests; open({str(tmp_path / 'b.csv')!r}, 'wb').write(requests.get({stub_server.url!r}).content)"
+    )
+
+    assert streaming_kb + payload_kb // 2 < in_memory_kb
+    assert stub_server.bytes_sent == 2 * len(stub_server.payload)
@@ -0,0 +1,100 @@
+import shutil
+
+import duckdb
+import pandas as pd
+import pytest
+
+import instrument
+import pipeline
+from datasource import read_pipeline_runs
+from tests.conftest import REPO_SRC
+from tests.synthetic import make_owid_frame, write_owid_csv
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """A copy of src/ and a synthetic raw CSV; ingest is replaced by a no-op."""
+    shutil.copytree(REPO_SRC, tmp_path / "src", ignore=shutil.ignore_patterns("__pycache__"))
+    monkeypatch.chdir(tmp_path)
+    write_owid_csv(pipeline.RAW_PATH, make_owid_frame(n_countries=12))
+
+    def fake_ingest():
+        return True
+
+    monkeypatch.setattr(pipeline, "ingest_data", fake_ingest)
+    return tmp_path
+
+
+def test_stages_record_time_counters_and_nesting():
+    instrument._run = []
+    try:
+        with instrument.stage("outer"):
+            instrument.count(rows_in=3)
+            with instrument.stage("inner"):
+                instrument.count(rows_out=2, bytes_written=5)
+                instrument.count(rows_out=1)
+        instrument.skipped("later")
+        with pytest.raises(RuntimeError):
+            with instrument.stage("broken"):
+                raise RuntimeError
+        records = {r["stage"]: r for r in instrument._run}
+    finally:
+        instrument._run = None
+
+    assert records["inner"]["parent"] == "outer" and records["outer"]["parent"] is None
+    assert (records["inner"]["rows_out"], records["inner"]["bytes_written"], records["inner"]["rows_in"]) == (3, 5, None)
+    assert records["outer"]["rows_in"] == 3
+    assert records["outer"]["wall_seconds"] >= records["inner"]["wall_seconds"] > 0
+    assert [records[name]["status"] for name in ("outer", "later", "broken")] == ["ok", "skipped", "failed"]
+
+
+def test_runs_file_is_created_on_first_run(tmp_path):
+    runs_path = tmp_path / "runs" / "pipeline_runs.duckdb"
+    with instrument.pipeline_run(runs_path):
+        with instrument.stage("ingest"):
+            pass
+    assert read_pipeline_runs(runs_path)["stage"].tolist() == ["ingest"]
+
+
+def test_pipeline_runs_are_recorded_without_touching_the_store(workspace):
+    pipeline.run_pipeline()
+    store_mtime = pipeline.DB_PATH.stat().st_mtime_ns
+    pipeline.run_pipeline()
+
+    runs = read_pipeline_runs()
+    assert runs["run_id"].nunique() == 2
+    first = runs[runs["run_id"] == runs["run_id"].iloc[0]].set_index("stage")
+    second = runs[runs["run_id"] != runs["run_id"].iloc[0]].set_index("stage")
+
+    assert first.loc["validation", "parent"] == "transform"
+    assert first.loc["transform", "rows_in"] > 0
+    assert first.loc["transform", "rows_out"] == first.loc["validation", "rows_in"] == first.loc["load", "rows_out"]
+    assert first.loc["transform", "bytes_read"] == pipeline.STAGED_PATH.stat().st_size
+    assert first.loc["load", "bytes_written"] > 0
+    assert first.loc["ingest", "bytes_written"] == pipeline.RAW_PATH.stat().st_size + pipeline.STAGED_PATH.stat().st_size
+    assert (first["cpu_seconds"] > 0).all()
+    assert second["status"].to_dict() == {"ingest": "ok", "transform": "skipped", "load": "skipped", "snapshot": "skipped"}
+    assert pipeline.DB_PATH.stat().st_mtime_ns == store_mtime
+
+    # Rebuilding the store keeps the history, which lives in a file of its own.
+    pipeline.run_pipeline(force=True)
+    assert read_pipeline_runs()["run_id"].nunique() == 3
+    con = duckdb.connect(str(pipeline.DB_PATH), read_only=True)
+    assert con.execute("SELECT count(*) FROM co2_emissions").fetchone()[0] == first.loc["load", "rows_out"]
+    assert not con.execute("SELECT count(*) FROM duckdb_tables() WHERE table_name = 'pipeline_runs'").fetchone()[0]
+    con.close()
+
+
+def test_latency_kpi_compares_with_the_previous_runs():
+    runs = pd.DataFrame({
+        "run_id": ["a", "a", "a", "b", "c", "c"],
+        "stage": ["ingest", "transform", "validation", "ingest", "ingest", "transform"],
+        "parent": [None, None, "transform", None, None, None],
+        "started_at": pd.to_datetime([1, 2, 3, 4, 5, 6], unit="s"),
+        "wall_seconds": [1.0, 3.0, 2.0, 2.0, 1.0, 2.0],
+    })
+    assert instrument.run_latencies(runs)["wall_seconds"].tolist() == [4.0, 2.0, 3.0]
+    latest, change = instrument.latency_kpi(runs)
+    assert (latest, change) == (3.0, 0.0)
+    assert instrument.latency_kpi(runs, window=1) == (3.0, 50.0)
+    assert instrument.latency_kpi(runs[runs["run_id"] == "a"])[1] is None
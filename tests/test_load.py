@@ -0,0 +1,47 @@
+import duckdb
+
+import load
+import transform
+from tests.conftest import RAW
+from tests.synthetic import make_owid_frame, write_owid_csv
+
+
+def test_store_is_keyed_clustered_and_cataloged(transformed):
+    load.load_data()
+
+    con = duckdb.connect(str(load.DB_PATH), read_only=True)
+    constraints = con.execute(
+        "SELECT constraint_type, constraint_column_names FROM duckdb_constraints() "
+        "WHERE table_name = 'co2_emissions' AND constraint_type = 'PRIMARY KEY'"
+    ).fetchall()
+    assert constraints == [("PRIMARY KEY", ["country", "year"])]
+
+    types = dict(con.execute("SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'co2_emissions'").fetchall())
+    assert types["year"] == "SMALLINT"
+    assert types["population"] == "BIGINT"
+
+    rows = con.execute("SELECT country, year FROM co2_emissions").fetchall()
+    assert rows == sorted(rows)
+
+    catalog = con.execute("SELECT row_count, country_count, first_year, last_year FROM catalog").fetchone()
+    assert catalog == (len(rows), len({c for c, _ in rows}), 1900, 2022)
+    per_country = con.execute("SELECT sum(row_count) FROM countries").fetchone()[0]
+    assert per_country == len(rows)
+
+
+def test_reload_swaps_store_atomically(transformed):
+    load.load_data()
+    reader = duckdb.connect(str(load.DB_PATH), read_only=True)
+    before = reader.execute("SELECT count(*) FROM co2_emissions").fetchone()[0]
+
+    write_owid_csv(RAW, make_owid_frame(n_countries=10))
+    transform.transform_data()
+    load.load_data()
+
+    # An open reader keeps its consistent snapshot of the old file...
+    assert reader.execute("SELECT count(*) FROM co2_emissions").fetchone()[0] == before
+    reader.close()
+    # ...and new readers only ever see the complete new store.
+    after = duckdb.connect(str(load.DB_PATH), read_only=True).execute("SELECT count(*) FROM co2_emissions").fetchone()[0]
+    assert after < before
+    assert not load.DB_PATH.with_name(load.DB_PATH.name + ".tmp").exists()
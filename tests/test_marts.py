@@ -0,0 +1,114 @@
+import base64
+import importlib
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+import datasource
+import load
+import query
+import transform
+from tests.conftest import use_workspace
+from tests.synthetic import make_owid_frame
+
+FLOAT32_RTOL = 1e-6
+STORIES = sorted(p.stem for p in (Path(__file__).resolve().parents[1] / "stories").glob("story_*.py"))
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    workspace = tmp_path_factory.mktemp("marts")
+    with pytest.MonkeyPatch.context() as mp:
+        use_workspace(mp, workspace, make_owid_frame())
+        transform.transform_data()
+        load.load_data()
+        frame, _, _ = datasource.load_frame(["duckdb"])
+        yield workspace / load.DB_PATH, frame
+
+
+def test_every_story_has_a_mart(store):
+    db_path, _ = store
+    con = duckdb.connect(str(db_path), read_only=True)
+    tables = {row[0] for row in con.execute("SHOW TABLES").fetchall()}
+    assert {importlib.import_module(f"stories.{name}").MART for name in STORIES} <= tables
+
+
+@pytest.mark.parametrize("name", STORIES)
+def test_mart_matches_pandas_frame(store, name):
+    db_path, frame = store
+    story = importlib.import_module(f"stories.{name}")
+
+    expected = story.frame(query.CO2Query(frame)).reset_index(drop=True)
+    mart = datasource.read_mart(story.MART, db_path)
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(mart, expected, check_dtype=False)
+    assert story.prepare(mart).data
+
+
+def test_missing_mart_reads_as_none(store):
+    db_path, _ = store
+    assert datasource.read_mart("mart_story_99", db_path) is None
+
+
+def typed_array(value):
+    """The array behind one of Plotly's {"dtype", "bdata"} encodings, else `value`."""
+    if isinstance(value, dict) and "bdata" in value:
+        array = np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+        return array.reshape(value["shape"]) if "shape" in value else array
+    return value
+
+
+def assert_same_figure(actual, expected, path="figure"):
+    """Equal figure specs, with numeric arrays equal to within float32 precision.
+
+    The compact frame stores most measures as float32, so traces built from it
+    carry float32 arrays whose values may differ from the float64 ones in the
+    last bits, but no more.
+    """
+    actual, expected = typed_array(actual), typed_array(expected)
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys(), path
+        for key in expected:
+            assert_same_figure(actual[key], expected[key], f"{path}.{key}")
+    elif isinstance(expected, (list, tuple)) and any(isinstance(item, dict) for item in expected):
+        assert len(actual) == len(expected), path
+        for i, (a, e) in enumerate(zip(actual, expected)):
+            assert_same_figure(a, e, f"{path}[{i}]")
+    elif isinstance(expected, (list, tuple, np.ndarray)) and np.asarray(expected).dtype.kind in "biuf":
+        np.testing.assert_allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float), rtol=FLOAT32_RTOL, err_msg=path)
+    elif isinstance(expected, (list, tuple, np.ndarray)):
+        assert list(actual) == list(expected), path
+    else:
+        assert actual == expected, path
+
+
+@pytest.mark.parametrize("name", STORIES)
+def test_compact_frame_gives_identical_figures(store, name):
+    db_path, frame = store
+    story = importlib.import_module(f"stories.{name}")
+    # The previous representation: object strings, int64 year, float64 measures.
+    raw = datasource.read_store(db_path)
+    plain = raw.fillna(0).assign(is_aggregate=raw["iso_code"].isna())
+
+    expected, actual = (story.prepare(story.frame(query.CO2Query(df))).to_plotly_json() for df in (plain, frame))
+    assert_same_figure(actual, expected)
+
+
+@pytest.mark.parametrize("name", STORIES)
+def test_stories_leave_shared_data_untouched(store, name):
+    _, frame = store
+    story = importlib.import_module(f"stories.{name}")
+    handle = datasource.FrameHandle(frame, "duckdb")
+    shared = query.CO2Query(handle.view())
+    expected = handle.view().copy()
+
+    first = story.frame(shared)
+    story.prepare(first)
+    first[first.columns[0]] = None
+    # Neither the shared frame nor the query's cached results changed.
+    pd.testing.assert_frame_equal(handle.view(), expected)
+    pd.testing.assert_frame_equal(shared.data, expected)
+    pd.testing.assert_frame_equal(story.frame(shared), story.frame(query.CO2Query(frame)))
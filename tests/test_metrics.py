@@ -0,0 +1,59 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pytest
+
+import datasource
+import metrics
+import transform
+from tests.conftest import REPO_SQL
+
+
+@pytest.fixture
+def processed(transformed):
+    df = duckdb.connect().execute(f"SELECT * FROM {transform.processed_scan()}").df()
+    return df.sort_values(["country", "year"], ignore_index=True)
+
+
+def expected_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    """The registry's metrics, computed the slow way with pandas."""
+    by_country = df.groupby("country", sort=False)
+    out = pd.DataFrame(index=df.index)
+    for column in ["co2", "gdp"]:
+        previous = by_country[column].shift()
+        out[f"{column}_yoy_pct"] = 100 * (df[column] / previous.replace(0, np.nan) - 1)
+    out["gdp_per_capita"] = df["gdp"] / df["population"]
+    out["carbon_intensity"] = 1e9 * df["co2"] / df["gdp"]
+    for fuel in metrics.FUELS:
+        out[f"{fuel}_share"] = 100 * df[f"{fuel}_co2"] / df["co2"]
+    for window in metrics.ROLLING_WINDOWS:
+        rolling = by_country["co2"].rolling(window, min_periods=1)
+        out[f"co2_rolling_mean_{window}yr"] = rolling.mean().reset_index(level=0, drop=True)
+        out[f"co2_rolling_std_{window}yr"] = rolling.std().reset_index(level=0, drop=True)
+    for column in ["gdp", "co2"]:
+        base = df[column].where(df["year"] == metrics.BASE_YEAR).groupby(df["country"]).transform("max")
+        out[f"{column}_index_{metrics.BASE_YEAR}"] = 100 * df[column] / base
+    return out
+
+
+@pytest.mark.parametrize("raw_frame", [{"n_countries": 12}], indirect=True)
+def test_registry_metrics_match_pandas(processed):
+    expected = expected_metrics(processed)
+    assert list(expected.columns) == metrics.metric_names()
+    pd.testing.assert_frame_equal(processed[metrics.metric_names()], expected, check_dtype=False, rtol=1e-9)
+
+
+def test_metrics_compile_to_one_window_scan():
+    con = duckdb.connect()
+    con.execute("CREATE TABLE clean_and_cast AS SELECT * FROM (VALUES ('A', 1990, 1.0, 2.0, 3.0, 0.1, 0.2, 0.3, 0.2, 0.2)) "
+                "t(country, year, co2, gdp, population, coal_co2, oil_co2, gas_co2, cement_co2, flaring_co2)")
+    sql = metrics.render((REPO_SQL / "02_calculate_metrics.sql").read_text())
+    plan = con.execute("EXPLAIN " + sql).fetchall()[0][1]
+    # Every metric window shares the country partition and year order, so the
+    # rows are partitioned and sorted once.
+    assert plan.count("WINDOW") == 1
+
+
+def test_story_metrics_come_from_the_registry():
+    assert set(datasource.STORY_METRICS) <= set(metrics.metric_names())
+    assert set(datasource.STORY_METRICS) <= set(datasource.COLUMNS)
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import duckdb
+import pytest
+
+import models
+from tests.conftest import REPO_SQL
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A diamond of models: source -> (doubled, shifted) -> joined."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "sql").mkdir()
+    Path("input.csv").write_text("k,v\n1,10\n2,20\n")
+    write = lambda name, sql: (tmp_path / "sql" / name).write_text(sql)
+    write("01_source.sql", "-- reads JOIN nothing\nSELECT * FROM read_csv_auto('input.csv');")
+    write("02_doubled.sql", "SELECT k, v * 2 AS doubled FROM source")
+    write("02_shifted.sql", "SELECT k, v + 1 AS shifted FROM source")
+    write("03_joined.sql", "SELECT * FROM doubled JOIN shifted USING (k)")
+    return tmp_path
+
+
+def run(project):
+    con = duckdb.connect()
+    status = models.run_models(con, models.discover(project / "sql"), cache_dir=project / "cache")
+    return status, con.execute("SELECT * FROM joined ORDER BY k").fetchall()
+
+
+def test_repo_models_form_a_chain():
+    found = models.discover(REPO_SQL)
+    assert models.layers(found) == [["clean_and_cast"], ["calculate_metrics"], ["add_rolling_averages"]]
+    assert found["clean_and_cast"]["files"] == ["data/staged/owid-co2-data.parquet"]
+
+
+def test_dependencies_and_layers(project):
+    found = models.discover(project / "sql")
+    assert found["joined"]["deps"] == ["doubled", "shifted"]
+    assert found["source"]["deps"] == []
+    assert found["source"]["files"] == ["input.csv"]
+    assert models.layers(found) == [["source"], ["doubled", "shifted"], ["joined"]]
+
+
+def test_only_edited_models_and_their_downstream_rerun(project):
+    status, rows = run(project)
+    assert set(status.values()) == {"built"}
+    assert rows == [(1, 20, 11), (2, 40, 21)]
+
+    status, _ = run(project)
+    assert set(status.values()) == {"cached"}
+
+    (project / "sql" / "02_shifted.sql").write_text("SELECT k, v + 100 AS shifted FROM source")
+    status, rows = run(project)
+    assert status == {"source": "cached", "doubled": "cached", "shifted": "built", "joined": "built"}
+    assert rows == [(1, 20, 110), (2, 40, 120)]
+    assert len(list((project / "cache").glob("shifted-*.parquet"))) == 1
+
+    Path("input.csv").write_text("k,v\n1,10\n2,30\n")
+    status, rows = run(project)
+    assert set(status.values()) == {"built"}
+    assert rows[1] == (2, 60, 130)
+
+
+def test_skipped_models_bypass_the_cache_downstream(project):
+    run(project)
+    con = duckdb.connect()
+    con.execute("CREATE TABLE source AS SELECT 5 AS k, 1 AS v")
+    status = models.run_models(con, models.discover(project / "sql"), cache_dir=project / "cache", skip={"source"})
+    assert status == {"source": "skipped", "doubled": "built", "shifted": "built", "joined": "built"}
+    assert con.execute("SELECT * FROM joined").fetchall() == [(5, 2, 2)]
+
+
+def test_cycles_are_rejected(project):
+    (project / "sql" / "01_source.sql").write_text("SELECT * FROM joined")
+    with pytest.raises(ValueError, match="cycle"):
+        models.layers(models.discover(project / "sql"))
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+import payload
+
+
+def bubble_frame(n=150, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "country": [f"Country {i:03d}" for i in range(n)],
+        "gdp": rng.uniform(1e9, 1e13, n),
+        "co2": rng.uniform(1, 1e4, n),
+        "population": rng.uniform(1e6, 1e9, n),
+    })
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(10_000)
+    y = np.sin(x / 500)
+    y[4321] = 50.0
+    picked = payload.lttb(x, y, 200)
+    assert len(picked) == 200
+    assert picked[0] == 0 and picked[-1] == len(x) - 1
+    assert np.all(np.diff(picked) > 0)
+    assert 4321 in picked
+    assert len(payload.lttb(x[:50], y[:50], 200)) == 50
+
+
+def test_per_country_scatter_collapses_into_one_trace():
+    df = bubble_frame()
+    fig = px.scatter(df, x="gdp", y="co2", size="population", color="country", hover_name="country", log_x=True)
+    fig.update_layout(showlegend=False)
+    colors = {t.name: t.marker.color for t in fig.data}
+
+    optimized = payload.optimize(fig)
+
+    assert len(optimized.data) == 1
+    trace = optimized.data[0]
+    assert len(trace.x) == len(df)
+    assert list(trace.hovertext) == list(df["country"])
+    assert list(trace.marker.color) == [colors[c] for c in df["country"]]
+    np.testing.assert_allclose(trace.marker.size, df["population"], rtol=1e-6)
+    assert trace.marker.sizeref == fig.data[0].marker.sizeref
+    assert "country=" not in trace.hovertemplate
+    assert payload.payload_bytes(optimized) < payload.payload_bytes(fig) / 3
+
+
+def test_scatter_with_legend_is_left_alone():
+    fig = px.scatter(bubble_frame(30), x="gdp", y="co2", color="country")
+    assert len(payload.optimize(fig).data) == 30
+
+
+def test_large_scatter_switches_to_webgl():
+    fig = go.Figure(go.Scatter(x=np.arange(5000), y=np.random.default_rng(0).random(5000), mode="markers"))
+    assert payload.optimize(fig).data[0].type == "scattergl"
+    small = go.Figure(go.Scatter(x=[1, 2], y=[3, 4], mode="markers"))
+    assert payload.optimize(small).data[0].type == "scatter"
+
+
+def test_stacked_lines_downsample_on_shared_indices():
+    years = np.arange(2000)
+    df = pd.DataFrame({
+        "year": np.tile(years, 2),
+        "fuel": np.repeat(["Coal", "Oil"], len(years)),
+        "emissions": np.random.default_rng(0).random(2 * len(years)),
+    })
+    fig = payload.optimize(px.area(df, x="year", y="emissions", color="fuel"), point_budget=300)
+
+    coal, oil = fig.data
+    assert len(coal.x) == len(oil.x) == 300
+    np.testing.assert_array_equal(coal.x, oil.x)
+    np.testing.assert_allclose(oil.y, df[df["fuel"] == "Oil"].set_index("year").loc[oil.x, "emissions"], rtol=1e-6)
+
+
+def test_numeric_arrays_are_narrowed():
+    fig = payload.optimize(go.Figure(go.Scatter(x=np.arange(1950, 2023), y=np.linspace(0, 1, 73))))
+    assert fig.data[0].x.dtype == np.int16
+    assert fig.data[0].y.dtype == np.float32
+    assert '"dtype":"f4"' in fig.to_json()
+
+
+def test_large_values_keep_full_precision():
+    gdp = np.array([1_234_567_890.0, 2.5e12])
+    fig = payload.optimize(go.Figure(go.Scatter(x=gdp, y=[4.2, 7.5], marker={"size": [1_411_750_001.0, 331_893_745.0]})))
+    assert fig.data[0].x.dtype == np.float64 and fig.data[0].marker.size.dtype == np.float64
+    assert fig.data[0].y.dtype == np.float32
+    assert fig.data[0].x[0] == 1_234_567_890.0
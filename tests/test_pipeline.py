@@ -0,0 +1,85 @@
+import shutil
+import time
+from pathlib import Path
+
+import pytest
+
+import pipeline
+from tests.conftest import REPO_SRC
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """A copy of src/ with fake stages that record their calls instead of doing work."""
+    shutil.copytree(REPO_SRC, tmp_path / "src", ignore=shutil.ignore_patterns("__pycache__"))
+    monkeypatch.chdir(tmp_path)
+    calls = []
+
+    def fake_ingest():
+        pipeline.RAW_PATH.parent.mkdir(parents=True, exist_ok=True)
+        if not pipeline.RAW_PATH.exists():
+            pipeline.RAW_PATH.write_text("country,year\nWorld,2020\n")
+        return False
+
+    def fake_transform(incremental=False):
+        calls.append("transform (incremental)" if incremental else "transform")
+        pipeline.PROCESSED_PATH.parent.mkdir(parents=True, exist_ok=True)
+        pipeline.PROCESSED_PATH.write_bytes(pipeline.RAW_PATH.read_bytes().upper())
+
+    def fake_load():
+        calls.append("load")
+        marts = b"".join(f.read_bytes() for f in sorted(pipeline.MART_DIR.glob("*.sql")))
+        pipeline.DB_PATH.write_bytes(pipeline.PROCESSED_PATH.read_bytes() + marts)
+
+    def fake_snapshot():
+        calls.append("snapshot")
+        pipeline.SNAPSHOT_PATH.parent.mkdir(parents=True, exist_ok=True)
+        pipeline.SNAPSHOT_PATH.write_bytes(pipeline.PROCESSED_PATH.read_bytes())
+
+    monkeypatch.setattr(pipeline, "ingest_data", fake_ingest)
+    monkeypatch.setattr(pipeline, "transform_data", fake_transform)
+    monkeypatch.setattr(pipeline, "load_data", fake_load)
+    monkeypatch.setattr(pipeline, "publish_snapshot", fake_snapshot)
+    return calls
+
+
+def test_unchanged_inputs_skip_every_stage(workspace):
+    assert pipeline.run_pipeline() == {"ingest": False, "transform": True, "load": True, "snapshot": True}
+
+    start = time.perf_counter()
+    assert pipeline.run_pipeline() == {"ingest": False, "transform": False, "load": False, "snapshot": False}
+    assert time.perf_counter() - start < 0.5
+    assert workspace == ["transform", "load", "snapshot"]
+
+
+def test_changed_sql_reruns_transform_but_not_load_when_output_is_identical(workspace):
+    pipeline.run_pipeline()
+    sql_file = Path("src/sql/03_add_rolling_averages.sql")
+    sql_file.write_text(sql_file.read_text() + "\n-- comment only")
+
+    assert pipeline.run_pipeline() == {"ingest": False, "transform": True, "load": False, "snapshot": False}
+
+
+def test_changed_raw_data_reruns_downstream_incrementally(workspace):
+    pipeline.run_pipeline()
+    pipeline.RAW_PATH.write_text("country,year\nWorld,2021\n")
+
+    assert pipeline.run_pipeline() == {"ingest": False, "transform": True, "load": True, "snapshot": True}
+    assert workspace == ["transform", "load", "snapshot", "transform (incremental)", "load", "snapshot"]
+
+
+def test_changed_mart_sql_republishes_the_snapshot(workspace):
+    # The app keys story figures on the snapshot's fingerprint, also for the
+    # marts it reads from the store.
+    pipeline.run_pipeline()
+    mart_file = pipeline.MART_DIR / "mart_story_01.sql"
+    mart_file.write_text(mart_file.read_text() + "\n-- edited")
+
+    assert pipeline.run_pipeline() == {"ingest": False, "transform": False, "load": True, "snapshot": True}
+
+
+def test_missing_output_or_force_reruns_stage(workspace):
+    pipeline.run_pipeline()
+    pipeline.DB_PATH.unlink()
+    assert pipeline.run_pipeline()["load"] is True
+    assert pipeline.run_pipeline(force=True) == {"ingest": False, "transform": True, "load": True, "snapshot": True}
@@ -0,0 +1,73 @@
+import time
+
+import pandas as pd
+
+from profiler import Profiler, aggregate, flame_figure, read_spans
+
+
+def test_rerun_spans_nest_and_are_logged(tmp_path):
+    log = tmp_path / "spans.jsonl"
+    profiler = Profiler("s1", log_path=log)
+    profiler.start()
+    with profiler.span("data engine"):
+        time.sleep(0.01)
+    with profiler.span("view:Data Stories"):
+        with profiler.span("story:1"):
+            with profiler.span("show"):
+                pass
+    spans = profiler.finish()
+
+    assert [s["path"] for s in spans] == [
+        "rerun", "rerun;data engine", "rerun;view:Data Stories",
+        "rerun;view:Data Stories;story:1", "rerun;view:Data Stories;story:1;show",
+    ]
+    assert [s["depth"] for s in spans] == [0, 1, 1, 2, 3]
+    assert spans[0]["start_ms"] == 0
+    assert spans[1]["duration_ms"] >= 10
+    assert spans[0]["duration_ms"] >= spans[1]["duration_ms"] + spans[2]["duration_ms"]
+    assert spans[2]["start_ms"] >= spans[1]["start_ms"] + spans[1]["duration_ms"]
+
+    logged = read_spans(log)
+    assert logged["path"].tolist() == [s["path"] for s in spans]
+    assert set(logged["session"]) == {"s1"} and set(logged["rerun"]) == {1}
+
+
+def test_spans_outside_a_rerun_are_logged_as_their_own_root(tmp_path):
+    log = tmp_path / "spans.jsonl"
+    profiler = Profiler("s1", log_path=log)
+    profiler.start()
+    profiler.finish()
+    # A fragment rerun only runs the fragment's code.
+    with profiler.span("story:2"):
+        with profiler.span("show"):
+            pass
+    assert [s["path"] for s in profiler.spans] == ["story:2", "story:2;show"]
+    assert read_spans(log)["rerun"].tolist() == [1, 2, 2]
+
+
+def test_disabled_profiler_records_nothing(tmp_path):
+    profiler = Profiler("s1", enabled=False, log_path=tmp_path / "spans.jsonl")
+    profiler.start()
+    with profiler.span("view:Home"):
+        pass
+    assert profiler.finish() == []
+    assert not (tmp_path / "spans.jsonl").exists()
+
+
+def test_aggregate_and_flame_chart():
+    spans = pd.DataFrame({
+        "name": ["story:a"] * 20 + ["story:b"] * 2 + ["rerun"],
+        "duration_ms": list(range(1, 21)) + [5, 5] + [100],
+    })
+    report = aggregate(spans, "story:")
+    assert report.index.tolist() == ["story:a", "story:b"]
+    assert report.loc["story:a", "count"] == 20
+    assert report.loc["story:a", "p50_ms"] == 10.5
+    assert report.loc["story:a", "p95_ms"] == 19.05
+    assert len(aggregate(spans)) == 3
+
+    fig = flame_figure([
+        {"name": "rerun", "depth": 0, "start_ms": 0.0, "duration_ms": 10.0},
+        {"name": "view:Home", "depth": 1, "start_ms": 2.0, "duration_ms": 5.0},
+    ])
+    assert list(fig.data[0].base) == [0.0, 2.0] and list(fig.data[0].text) == ["rerun", "view:Home"]
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from datasource import compact
+from query import LOOKUPS, CO2Query
+from tests.synthetic import make_owid_frame
+
+
+@pytest.fixture(scope="module")
+def frame():
+    df = compact(make_owid_frame(first_year=1950))
+    # Shuffle so the index has to put rows back into (country, year) order.
+    return df.sample(frac=1, random_state=0)
+
+
+@pytest.mark.parametrize("name", list(LOOKUPS))
+def test_lookups_match_boolean_masks(frame, name):
+    mask, lookup = LOOKUPS[name]
+    expected = mask(frame.sort_values(["country", "year"])).reset_index(drop=True)
+    pd.testing.assert_frame_equal(lookup(CO2Query(frame)), expected, check_dtype=False, check_categorical=False)
+
+
+def test_series_year_bounds_and_unknown_countries(frame):
+    query = CO2Query(frame)
+    window = query.series(["India", "Atlantis"], "co2", years=(2000, 2004))
+    assert window["year"].tolist() == [2000, 2001, 2002, 2003, 2004]
+    assert set(window["country"]) == {"India"}
+    assert query.series("India", "co2", years=(None, 1951))["year"].tolist() == [1950, 1951]
+    assert query.series("Atlantis", "co2").empty
+    assert query.cross_section(1800, "co2").empty
+
+
+def test_results_are_cached_and_isolated(frame):
+    query = CO2Query(frame)
+    first = query.series("World", "co2")
+    first["pct_change"] = first["co2"].pct_change()
+    first.loc[0, "co2"] = -1.0
+
+    second = query.series("World", ["co2"])
+    assert list(second.columns) == ["country", "year", "co2"]
+    assert second.loc[0, "co2"] != -1.0
+    assert query.cache_info()["series"].hits == 1
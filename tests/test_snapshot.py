@@ -0,0 +1,64 @@
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+import datasource
+import transform
+from query import CO2Query
+from snapshot import publish_snapshot
+from tests.conftest import RAW
+from tests.synthetic import make_owid_frame, write_owid_csv
+
+NUMERIC = ["year", *list(datasource.COLUMNS)[3:]]
+
+
+@pytest.fixture
+def mappings(monkeypatch):
+    """Address ranges of every file datasource memory-maps."""
+    ranges, memory_map = [], pa.memory_map
+
+    def spy(path, mode="r"):
+        mapped = memory_map(path, mode)
+        start = mapped.read_buffer().address
+        ranges.append((start, start + mapped.size()))
+        mapped.seek(0)
+        return mapped
+
+    monkeypatch.setattr(datasource.pa, "memory_map", spy)
+    return ranges
+
+
+def test_snapshot_serves_the_compact_frame(transformed):
+    publish_snapshot()
+    snapshot, source, _ = datasource.load_frame(["snapshot"])
+    from_parquet, _, _ = datasource.load_frame(["parquet"])
+    assert source == "snapshot"
+    pd.testing.assert_frame_equal(snapshot, from_parquet)
+    assert datasource.data_version("snapshot", snapshot).startswith("snapshot-")
+
+
+def test_numeric_columns_are_views_of_the_mapped_file(transformed, mappings):
+    publish_snapshot()
+    df, _, _ = datasource.load_frame(["snapshot"])
+    (start, stop), = mappings
+    for name in NUMERIC:
+        address = df[name].to_numpy().ctypes.data
+        assert start <= address < stop, name
+
+    # Already in key order, so the query index keeps the mapped columns too.
+    query = CO2Query(df)
+    assert start <= query.data["co2"].to_numpy().ctypes.data < stop
+
+
+def test_mapped_frame_outlives_a_new_snapshot(transformed):
+    publish_snapshot()
+    old, _, _ = datasource.load_frame(["snapshot"])
+    expected = old.copy()
+
+    write_owid_csv(RAW, make_owid_frame(seed=1))
+    transform.transform_data()
+    publish_snapshot()
+    new, _, _ = datasource.load_frame(["snapshot"])
+
+    pd.testing.assert_frame_equal(old, expected)
+    assert not new["co2"].equals(old["co2"])
@@ -0,0 +1,106 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import transform
+from tests.conftest import RAW
+from tests.synthetic import make_owid_frame, write_owid_csv
+
+
+def full_rebuild(raw: pd.DataFrame, workspace: Path) -> pd.DataFrame:
+    """Run the non-incremental transform on `raw` in a separate directory."""
+    rebuild_dir = workspace / "rebuild"
+    write_owid_csv(rebuild_dir / RAW, raw)
+    previous_cwd = Path.cwd()
+    try:
+        os.chdir(rebuild_dir)
+        transform.transform_data()
+        return pd.read_parquet(transform.PROCESSED_PATH)
+    finally:
+        os.chdir(previous_cwd)
+
+
+def revise(raw: pd.DataFrame) -> pd.DataFrame:
+    """A new "release": revised recent years, an added year, a dropped entity."""
+    raw = raw.copy()
+    recent = (raw["country"] == "Country 003") & (raw["year"] >= 2015)
+    raw.loc[recent, "co2"] *= 1.05
+    raw.loc[(raw["country"] == "World") & (raw["year"] == 1990), "gdp"] = np.nan
+    new_year = raw[(raw["country"] == "Country 007") & (raw["year"] == 2022)].assign(year=2023)
+    raw = pd.concat([raw, new_year], ignore_index=True)
+    return raw[raw["country"] != "Country 011"]
+
+
+@pytest.mark.parametrize("cache_dir", [transform.MODEL_CACHE_DIR, None])
+def test_incremental_output_matches_full_rebuild(workspace, caplog, cache_dir):
+    raw = make_owid_frame()
+    write_owid_csv(RAW, raw)
+    transform.transform_data(cache_dir=cache_dir)
+
+    revised = revise(raw)
+    write_owid_csv(RAW, revised)
+    with caplog.at_level("INFO"):
+        transform.transform_data(incremental=True, cache_dir=cache_dir)
+    assert "recomputing 4 changed countries" in caplog.text
+
+    incremental = pd.read_parquet(transform.PROCESSED_PATH)
+    pd.testing.assert_frame_equal(incremental, full_rebuild(revised, workspace))
+
+
+def test_incremental_without_changes_keeps_output(workspace):
+    write_owid_csv(RAW, make_owid_frame())
+    transform.transform_data()
+    before = transform.PROCESSED_PATH.stat().st_mtime_ns
+
+    transform.transform_data(incremental=True)
+    assert transform.PROCESSED_PATH.stat().st_mtime_ns == before
+
+
+def test_output_is_sorted_zstd_parquet_with_row_group_statistics(workspace):
+    import pyarrow.parquet as pq
+
+    write_owid_csv(RAW, make_owid_frame(n_countries=100))
+    transform.transform_data()
+
+    metadata = pq.ParquetFile(transform.PROCESSED_PATH).metadata
+    assert metadata.num_row_groups > 1
+    country = metadata.schema.names.index("country")
+    ranges = []
+    for i in range(metadata.num_row_groups):
+        column = metadata.row_group(i).column(country)
+        assert column.compression == "ZSTD"
+        assert column.statistics.has_min_max
+        ranges.append((column.statistics.min, column.statistics.max))
+    # Sorted by country: row groups cover disjoint, increasing country ranges,
+    # so a country filter only has to read one or two of them.
+    assert all(prev[1] <= cur[0] for prev, cur in zip(ranges, ranges[1:]))
+
+    df = pd.read_parquet(transform.PROCESSED_PATH)
+    assert df.equals(df.sort_values(["country", "year"], ignore_index=True))
+
+
+@pytest.mark.parametrize("partition_by", ["country", "decade"])
+def test_partitioned_output_reads_back_identically(workspace, partition_by):
+    import duckdb
+
+    write_owid_csv(RAW, make_owid_frame())
+    transform.transform_data()
+    single_file = pd.read_parquet(transform.PROCESSED_PATH)
+
+    transform.transform_data(partition_by=partition_by)
+    assert transform.PROCESSED_PATH.is_dir()
+    assert any(p.name.startswith(f"{partition_by}=") for p in transform.PROCESSED_PATH.iterdir())
+
+    query = f"SELECT * FROM {transform.processed_scan()} ORDER BY country, year"
+    partitioned = duckdb.sql(query).df()
+    pd.testing.assert_frame_equal(partitioned, single_file)
+
+    # Incremental runs read the partitioned layout back as their previous output.
+    revised = revise(make_owid_frame())
+    write_owid_csv(RAW, revised)
+    transform.transform_data(incremental=True, partition_by=partition_by)
+    merged = duckdb.sql(query).df()
+    pd.testing.assert_frame_equal(merged, full_rebuild(revised, workspace))
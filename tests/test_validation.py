@@ -0,0 +1,83 @@
+import duckdb
+import numpy as np
+import pandas as pd
+import pandera as pa
+import pytest
+
+from validation import coerced_select, get_co2_schema, validate_in_duckdb, validate_with_pandera
+
+
+def make_frame() -> pd.DataFrame:
+    schema = get_co2_schema()
+    n = 20
+    df = pd.DataFrame({name: np.linspace(0, 1, n) for name in schema.columns})
+    df["country"] = [f"Country {i}" for i in range(n)]
+    df["year"] = np.arange(2000, 2000 + n)
+    df["iso_code"] = [f"C{i:02d}" for i in range(n)]
+    df["extra_column"] = "dropped by strict='filter'"
+    return df
+
+
+def summary(report: dict) -> dict:
+    return {(f["column"], f["check"]): f["failure_count"] for f in report["failures"]}
+
+
+def test_sql_validation_matches_pandera_on_valid_data():
+    df = make_frame()
+    con = duckdb.connect()
+    con.register("final_data", df)
+
+    sql_report = validate_in_duckdb(con, "final_data")
+    assert sql_report["valid"]
+    assert sql_report["rows"] == len(df)
+    assert sql_report["dropped_columns"] == ["extra_column"]
+    assert validate_with_pandera(df)["valid"]
+
+
+def test_sql_validation_matches_pandera_failure_counts():
+    df = make_frame().drop(columns=["gdp"])
+    df.loc[[1, 2], "country"] = None
+    df.loc[[3, 4, 5], "iso_code"] = None
+    df.loc[[6], "year"] = 1700
+    df["co2"] = df["co2"].astype(str)
+    df.loc[[7, 8], "co2"] = "n/a"
+    con = duckdb.connect()
+    con.register("final_data", df)
+
+    sql_report = validate_in_duckdb(con, "final_data")
+    pandera_report = validate_with_pandera(df)
+
+    assert not sql_report["valid"]
+    assert summary(sql_report) == summary(pandera_report) == {
+        (None, "column_in_dataframe"): 1,
+        ("country", "not_nullable"): 2,
+        ("iso_code", "not_nullable"): 3,
+        ("year", "greater_than_or_equal_to(1750)"): 1,
+        ("co2", "coerce_dtype('float64')"): 2,
+    }
+    year_failure = next(f for f in sql_report["failures"] if f["column"] == "year")
+    assert year_failure["sample"] == [{"country": "Country 6", "year": 1700}]
+    co2_failure = next(f for f in sql_report["failures"] if f["column"] == "co2")
+    assert [sorted(row) for row in co2_failure["sample"]] == [["co2", "country", "year"]] * 2
+
+
+def test_rules_without_sql_translation_are_rejected():
+    con = duckdb.connect()
+    con.register("final_data", make_frame())
+    unsupported_check = pa.DataFrameSchema({"co2": pa.Column(float, pa.Check.str_startswith("1"))})
+    with pytest.raises(ValueError, match="str_startswith"):
+        validate_in_duckdb(con, "final_data", unsupported_check)
+    unsupported_dtype = pa.DataFrameSchema({"year": pa.Column("timedelta64[ns]")}, coerce=True)
+    with pytest.raises(TypeError, match="timedelta64"):
+        validate_in_duckdb(con, "final_data", unsupported_dtype)
+
+
+def test_coerced_select_applies_strict_filter_and_dtypes():
+    df = make_frame()
+    df["year"] = df["year"].astype("int32")
+    con = duckdb.connect()
+    con.register("final_data", df)
+
+    out = con.execute(f"SELECT {coerced_select(get_co2_schema())} FROM final_data").df()
+    assert list(out.columns) == list(get_co2_schema().columns)
+    assert out["year"].dtype == "int64"